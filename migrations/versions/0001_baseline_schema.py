@@ -0,0 +1,111 @@
+"""Baseline schema, as created by create_tables() before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+Databases created by create_tables() already have these tables, so each table
+is only created when it is missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_table(existing, name, *columns):
+    if name not in existing:
+        op.create_table(name, *columns)
+        return True
+    return False
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if _create_table(
+        existing, "restaurants",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("location", sa.String(255), nullable=False),
+        sa.Column("cuisine_type", sa.String(100)),
+        sa.Column("phone", sa.String(20)),
+        sa.Column("email", sa.String(255)),
+        sa.Column("address", sa.Text()),
+        sa.Column("opening_hours", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ):
+        op.create_index("ix_restaurants_id", "restaurants", ["id"])
+
+    if _create_table(
+        existing, "menu_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("category", sa.String(100)),
+        sa.Column("is_available", sa.Boolean()),
+        sa.Column("image_url", sa.String(500)),
+        sa.Column("allergens", sa.JSON()),
+        sa.Column("nutritional_info", sa.JSON()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ):
+        op.create_index("ix_menu_items_id", "menu_items", ["id"])
+
+    if _create_table(
+        existing, "platform_syncs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("restaurant_id", sa.Integer(), nullable=False),
+        sa.Column("platform", sa.String(50), nullable=False),
+        sa.Column("platform_restaurant_id", sa.String(255)),
+        sa.Column("last_sync", sa.DateTime(timezone=True)),
+        sa.Column("sync_status", sa.String(20)),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ):
+        op.create_index("ix_platform_syncs_id", "platform_syncs", ["id"])
+
+    if _create_table(
+        existing, "config_parameters",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("key", sa.String(255), nullable=False),
+        sa.Column("value", sa.Text()),
+        sa.Column("description", sa.Text()),
+        sa.Column("is_encrypted", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ):
+        op.create_index("ix_config_parameters_id", "config_parameters", ["id"])
+        op.create_index("ix_config_parameters_key", "config_parameters", ["key"], unique=True)
+
+    if _create_table(
+        existing, "action_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("action_type", sa.String(100), nullable=False),
+        sa.Column("entity_type", sa.String(50)),
+        sa.Column("entity_id", sa.Integer()),
+        sa.Column("user_id", sa.String(100)),
+        sa.Column("action_details", sa.JSON()),
+        sa.Column("result", sa.String(20)),
+        sa.Column("error_message", sa.Text()),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    ):
+        op.create_index("ix_action_history_id", "action_history", ["id"])
+        op.create_index("ix_action_history_timestamp", "action_history", ["timestamp"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ["action_history", "config_parameters", "platform_syncs", "menu_items", "restaurants"]:
+        op.drop_table(table)
@@ -0,0 +1,98 @@
+"""Lookup indexes, unique platform sync rows and restaurant foreign keys
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+Databases created by a newer create_tables() already have these, so every
+object is checked before it is created. On PostgreSQL, indexes are built
+CONCURRENTLY so writes are not blocked. Foreign keys are added NOT VALID and
+only validated when there are no orphaned rows, which are reported instead of
+deleted.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_menu_items_restaurant_id", "menu_items", ["restaurant_id", "id"]),
+    ("ix_menu_items_restaurant_category", "menu_items",
+     ["restaurant_id", sa.text("coalesce(category, '')"), "name", "id"]),
+    ("ix_menu_items_restaurant_price", "menu_items", ["restaurant_id", "price", "id"]),
+    ("ix_action_history_action_entity", "action_history", ["action_type", "entity_type", "entity_id", "timestamp"]),
+    ("ix_action_history_entity", "action_history", ["entity_type", "entity_id", "timestamp"]),
+]
+
+FOREIGN_KEYS = [
+    ("fk_menu_items_restaurant_id", "menu_items"),
+    ("fk_platform_syncs_restaurant_id", "platform_syncs"),
+]
+
+UNIQUE_SYNC = "uq_platform_syncs_restaurant_platform"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    postgres = bind.dialect.name == "postgresql"
+
+    if UNIQUE_SYNC not in {c["name"] for c in inspector.get_unique_constraints("platform_syncs")}:
+        # Keep the newest status row per restaurant and platform
+        op.execute(
+            "DELETE FROM platform_syncs WHERE id NOT IN ("
+            "SELECT MAX(id) FROM platform_syncs GROUP BY restaurant_id, platform)"
+        )
+        with op.batch_alter_table("platform_syncs") as batch_op:
+            batch_op.create_unique_constraint(UNIQUE_SYNC, ["restaurant_id", "platform"])
+
+    for name, table in FOREIGN_KEYS:
+        if name in {fk["name"] for fk in inspector.get_foreign_keys(table)}:
+            continue
+        if postgres:
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {name} FOREIGN KEY (restaurant_id) "
+                f"REFERENCES restaurants (id) ON DELETE CASCADE NOT VALID"
+            )
+            orphans = bind.execute(sa.text(
+                f"SELECT COUNT(*) FROM {table} t LEFT JOIN restaurants r ON r.id = t.restaurant_id "
+                f"WHERE r.id IS NULL"
+            )).scalar()
+            if orphans:
+                print(f"⚠️  {orphans} {table} rows reference missing restaurants; "
+                      f"{name} is enforced for new rows but left NOT VALID")
+            else:
+                op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}")
+        else:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.create_foreign_key(name, "restaurants", ["restaurant_id"], ["id"], ondelete="CASCADE")
+
+    # Indexes last: SQLite batch operations rebuild the table and would drop them.
+    # Existence is left to IF NOT EXISTS since expression indexes aren't reflected everywhere.
+    if postgres:
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+    for name, table in FOREIGN_KEYS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(name, type_="foreignkey")
+    with op.batch_alter_table("platform_syncs") as batch_op:
+        batch_op.drop_constraint(UNIQUE_SYNC, type_="unique")
@@ -0,0 +1,37 @@
+"""Per-restaurant menu and sync status versions for conditional GETs
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+Existing restaurants start at version 0. Adding a column with a constant
+default doesn't rewrite the table on PostgreSQL 11+.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ["menu_version", "sync_version"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("restaurants")}
+    for name in COLUMNS:
+        if name not in existing:
+            op.add_column("restaurants", sa.Column(name, sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("restaurants") as batch_op:
+        for name in COLUMNS:
+            batch_op.drop_column(name)
@@ -0,0 +1,57 @@
+"""Hourly action rollups for audit statistics
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+Backfills the rollup from action_history. When create_tables() already
+created the table and the application has been writing to it, only the
+hours before its first bucket are backfilled.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Hour truncation and JSON access differ per database; on SQLite the bucket text
+# must match the format SQLAlchemy stores DateTime values in, or comparisons break
+BACKFILL_EXPRESSIONS = {
+    "postgresql": ("date_trunc('hour', timestamp)", "action_details->>'platform'"),
+    "sqlite": ("strftime('%Y-%m-%d %H:00:00.000000', timestamp)", "json_extract(action_details, '$.platform')"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if "action_rollups" not in sa.inspect(bind).get_table_names():
+        op.create_table(
+            "action_rollups",
+            sa.Column("bucket", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("action_type", sa.String(100), primary_key=True),
+            sa.Column("result", sa.String(20), primary_key=True),
+            sa.Column("platform", sa.String(50), primary_key=True),
+            sa.Column("count", sa.BigInteger(), nullable=False),
+        )
+
+    hour, platform = BACKFILL_EXPRESSIONS[bind.dialect.name]
+    first_bucket = bind.execute(sa.text("SELECT MIN(bucket) FROM action_rollups")).scalar()
+    before = f"WHERE {hour} < :first_bucket" if first_bucket is not None else ""
+    op.execute(sa.text(
+        f"INSERT INTO action_rollups (bucket, action_type, result, platform, count) "
+        f"SELECT {hour}, action_type, COALESCE(result, ''), COALESCE({platform}, ''), COUNT(*) "
+        f"FROM action_history {before} "
+        f"GROUP BY {hour}, action_type, COALESCE(result, ''), COALESCE({platform}, '')"
+    ).bindparams(**({"first_bucket": first_bucket} if first_bucket is not None else {})))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("action_rollups")
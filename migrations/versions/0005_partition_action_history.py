@@ -0,0 +1,116 @@
+"""Partition action_history by month (PostgreSQL)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+The table is rebuilt as a range-partitioned table with one partition per
+month, from the oldest row to AUDIT_PARTITIONS_AHEAD months ahead, plus a
+default partition as a safety net. Existing rows are copied over in the
+migration transaction, so schedule it with the audit writer paused on large
+tables. The primary key becomes (id, timestamp), since a partitioned table's
+keys must include the partition column. Other databases keep the plain table.
+"""
+import os
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = """
+    id INTEGER NOT NULL DEFAULT nextval('{sequence}'),
+    action_type VARCHAR(100) NOT NULL,
+    entity_type VARCHAR(50),
+    entity_id INTEGER,
+    user_id VARCHAR(100),
+    action_details JSON,
+    result VARCHAR(20),
+    error_message TEXT,
+    timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+"""
+COLUMN_NAMES = "id, action_type, entity_type, entity_id, user_id, action_details, result, error_message"
+
+INDEXES = [
+    ("ix_action_history_id", ["id"]),
+    ("ix_action_history_timestamp", ["timestamp"]),
+    ("ix_action_history_action_entity", ["action_type", "entity_type", "entity_id", "timestamp"]),
+    ("ix_action_history_entity", ["entity_type", "entity_id", "timestamp"]),
+]
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _is_partitioned(bind) -> bool:
+    return bind.execute(sa.text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('action_history')"
+    )).scalar() or False
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or _is_partitioned(bind):
+        return
+
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('action_history', 'id')")).scalar()
+    oldest = bind.execute(sa.text("SELECT MIN(timestamp) FROM action_history")).scalar()
+
+    op.execute("ALTER TABLE action_history RENAME TO action_history_unpartitioned")
+    op.execute(
+        f"CREATE TABLE action_history ({COLUMNS.format(sequence=sequence)}, PRIMARY KEY (id, timestamp)) "
+        f"PARTITION BY RANGE (timestamp)"
+    )
+
+    now = datetime.utcnow()
+    month = (oldest or now).replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+    last = _add_months(now.replace(day=1, hour=0, minute=0, second=0, microsecond=0),
+                       int(os.getenv("AUDIT_PARTITIONS_AHEAD", "3")))
+    while month <= last:
+        following = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE action_history_{month:%Y_%m} PARTITION OF action_history "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00+00') TO ('{following:%Y-%m-%d} 00:00+00')"
+        )
+        month = following
+    op.execute("CREATE TABLE action_history_default PARTITION OF action_history DEFAULT")
+
+    op.execute(
+        f"INSERT INTO action_history ({COLUMN_NAMES}, timestamp) "
+        f"SELECT {COLUMN_NAMES}, COALESCE(timestamp, now()) FROM action_history_unpartitioned"
+    )
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY action_history.id")
+    # Dropping the old table frees its index names for the partitioned ones
+    op.execute("DROP TABLE action_history_unpartitioned")
+    for name, columns in INDEXES:
+        op.create_index(name, "action_history", columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _is_partitioned(bind):
+        return
+
+    sequence = bind.execute(sa.text("SELECT pg_get_serial_sequence('action_history', 'id')")).scalar()
+    op.execute("ALTER TABLE action_history RENAME TO action_history_partitioned")
+    op.execute(f"CREATE TABLE action_history ({COLUMNS.format(sequence=sequence)}, PRIMARY KEY (id))")
+    op.execute(
+        f"INSERT INTO action_history ({COLUMN_NAMES}, timestamp) "
+        f"SELECT {COLUMN_NAMES}, timestamp FROM action_history_partitioned"
+    )
+    op.execute(f"ALTER SEQUENCE {sequence} OWNED BY action_history.id")
+    op.execute("DROP TABLE action_history_partitioned CASCADE")
+    for name, columns in INDEXES:
+        op.create_index(name, "action_history", columns)
+    op.execute("ALTER TABLE action_history ALTER COLUMN timestamp DROP NOT NULL")
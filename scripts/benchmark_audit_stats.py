@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Time 90-day audit statistics: two COUNT(*) scans vs one aggregate pass vs the hourly rollup
+
+Builds a scratch database at revision 0003 (before action_rollups), seeds
+action_history with sync and menu actions spread over the period, times the
+raw queries, then upgrades to head (which backfills the rollup) and times
+AuditStatsService.stats.
+
+Usage: python scripts/benchmark_audit_stats.py [--rows 1000000] [--days 90] [--runs 10]
+       [--database-url sqlite:////tmp/foodflow_audit_bench.db]
+
+Only point --database-url at a scratch database: its tables are dropped first.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), "src"))
+from migrate import migrate
+from app.services.audit_stats import AuditStatsService
+
+PLATFORMS = ["uber_eats", "deliveroo", "just_eat"]
+ACTIONS = ["platform_sync"] * 6 + ["menu_add_items", "menu_bulk_update", "config_update"]
+
+def seed(engine, rows: int, days: int):
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    history = metadata.tables["action_history"]
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        for start in range(0, rows, 50000):
+            batch = []
+            for _ in range(start, min(rows, start + 50000)):
+                action_type = rng.choice(ACTIONS)
+                details = {"platform": rng.choice(PLATFORMS)} if action_type == "platform_sync" else {}
+                batch.append({
+                    "action_type": action_type,
+                    "entity_type": "restaurant",
+                    "entity_id": rng.randint(1, 1000),
+                    "user_id": "system",
+                    "action_details": json.dumps(details),
+                    "result": "success" if rng.random() > 0.08 else "failed",
+                    "timestamp": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                })
+            conn.execute(history.insert(), batch)
+
+def timed(label: str, fn, runs: int):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    elapsed = (time.perf_counter() - start) / runs * 1000
+    print(f"  {label:<45} {elapsed:>10.2f} ms")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", default="sqlite:////tmp/foodflow_audit_bench.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    print(f"📦 Building schema at revision 0003 at {args.database_url}...")
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    metadata.drop_all(bind=engine)
+    migrate("0003", args.database_url)
+
+    print(f"🌱 Seeding {args.rows} audit rows over {args.days} days...")
+    seed(engine, args.rows, args.days)
+    since = datetime.utcnow() - timedelta(days=args.days)
+    params = {"since": since}
+
+    print(f"\n⏱️  Stats over {args.days} days (avg over {args.runs} runs)")
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        timed("before: two COUNT(*) queries", lambda: (
+            conn.execute(text("SELECT COUNT(*) FROM action_history WHERE timestamp >= :since"), params).scalar(),
+            conn.execute(text("SELECT COUNT(*) FROM action_history WHERE timestamp >= :since "
+                              "AND result = 'success'"), params).scalar(),
+        ), args.runs)
+        timed("single pass: one aggregate over action_history", lambda: conn.execute(text(
+            "SELECT COUNT(*), SUM(CASE WHEN result = 'success' THEN 1 ELSE 0 END) "
+            "FROM action_history WHERE timestamp >= :since"
+        ), params).one(), args.runs)
+
+    print("\n⬆️  Applying migrations (creates and backfills action_rollups)...")
+    start = time.perf_counter()
+    migrate("head", args.database_url)
+    print(f"   migrated in {time.perf_counter() - start:.1f}s")
+
+    session = sessionmaker(bind=engine)()
+    service = AuditStatsService(session)
+    stats = timed("after: rollup + partial-hour edges", lambda: service.stats(since), args.runs)
+    series = timed("after: daily series by platform", lambda: service.series(
+        since, interval="day", group_by="platform"
+    ), args.runs)
+    session.close()
+
+    print(f"\n📊 {stats['total_actions']} actions, {stats['success_rate']}% successful, "
+          f"{len(series)} daily points")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Show query plans and timings for the hot lookups before and after migration 0002
+
+Builds a scratch database at the baseline schema (0001), seeds it with
+realistic row counts, explains and times the queries the API and sync paths
+run, then upgrades to head and repeats them.
+
+Usage: python scripts/benchmark_query_plans.py [--restaurants 1000] [--items-per-restaurant 100]
+       [--audit-rows 300000] [--database-url sqlite:////tmp/foodflow_bench.db]
+
+Only point --database-url at a scratch database: its tables are dropped first.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from migrate import migrate
+
+PLATFORMS = ["uber_eats", "deliveroo", "just_eat"]
+CATEGORIES = ["Starters", "Mains", "Desserts", "Drinks", "Sides", None]
+ACTION_TYPES = ["sync", "menu_update", "config_change", "restaurant_update"]
+ENTITY_TYPES = ["restaurant", "menu_item", "config"]
+
+QUERIES = [
+    ("Sync: load a restaurant's menu",
+     "SELECT * FROM menu_items WHERE restaurant_id = :restaurant_id"),
+    ("Menu page: default category/name order",
+     "SELECT * FROM menu_items WHERE restaurant_id = :restaurant_id "
+     "ORDER BY coalesce(category, ''), name, id LIMIT 51"),
+    ("Menu page: price range, price order",
+     "SELECT * FROM menu_items WHERE restaurant_id = :restaurant_id AND price >= 5 AND price <= 15 "
+     "ORDER BY price, id LIMIT 51"),
+    ("Sync status: one platform",
+     "SELECT * FROM platform_syncs WHERE restaurant_id = :restaurant_id AND platform = 'deliveroo'"),
+    ("Audit history: action and entity filters",
+     "SELECT * FROM action_history WHERE timestamp >= :since AND action_type = 'sync' "
+     "AND entity_type = 'restaurant' AND entity_id = :restaurant_id ORDER BY timestamp DESC LIMIT 100"),
+]
+
+def reset_database(engine):
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    metadata.drop_all(bind=engine)
+
+def seed(engine, restaurants: int, items_per_restaurant: int, audit_rows: int):
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(metadata.tables["restaurants"].insert(), [
+            {"id": i, "name": f"Restaurant {i}", "location": "Paris"} for i in range(1, restaurants + 1)
+        ])
+        # Interleave restaurants so each one's items are spread across the table, as in production
+        conn.execute(metadata.tables["menu_items"].insert(), [
+            {
+                "restaurant_id": restaurant_id,
+                "name": f"Item {n}",
+                "price": round(rng.uniform(2, 40), 2),
+                "category": rng.choice(CATEGORIES),
+                "is_available": rng.random() > 0.1,
+            }
+            for n in range(items_per_restaurant)
+            for restaurant_id in range(1, restaurants + 1)
+        ])
+        conn.execute(metadata.tables["platform_syncs"].insert(), [
+            {"restaurant_id": restaurant_id, "platform": platform, "sync_status": "success", "last_sync": now}
+            for restaurant_id in range(1, restaurants + 1)
+            for platform in PLATFORMS
+        ])
+        history = metadata.tables["action_history"]
+        for start in range(0, audit_rows, 50000):
+            conn.execute(history.insert(), [
+                {
+                    "action_type": rng.choice(ACTION_TYPES),
+                    "entity_type": rng.choice(ENTITY_TYPES),
+                    "entity_id": rng.randint(1, restaurants),
+                    "user_id": "system",
+                    "result": "success",
+                    "timestamp": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+                }
+                for _ in range(start, min(audit_rows, start + 50000))
+            ])
+
+def explain(conn, sql: str, params: dict) -> str:
+    if conn.dialect.name == "postgresql":
+        rows = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)
+        return "\n".join(row[0] for row in rows)
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)
+    return "\n".join(row[-1] for row in rows)
+
+def run_queries(engine, restaurants: int, runs: int = 50) -> dict:
+    rng = random.Random(7)
+    since = datetime.utcnow() - timedelta(days=7)
+    timings = {}
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        for label, sql in QUERIES:
+            params = {"restaurant_id": rng.randint(1, restaurants), "since": since}
+            print(f"\n  {label}")
+            for line in explain(conn, sql, params).splitlines():
+                print(f"    {line}")
+
+            start = time.perf_counter()
+            for _ in range(runs):
+                params["restaurant_id"] = rng.randint(1, restaurants)
+                conn.execute(text(sql), params).fetchall()
+            timings[label] = (time.perf_counter() - start) / runs * 1000
+            print(f"    avg {timings[label]:.2f}ms over {runs} runs")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--items-per-restaurant", type=int, default=100)
+    parser.add_argument("--audit-rows", type=int, default=300000)
+    parser.add_argument("--database-url", default="sqlite:////tmp/foodflow_bench.db")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    print(f"📦 Building baseline schema at {args.database_url}...")
+    reset_database(engine)
+    migrate("0001", args.database_url)
+
+    print(f"🌱 Seeding {args.restaurants} restaurants, {args.restaurants * args.items_per_restaurant} menu items, "
+          f"{args.audit_rows} audit rows...")
+    start = time.perf_counter()
+    seed(engine, args.restaurants, args.items_per_restaurant, args.audit_rows)
+    print(f"   seeded in {time.perf_counter() - start:.1f}s")
+
+    print("\n🔍 Before (baseline schema):")
+    before = run_queries(engine, args.restaurants)
+
+    print("\n⬆️  Applying migrations...")
+    start = time.perf_counter()
+    migrate("head", args.database_url)
+    print(f"   migrated in {time.perf_counter() - start:.1f}s")
+
+    print("\n🔍 After (head):")
+    after = run_queries(engine, args.restaurants)
+
+    print("\n📊 Summary (avg ms per query)")
+    print(f"  {'query':<45} {'before':>10} {'after':>10} {'speedup':>9}")
+    for label, _ in QUERIES:
+        speedup = before[label] / after[label] if after[label] else float("inf")
+        print(f"  {label:<45} {before[label]:>10.2f} {after[label]:>10.2f} {speedup:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
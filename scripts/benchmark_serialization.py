@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Compare load and serialization time and payload size for a 1,000-item menu
+
+Before: ORM objects rendered by FastAPI's generic encoder (jsonable_encoder +
+JSONResponse), as the menu endpoints did without response models.
+After: column-projected rows validated and dumped by the MenuItemPage
+response model, and a sparse ?fields= response.
+
+Usage: python scripts/benchmark_serialization.py [--items 1000] [--runs 50]
+       [--fields id,name,price,is_available] [--database-url sqlite:////tmp/foodflow_serialization.db]
+
+Only point --database-url at a scratch database: its tables are dropped first.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.api.schemas import MenuItemPage
+from app.core import serialization
+from app.core.serialization import sparse_page
+from app.models.restaurant import Base, Restaurant, MenuItem
+
+CATEGORIES = ["Starters", "Mains", "Desserts", "Drinks", "Sides"]
+ALLERGENS = ["gluten", "nuts", "dairy", "eggs", "soy"]
+
+def seed(session, items: int):
+    rng = random.Random(42)
+    session.add(Restaurant(id=1, name="Benchmark Bistro", location="Paris"))
+    session.flush()
+    session.execute(MenuItem.__table__.insert(), [
+        {
+            "restaurant_id": 1,
+            "name": f"Dish {n}",
+            "description": f"House special number {n} with seasonal vegetables and a light sauce",
+            "price": round(rng.uniform(2, 40), 2),
+            "category": rng.choice(CATEGORIES),
+            "is_available": rng.random() > 0.1,
+            "image_url": f"https://cdn.example.com/menu/{n}.jpg",
+            "allergens": rng.sample(ALLERGENS, 2),
+            "nutritional_info": {"calories": rng.randint(100, 900), "protein_g": rng.randint(1, 50)},
+        }
+        for n in range(items)
+    ])
+    session.commit()
+
+def timed(fn, runs: int):
+    result = fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return result, (time.perf_counter() - start) / runs * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--fields", default="id,name,price,is_available")
+    parser.add_argument("--database-url", default="sqlite:////tmp/foodflow_serialization.db")
+    args = parser.parse_args()
+    fields = args.fields.split(",")
+
+    engine = create_engine(args.database_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    print(f"🌱 Seeding a {args.items}-item menu at {args.database_url}...")
+    seed(session, args.items)
+
+    def load_orm():
+        session.expunge_all()
+        return session.query(MenuItem).filter(MenuItem.restaurant_id == 1).all()
+
+    def load_rows(columns=None):
+        table_columns = [c for c in MenuItem.__table__.columns if columns is None or c.name in columns]
+        return session.execute(select(*table_columns).where(MenuItem.restaurant_id == 1)).all()
+
+    orm_items, orm_load_ms = timed(load_orm, args.runs)
+    rows, rows_load_ms = timed(load_rows, args.runs)
+    sparse_rows, sparse_load_ms = timed(lambda: load_rows(fields), args.runs)
+
+    def page(items):
+        return {"items": items, "next_cursor": None, "limit": len(items)}
+
+    cases = [
+        ("before: ORM + jsonable_encoder", orm_load_ms,
+         lambda: JSONResponse(jsonable_encoder(page(orm_items))).body),
+        ("after: rows + MenuItemPage", rows_load_ms,
+         lambda: MenuItemPage.model_validate(page(rows)).model_dump_json().encode()),
+        (f"after: ?fields={args.fields}", sparse_load_ms,
+         lambda: sparse_page(page(sparse_rows), fields).body),
+    ]
+    if serialization.orjson is not None:
+        def stdlib_sparse():
+            orjson, serialization.orjson = serialization.orjson, None
+            try:
+                return sparse_page(page(sparse_rows), fields).body
+            finally:
+                serialization.orjson = orjson
+        cases.append((f"after: ?fields= without orjson", sparse_load_ms, stdlib_sparse))
+
+    print(f"\n📊 {args.items} menu items, avg over {args.runs} runs")
+    print(f"  {'response':<45} {'load ms':>9} {'encode ms':>10} {'total ms':>9} {'bytes':>9}")
+    baseline = None
+    for label, load_ms, render in cases:
+        body, encode_ms = timed(render, args.runs)
+        total = load_ms + encode_ms
+        baseline = baseline or total
+        print(f"  {label:<45} {load_ms:>9.2f} {encode_ms:>10.2f} {total:>9.2f} {len(body):>9}"
+              f"  ({baseline / total:.1f}x)")
+
+    session.close()
+
+if __name__ == "__main__":
+    main()
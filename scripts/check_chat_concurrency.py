@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Check that concurrent chat sessions do not serialize behind a slow LLM call"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# Make the application package importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# Credentials come from the environment so the bot never needs a real database
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+for key in ["OPENAI_API_KEY", "UBER_EATS_CLIENT_ID", "UBER_EATS_CLIENT_SECRET", "UBER_EATS_STORE_ID",
+            "DELIVEROO_API_KEY", "DELIVEROO_RESTAURANT_ID", "JUST_EAT_API_KEY", "JUST_EAT_TENANT_ID"]:
+    os.environ.setdefault(key, "check")
+
+LLM_LATENCY = 1.0
+SESSIONS = 5
+
+class SlowCompletions:
+    """Stands in for the OpenAI endpoint with a fixed response latency"""
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(LLM_LATENCY)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Happy to help!"))])
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    """Return the longest time the event loop was unable to run a 50ms ticker"""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.05)
+        max_lag = max(max_lag, time.perf_counter() - start - 0.05)
+    return max_lag
+
+async def run_sessions():
+    from app.core.database import SessionLocal
+    from app.services.ai_bot import RestaurantAIBot
+
+    async def chat_session(index: int):
+        db = SessionLocal()
+        try:
+            bot = await asyncio.to_thread(RestaurantAIBot, db)
+            bot.async_openai_client = SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+            return await bot.aprocess_message(f"Hello from session {index}", restaurant_id=1)
+        finally:
+            db.close()
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(chat_session(i) for i in range(SESSIONS)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    return responses, elapsed, await lag_task
+
+def check_chat_concurrency():
+    """Run SESSIONS chats at once; they must finish in about one LLM latency, not SESSIONS of them"""
+    print(f"Running {SESSIONS} concurrent chat sessions against a {LLM_LATENCY:.1f}s LLM...")
+    responses, elapsed, max_lag = asyncio.run(run_sessions())
+
+    ok = True
+    if any(response.get("type") != "chat" for response in responses):
+        print(f"❌ Unexpected bot responses: {responses}")
+        ok = False
+
+    serialized_time = SESSIONS * LLM_LATENCY
+    if elapsed < serialized_time / 2:
+        print(f"✅ Sessions ran concurrently: {elapsed:.2f}s total (serialized would be {serialized_time:.1f}s)")
+    else:
+        print(f"❌ Sessions serialized: {elapsed:.2f}s total (serialized would be {serialized_time:.1f}s)")
+        ok = False
+
+    if max_lag < 0.25:
+        print(f"✅ Event loop stayed responsive (max lag {max_lag * 1000:.0f}ms)")
+    else:
+        print(f"❌ Event loop blocked for {max_lag * 1000:.0f}ms")
+        ok = False
+
+    return ok
+
+if __name__ == "__main__":
+    success = check_chat_concurrency()
+    sys.exit(0 if success else 1)
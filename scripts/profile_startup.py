@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Report what importing the API costs, module by module, in a fresh interpreter
+
+Runs `python -X importtime -c "import app.api.main"`, then prints the total,
+the slowest top-level packages and app modules (cumulative time including
+what they import), and whether the heavy optional stacks were loaded at
+import. With --startup, it also times the startup database work: the full
+path (database creation + create_all) against fast start (FAST_START=true).
+
+Usage: python scripts/profile_startup.py [--module app.api.main] [--top 15] [--runs 3]
+       [--startup] [--database-url sqlite:////tmp/foodflow_startup.db]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "src")
+
+HEAVY_MODULES = ["openai", "PIL.Image", "cv2", "pytesseract", "psycopg2"]
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def run_importtime(module: str, env: dict):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ import {module} failed:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return modules
+
+def run_startup(env: dict, fast: bool) -> float:
+    code = (
+        "import time; from app.core.database import init_database; "
+        "start = time.perf_counter(); init_database(); "
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True,
+        env={**env, "FAST_START": "true" if fast else "false"}
+    )
+    if result.returncode != 0:
+        sys.exit(f"❌ startup failed:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.api.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--startup", action="store_true", help="also time startup database work")
+    parser.add_argument("--database-url", default="sqlite:////tmp/foodflow_startup.db")
+    args = parser.parse_args()
+
+    env = {**os.environ, "DATABASE_URL": args.database_url, "PYTHONPATH": SRC_DIR}
+    env.setdefault("OPENAI_API_KEY", "profile")
+
+    # Best run: the first one also pays for writing .pyc files
+    runs = [run_importtime(args.module, env) for _ in range(args.runs)]
+    modules = min(runs, key=lambda run: run[args.module][1])
+    total_ms = modules[args.module][1] / 1000
+    print(f"⏱️  import {args.module}: {total_ms:.0f} ms (best of {args.runs})")
+
+    packages = {name: times for name, times in modules.items() if "." not in name and name != args.module}
+    print(f"\n📦 Slowest top-level packages (cumulative)")
+    for name, (_, cumulative_us, _) in sorted(packages.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {name:<45} {cumulative_us / 1000:>9.1f} ms  {cumulative_us / 1000 / total_ms:>5.0%}")
+
+    app_modules = {name: times for name, times in modules.items() if name.startswith("app.")}
+    print(f"\n🧩 Slowest app modules (self / cumulative)")
+    for name, (self_us, cumulative_us, _) in sorted(app_modules.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {name:<45} {self_us / 1000:>9.1f} ms {cumulative_us / 1000:>9.1f} ms")
+
+    print(f"\n🏋️  Heavy optional stacks")
+    for name in HEAVY_MODULES:
+        if name in modules:
+            print(f"  {name:<45} loaded at import ({modules[name][1] / 1000:.1f} ms)")
+        else:
+            print(f"  {name:<45} deferred")
+
+    if args.startup:
+        print(f"\n🚀 Startup database work at {args.database_url} (median of {args.runs})")
+        subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, "migrate.py")], env=env,
+                       capture_output=True, check=True)
+        full = statistics.median(run_startup(env, fast=False) for _ in range(args.runs))
+        fast = statistics.median(run_startup(env, fast=True) for _ in range(args.runs))
+        print(f"  {'database creation + create_all':<45} {full:>9.1f} ms")
+        print(f"  {'fast start (schema at migrations head)':<45} {fast:>9.1f} ms")
+
+if __name__ == "__main__":
+    main()
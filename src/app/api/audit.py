@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal, get_async_db, get_async_engine
 from app.models.audit import ActionHistory
+from app.services.audit_export import EXPORT_BATCH_SIZE, MEDIA_TYPES, export_chunks, export_filename, history_query
+from app.services.audit_stats import AuditStatsService
+from app.services.sync_payloads import sync_payload_store
 from typing import Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter(prefix="/audit", tags=["Audit"])
 
@@ -12,28 +16,19 @@ async def get_action_history(
     action_type: Optional[str] = Query(None),
     entity_type: Optional[str] = Query(None),
     entity_id: Optional[int] = Query(None),
-    days: int = Query(7, description="Number of days to look back"),
-    limit: int = Query(100, description="Maximum number of records"),
-    db: Session = Depends(get_db)
+    days: int = Query(7, ge=1, description="Number of days to look back"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get platform action history"""
     
-    query = db.query(ActionHistory)
-    
-    # Filter by date
+    # Filter by date; a plain range on the partition key lets PostgreSQL
+    # skip every monthly partition older than since_date
     since_date = datetime.utcnow() - timedelta(days=days)
-    query = query.filter(ActionHistory.timestamp >= since_date)
-    
-    # Apply filters
-    if action_type:
-        query = query.filter(ActionHistory.action_type == action_type)
-    if entity_type:
-        query = query.filter(ActionHistory.entity_type == entity_type)
-    if entity_id:
-        query = query.filter(ActionHistory.entity_id == entity_id)
+    query = history_query(since_date, action_type=action_type, entity_type=entity_type, entity_id=entity_id)
     
     # Order and limit
-    records = query.order_by(ActionHistory.timestamp.desc()).limit(limit).all()
+    records = (await db.scalars(query.order_by(ActionHistory.timestamp.desc()).limit(limit))).all()
     
     return {
         "history": [{
@@ -50,29 +45,91 @@ async def get_action_history(
         "count": len(records)
     }
 
+def _utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, as action_history timestamps are written"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+@router.get("/export")
+async def export_action_history(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(False, alias="gzip", description="Gzip the file"),
+    since: Optional[datetime] = Query(None, description="Start of the range (default: days ago)"),
+    until: Optional[datetime] = Query(None, description="End of the range, exclusive (default: now)"),
+    days: int = Query(30, ge=1, description="Number of days to look back when since is not given"),
+    action_type: Optional[str] = Query(None),
+    entity_type: Optional[str] = Query(None),
+    entity_id: Optional[int] = Query(None)
+):
+    """Stream action history as NDJSON or CSV, oldest first, without a row limit"""
+    
+    since_date = _utc(since) or datetime.utcnow() - timedelta(days=days)
+    until_date = _utc(until)
+    query = (
+        history_query(since_date, until_date, action_type, entity_type, entity_id,
+                      columns=ActionHistory.__table__.columns)
+        .order_by(ActionHistory.timestamp, ActionHistory.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    
+    async def body():
+        # The session lives as long as the stream: rows come from a server-side
+        # cursor one batch at a time, so memory stays flat whatever the range
+        async with AsyncSessionLocal(bind=get_async_engine()) as db:
+            result = await db.stream(query)
+            async for chunk in export_chunks(result, format, compress):
+                yield chunk
+    
+    filename = export_filename(format, compress, since_date, until_date)
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip" if compress else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/sync-payloads/{payload_hash}")
+def get_sync_payload(payload_hash: str):
+    """Full platform response for a sync audit entry, by the payload_hash in its summary"""
+    
+    payload = sync_payload_store.get(payload_hash)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Payload not stored or past retention")
+    return payload
+
 @router.get("/stats")
 async def get_audit_stats(
     days: int = Query(7),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get audit statistics"""
     
     since_date = datetime.utcnow() - timedelta(days=days)
+    stats = await db.run_sync(lambda session: AuditStatsService(session).stats(since_date))
     
-    # Total actions
-    total_actions = db.query(ActionHistory).filter(ActionHistory.timestamp >= since_date).count()
-    
-    # Success rate
-    successful_actions = db.query(ActionHistory).filter(
-        ActionHistory.timestamp >= since_date,
-        ActionHistory.result == "success"
-    ).count()
+    return {**stats, "period_days": days}
+
+@router.get("/stats/series")
+async def get_audit_series(
+    days: int = Query(7, ge=1, le=366),
+    interval: str = Query("hour", pattern="^(hour|day)$"),
+    group_by: str = Query("result", pattern="^(result|action_type|platform)$"),
+    action_type: Optional[str] = Query(None),
+    result: Optional[str] = Query(None),
+    platform: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Action counts per hour or day, split by result, action type or platform"""
     
-    success_rate = (successful_actions / total_actions * 100) if total_actions > 0 else 0
+    since_date = datetime.utcnow() - timedelta(days=days)
+    points = await db.run_sync(lambda session: AuditStatsService(session).series(
+        since_date, interval=interval, group_by=group_by,
+        action_type=action_type, result=result, platform=platform
+    ))
     
     return {
-        "total_actions": total_actions,
-        "successful_actions": successful_actions,
-        "success_rate": round(success_rate, 2),
-        "period_days": days
-    }
\ No newline at end of file
+        "interval": interval,
+        "group_by": group_by,
+        "period_days": days,
+        "series": points
+    }
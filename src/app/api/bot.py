@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.services.ai_bot import RestaurantAIBot
@@ -20,8 +21,8 @@ class AddItemsRequest(BaseModel):
 @router.post("/chat")
 async def chat_with_bot(chat: ChatMessage, db: Session = Depends(get_db)):
     """Chat with AI bot for restaurant management"""
-    bot = RestaurantAIBot(db)
-    response = bot.process_message(chat.message, chat.restaurant_id)
+    bot = await run_in_threadpool(RestaurantAIBot, db)
+    response = await bot.aprocess_message(chat.message, chat.restaurant_id)
     return response
 
 @router.post("/scan-menu")
@@ -64,14 +65,14 @@ async def add_scanned_items(request: AddItemsRequest, db: Session = Depends(get_
     return result
 
 @router.post("/sync-platforms")
-async def sync_platforms(chat: ChatMessage, db: Session = Depends(get_db)):
+def sync_platforms(chat: ChatMessage, db: Session = Depends(get_db)):
     """Sync menu to delivery platforms via bot"""
     bot = RestaurantAIBot(db)
     response = bot._handle_sync_request(chat.message, chat.restaurant_id)
     return response
 
 @router.get("/menu/{restaurant_id}")
-async def get_menu_via_bot(restaurant_id: int, db: Session = Depends(get_db)):
+def get_menu_via_bot(restaurant_id: int, db: Session = Depends(get_db)):
     """Get current menu via bot interface"""
     bot = RestaurantAIBot(db)
     response = bot._handle_show_menu(restaurant_id)
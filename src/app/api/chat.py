@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocketState
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.services.ai_bot import RestaurantAIBot
+from app.services.intent_router import classify_intent, INTENT_CHAT
 from pydantic import BaseModel
 from typing import Optional, List, Dict
+import asyncio
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["AI Chat"])
 
@@ -35,12 +42,81 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+async def _receive_messages(websocket: WebSocket, inbox: asyncio.Queue, cancel_event: asyncio.Event):
+    """Read client frames; "cancel" frames interrupt the current stream, others are queued"""
+    try:
+        while True:
+            data = await websocket.receive_text()
+            message_data = json.loads(data)
+            if message_data.get("type") == "cancel":
+                cancel_event.set()
+            else:
+                inbox.put_nowait(message_data)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Disconnect cancels any in-flight stream and stops the handler loop
+        cancel_event.set()
+        inbox.put_nowait(None)
+
+async def _stream_chat_response(websocket: WebSocket, bot: RestaurantAIBot, user_message: str,
+                                restaurant_id: int, cancel_event: asyncio.Event):
+    """Forward model tokens as they arrive, then send the structured final message"""
+    routing = bot.route_chat(user_message)
+    await websocket.send_text(json.dumps({"type": "stream_start", "user_message": user_message, "model": routing["model"]}))
+    
+    async def forward_tokens() -> str:
+        chunks = []
+        async for delta in bot.stream_chat(user_message, restaurant_id, routing):
+            chunks.append(delta)
+            await websocket.send_text(json.dumps({"type": "stream_token", "delta": delta}))
+        return "".join(chunks)
+    
+    stream_task = asyncio.create_task(forward_tokens())
+    cancel_task = asyncio.create_task(cancel_event.wait())
+    await asyncio.wait({stream_task, cancel_task}, return_when=asyncio.FIRST_COMPLETED)
+    
+    if not stream_task.done():
+        # Client cancelled or disconnected: stop the model call mid-stream
+        stream_task.cancel()
+        try:
+            await stream_task
+        except (asyncio.CancelledError, Exception):
+            pass
+        logger.info("Chat stream cancelled for restaurant %s", restaurant_id)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.send_text(json.dumps({"type": "stream_cancelled", "user_message": user_message}))
+        return
+    
+    cancel_task.cancel()
+    try:
+        ai_response = stream_task.result()
+        final_msg = {
+            "user_message": user_message,
+            **bot.chat_response(ai_response),
+            "type": "stream_end",
+            "response_type": "chat",
+            "routing": routing
+        }
+    except Exception as e:
+        logger.error("Error streaming chat response: %s", str(e))
+        final_msg = {
+            "type": "error",
+            "user_message": user_message,
+            "response": "Sorry, I encountered an error processing your request. Please try again.",
+            "error": str(e)
+        }
+    await websocket.send_text(json.dumps(final_msg))
+
 @router.websocket("/ws/{restaurant_id}")
 async def websocket_endpoint(websocket: WebSocket, restaurant_id: int):
     await manager.connect(websocket, restaurant_id)
     
     db = next(get_db())
-    bot = RestaurantAIBot(db)
+    bot = await run_in_threadpool(RestaurantAIBot, db)
+    inbox: asyncio.Queue = asyncio.Queue()
+    cancel_event = asyncio.Event()
+    reader_task = None
     
     try:
         # Send welcome message
@@ -55,14 +131,23 @@ async def websocket_endpoint(websocket: WebSocket, restaurant_id: int):
         }
         await manager.send_message(welcome_msg, restaurant_id)
         
+        reader_task = asyncio.create_task(_receive_messages(websocket, inbox, cancel_event))
+        
         while True:
-            data = await websocket.receive_text()
-            message_data = json.loads(data)
+            message_data = await inbox.get()
+            if message_data is None:
+                break
+            cancel_event.clear()
             
             user_message = message_data.get("message", "")
             
+            # Open-ended chat can be streamed token by token; commands are answered in one message
+            if message_data.get("stream") and classify_intent(user_message)["intent"] == INTENT_CHAT:
+                await _stream_chat_response(websocket, bot, user_message, restaurant_id, cancel_event)
+                continue
+            
             # Process with AI bot
-            bot_response = bot.process_message(user_message, restaurant_id)
+            bot_response = await bot.aprocess_message(user_message, restaurant_id)
             
             # Send response back
             response_msg = {
@@ -73,15 +158,18 @@ async def websocket_endpoint(websocket: WebSocket, restaurant_id: int):
             await manager.send_message(response_msg, restaurant_id)
             
     except WebSocketDisconnect:
-        manager.disconnect(restaurant_id)
+        pass
     finally:
+        if reader_task:
+            reader_task.cancel()
+        manager.disconnect(restaurant_id)
         db.close()
 
 @router.post("/message")
 async def send_message(chat: ChatMessage, db: Session = Depends(get_db)):
     """Send text message to AI bot"""
-    bot = RestaurantAIBot(db)
-    response = bot.process_message(chat.message, chat.restaurant_id)
+    bot = await run_in_threadpool(RestaurantAIBot, db)
+    response = await bot.aprocess_message(chat.message, chat.restaurant_id)
     return response
 
 @router.post("/message-with-image")
@@ -97,22 +185,22 @@ async def send_message_with_image(
     
     try:
         image_data = await file.read()
-        bot = RestaurantAIBot(db)
-        response = bot.process_message(message, restaurant_id, image_data)
+        bot = await run_in_threadpool(RestaurantAIBot, db)
+        response = await bot.aprocess_message(message, restaurant_id, image_data)
         return response
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/add-items")
-async def add_menu_items(request: AddItemsRequest, db: Session = Depends(get_db)):
+def add_menu_items(request: AddItemsRequest, db: Session = Depends(get_db)):
     """Add analyzed menu items to database"""
     bot = RestaurantAIBot(db)
     result = bot.add_menu_items(request.restaurant_id, request.menu_items)
     return result
 
 @router.get("/menu/{restaurant_id}")
-async def get_current_menu(restaurant_id: int, db: Session = Depends(get_db)):
+def get_current_menu(restaurant_id: int, db: Session = Depends(get_db)):
     """Get current menu via chat interface"""
     bot = RestaurantAIBot(db)
     response = bot._handle_show_menu(restaurant_id)
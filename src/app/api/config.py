@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
 from app.services.config_service import ConfigService
 from app.services.audit_service import AuditService
 from pydantic import BaseModel
@@ -14,10 +14,9 @@ class ConfigUpdate(BaseModel):
     description: Optional[str] = None
 
 @router.get("/credentials")
-async def get_api_credentials(db: Session = Depends(get_db)):
+async def get_api_credentials(db: AsyncSession = Depends(get_async_db)):
     """Get all API credentials (masked for security)"""
-    config_service = ConfigService(db)
-    credentials = config_service.get_all_api_credentials()
+    credentials = await db.run_sync(lambda session: ConfigService(session).get_all_api_credentials())
     
     # Mask sensitive values
     masked_credentials = {}
@@ -30,29 +29,35 @@ async def get_api_credentials(db: Session = Depends(get_db)):
     return {"credentials": masked_credentials}
 
 @router.post("/credentials")
-async def update_credential(config: ConfigUpdate, db: Session = Depends(get_db)):
+async def update_credential(config: ConfigUpdate, db: AsyncSession = Depends(get_async_db)):
     """Update API credential"""
-    config_service = ConfigService(db)
-    
-    if config.key not in config_service.api_keys:
-        raise HTTPException(status_code=400, detail="Invalid credential key")
-    
-    config_service.set_config(config.key, config.value, config.description)
-    
-    # Log config change
-    audit_service = AuditService(db)
-    audit_service.log_config_action(config.key)
+    def update(session):
+        config_service = ConfigService(session)
+        
+        if config.key not in config_service.api_keys:
+            raise HTTPException(status_code=400, detail="Invalid credential key")
+        
+        config_service.set_config(config.key, config.value, config.description)
+        
+        # Log config change
+        audit_service = AuditService(session)
+        audit_service.log_config_action(config.key)
+    
+    await db.run_sync(update)
     
     return {"message": f"Credential {config.key} updated successfully"}
 
 @router.get("/status")
-async def get_config_status(db: Session = Depends(get_db)):
+async def get_config_status(db: AsyncSession = Depends(get_async_db)):
     """Get configuration status"""
-    config_service = ConfigService(db)
-    credentials = config_service.get_all_api_credentials()
-    
-    status = {}
-    for key in config_service.api_keys:
-        status[key] = bool(credentials.get(key))
-    
+    def credential_status(session):
+        config_service = ConfigService(session)
+        credentials = config_service.get_all_api_credentials()
+        
+        status = {}
+        for key in config_service.api_keys:
+            status[key] = bool(credentials.get(key))
+        return status
+    
+    status = await db.run_sync(credential_status)
     return {"status": status, "configured_count": sum(status.values())}
\ No newline at end of file
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from app.services.llm_gateway import llm_gateway
+from app.services.llm_usage import usage_tracker
+from app.services.model_router import model_router
+
+router = APIRouter(prefix="/llm", tags=["LLM"])
+
+@router.get("/usage")
+async def get_llm_usage():
+    """Get LLM calls, tokens and latency aggregated per restaurant (this worker, since start)"""
+    return usage_tracker.get_usage()
+
+@router.get("/usage/{restaurant_id}")
+async def get_restaurant_llm_usage(restaurant_id: int):
+    """Get LLM usage for one restaurant, broken down by model and operation"""
+    usage = usage_tracker.get_usage(restaurant_id)
+    restaurants = usage["restaurants"]
+    return {
+        "since": usage["since"],
+        "usage": restaurants[0] if restaurants else {
+            "restaurant_id": restaurant_id, "calls": 0, "errors": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "breakdown": []
+        }
+    }
+
+@router.get("/status")
+async def get_llm_gateway_status():
+    """Get LLM gateway queue state and model routing health"""
+    return {
+        "gateway": llm_gateway.get_status(),
+        "routing": model_router.get_status()
+    }
@@ -1,26 +1,55 @@
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request, Query, UploadFile, File
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
+from starlette.requests import HTTPConnection
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db, create_tables
+from app.core.database import get_db, get_async_db, dispose_async_engine, init_database
 from app.models.restaurant import Restaurant, MenuItem, PlatformSync
 from app.services.sync_service import SyncService
+from app.services.catalog_service import CatalogService
+from app.services.menu_cache import menu_cache
+from app.services.config_service import config_cache
+from app.services.menu_import import MenuImportService, MenuImportError, detect_format
 from app.services.scheduler import scheduler
+from app.services.audit_writer import audit_writer
 from app.api.chat import router as chat_router
 from app.api.config import router as config_router
 from app.api.audit import router as audit_router
-from pydantic import BaseModel
+from app.api.llm import router as llm_router
+from app.core.metrics import render_metrics
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from app.core.etag import make_etag, query_fingerprint, etag_matches, set_etag, not_modified
+from app.services.menu_versions import bump_menu_version, versions_query, get_versions
+from app.core.serialization import InvalidFieldsError, parse_fields, sparse_page
+from app.api.schemas import RestaurantOut, MenuItemOut, RestaurantPage, MenuItemPage
+from pydantic import BaseModel, Field
+import asyncio
+import importlib
 import logging
-from app.core.logging_config import setup_logging
+import os
+import re
+import uuid
+from app.core.logging_config import setup_logging, log_context, restaurant_id_var, platform_var
 
 # Configure logging with datetime stamps
 setup_logging()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="FoodFlow - Restaurant Sync Platform", version="1.0.0")
+async def bind_log_context(connection: HTTPConnection):
+    """Stamp log records with the restaurant and platform the route is about"""
+    restaurant_id = connection.path_params.get("restaurant_id") or connection.query_params.get("restaurant_id")
+    if restaurant_id and str(restaurant_id).isdigit():
+        restaurant_id_var.set(int(restaurant_id))
+    platform = connection.path_params.get("platform") or connection.query_params.get("platform")
+    if platform:
+        platform_var.set(platform)
+
+app = FastAPI(title="FoodFlow - Restaurant Sync Platform", version="1.0.0",
+              dependencies=[Depends(bind_log_context)])
 
 # Add CORS middleware
 app.add_middleware(
@@ -40,12 +69,25 @@ async def catch_invalid_requests(request: Request, call_next):
     except Exception as e:
         # Log the error but don't spam logs with common bot requests
         if "bot" not in request.headers.get("user-agent", "").lower():
-            logger.warning(f"Request error: {str(e)[:100]}")
+            logger.warning("Request error: %s", str(e)[:100])
         return JSONResponse(
             status_code=400,
             content={"detail": "Invalid request"}
         )
 
+REQUEST_ID = re.compile(r"^[\w.-]{1,64}$")
+
+# Outermost middleware: every record logged while serving a request carries its id
+@app.middleware("http")
+async def bind_request_id(request: Request, call_next):
+    request_id = request.headers.get("x-request-id", "")
+    if not REQUEST_ID.match(request_id):
+        request_id = uuid.uuid4().hex[:16]
+    with log_context(request_id=request_id):
+        response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
 # Custom exception handlers
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -68,6 +110,7 @@ app.mount("/static", StaticFiles(directory="."), name="static")
 app.include_router(chat_router)
 app.include_router(config_router)
 app.include_router(audit_router)
+app.include_router(llm_router)
 
 # Pydantic models for API
 class RestaurantCreate(BaseModel):
@@ -90,13 +133,30 @@ class MenuItemCreate(BaseModel):
     allergens: Optional[list] = None
     nutritional_info: Optional[dict] = None
 
+FIELDS_DESCRIPTION = "Comma-separated fields to return for each item, e.g. id,name,price"
+
+class MenuItemFilter(BaseModel):
+    category: Optional[str] = None
+    available: Optional[bool] = None
+    min_price: Optional[float] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+    search: Optional[str] = None
+
+class MenuItemBulkPatch(BaseModel):
+    # Target either explicit item ids or every item matching the filter
+    item_ids: Optional[List[int]] = Field(None, min_length=1, max_length=5000)
+    filter: Optional[MenuItemFilter] = None
+    is_available: Optional[bool] = None
+    price: Optional[float] = Field(None, ge=0)
+
 class SyncRequest(BaseModel):
     restaurant_id: int
     platforms: Optional[List[str]] = None
 
 @app.on_event("startup")
 async def startup_event():
-    create_tables()
+    if not init_database():
+        logger.info("Fast start: schema is at the migrations head, skipped database setup")
     
     # Initialize config from environment variables
     from app.services.config_service import ConfigService
@@ -106,6 +166,21 @@ async def startup_event():
     db.close()
     
     logger.info("Database initialized and configuration synced")
+    
+    # Subscribe to cache invalidations from other processes now, not inside a request
+    await asyncio.to_thread(menu_cache.start)
+    await asyncio.to_thread(config_cache.start)
+    
+    # The OpenAI SDK is imported lazily; load it in the background so the
+    # first chat request doesn't pay for it, without delaying readiness
+    if os.getenv("PRELOAD_AI_STACK", "true").lower() == "true":
+        asyncio.get_running_loop().run_in_executor(None, importlib.import_module, "openai")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Write out buffered audit events before the process exits
+    await asyncio.to_thread(audit_writer.stop)
+    await dispose_async_engine()
 
 @app.get("/")
 async def root():
@@ -131,62 +206,176 @@ async def configuration_page():
     """Serve the configuration management page"""
     return FileResponse("src/templates/configuration.html")
 
-@app.post("/restaurants/")
-async def create_restaurant(restaurant: RestaurantCreate, db: Session = Depends(get_db)):
+@app.post("/restaurants/", response_model=RestaurantOut)
+async def create_restaurant(restaurant: RestaurantCreate, db: AsyncSession = Depends(get_async_db)):
     db_restaurant = Restaurant(**restaurant.dict())
     db.add(db_restaurant)
-    db.commit()
-    db.refresh(db_restaurant)
+    await db.commit()
+    await db.refresh(db_restaurant)
     return db_restaurant
 
-@app.get("/restaurants/")
-async def get_restaurants(db: Session = Depends(get_db)):
-    return db.query(Restaurant).all()
-
-@app.get("/restaurants/{restaurant_id}")
-async def get_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    if not restaurant:
+@app.get("/restaurants/", response_model=RestaurantPage)
+async def get_restaurants(
+    cuisine_type: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, description="Search restaurant names"),
+    sort: str = Query("name", pattern="^(name|id)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List restaurants, one keyset-paginated page at a time"""
+    try:
+        columns = parse_fields(fields, RestaurantOut.model_fields)
+        page = await db.run_sync(
+            lambda session: CatalogService(session).list_restaurants(cuisine_type, q, sort, cursor, limit, columns)
+        )
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return sparse_page(page, columns) if columns else page
+
+@app.get("/restaurants/{restaurant_id}", response_model=RestaurantOut)
+async def get_restaurant(restaurant_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    versions = (await db.execute(versions_query(restaurant_id))).first()
+    if not versions:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    updated = versions.updated_at.timestamp() if versions.updated_at else 0
+    etag = make_etag("restaurant", restaurant_id, versions.menu_version, versions.sync_version, int(updated))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    restaurant = await db.get(Restaurant, restaurant_id)
+    set_etag(response, etag)
     return restaurant
 
-@app.post("/menu-items/")
-async def create_menu_item(item: MenuItemCreate, db: Session = Depends(get_db)):
+@app.post("/menu-items/", response_model=MenuItemOut)
+async def create_menu_item(item: MenuItemCreate, db: AsyncSession = Depends(get_async_db)):
     db_item = MenuItem(**item.dict())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    await db.run_sync(bump_menu_version, item.restaurant_id)
+    await db.commit()
+    await db.refresh(db_item)
     return db_item
 
-@app.get("/menu-items/{restaurant_id}")
-async def get_menu_items(restaurant_id: int, db: Session = Depends(get_db)):
-    return db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
+@app.get("/menu-items/{restaurant_id}", response_model=MenuItemPage)
+async def get_menu_items(
+    restaurant_id: int,
+    request: Request,
+    response: Response,
+    category: Optional[str] = Query(None),
+    available: Optional[bool] = Query(None),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    q: Optional[str] = Query(None, description="Search item names"),
+    sort: str = Query("category", pattern="^(category|name|price|id)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List a restaurant's menu items, one keyset-paginated page at a time
+    
+    The ETag carries the restaurant's menu version, read before the items: a
+    write landing in between can only make the ETag older than the page.
+    """
+    try:
+        columns = parse_fields(fields, MenuItemOut.model_fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    versions = (await db.execute(versions_query(restaurant_id))).first()
+    etag = None
+    if versions:
+        etag = make_etag("menu", restaurant_id, versions.menu_version, query_fingerprint(request))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+    
+    menu = None
+    if CatalogService.menu_page_cacheable(category, available, min_price, max_price, q):
+        menu = await menu_cache.aget_menu(db, restaurant_id)
+    try:
+        page = await db.run_sync(lambda session: CatalogService(session).list_menu_items(
+            restaurant_id, category, available, min_price, max_price, q,
+            sort, order == "desc", cursor, limit, columns, menu
+        ))
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if columns:
+        response = sparse_page(page, columns)
+    if etag:
+        set_etag(response, etag)
+    return response if columns else page
+
+@app.patch("/menu-items/{restaurant_id}/bulk")
+async def bulk_update_menu_items(restaurant_id: int, patch: MenuItemBulkPatch, db: AsyncSession = Depends(get_async_db)):
+    """Set availability and/or price on many menu items with one UPDATE"""
+    filters = patch.filter.dict() if patch.filter else {}
+    # An empty filter ({} or only blank strings) would match, and update, the whole menu
+    if patch.item_ids is None and all(value is None or value == "" for value in filters.values()):
+        raise HTTPException(status_code=400, detail="Provide item_ids or a filter with at least one criterion")
+    values = patch.dict(include={"is_available", "price"}, exclude_none=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="Provide is_available and/or price")
+    
+    updated_ids = await db.run_sync(
+        lambda session: CatalogService(session).bulk_update_menu_items(restaurant_id, values, patch.item_ids, **filters)
+    )
+    return {
+        "restaurant_id": restaurant_id,
+        "changes": values,
+        "updated_count": len(updated_ids),
+        "item_ids": updated_ids
+    }
 
-@app.put("/menu-items/{item_id}")
-async def update_menu_item(item_id: int, item: MenuItemCreate, db: Session = Depends(get_db)):
-    db_item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+# Parsing and bulk writes are CPU and I/O heavy, so the import runs in the threadpool
+@app.post("/menu-items/{restaurant_id}/import")
+def import_menu_items(
+    restaurant_id: int,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|json|ndjson)$", description="Defaults to the file extension"),
+    mode: str = Query("insert", pattern="^(insert|upsert)$", description="upsert updates items with the same name"),
+    db: Session = Depends(get_db)
+):
+    """Bulk import menu items from a CSV, JSON array or NDJSON upload"""
+    try:
+        fmt = format or detect_format(file.filename, file.content_type)
+        return MenuImportService(db).import_menu(restaurant_id, file.file, fmt, mode)
+    except MenuImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.put("/menu-items/{item_id}", response_model=MenuItemOut)
+async def update_menu_item(item_id: int, item: MenuItemCreate, db: AsyncSession = Depends(get_async_db)):
+    db_item = await db.get(MenuItem, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     
+    # Moving an item changes both restaurants' menus
+    await db.run_sync(bump_menu_version, *{db_item.restaurant_id, item.restaurant_id})
     for key, value in item.dict().items():
         setattr(db_item, key, value)
     
-    db.commit()
-    db.refresh(db_item)
+    await db.commit()
+    await db.refresh(db_item)
     return db_item
 
 @app.delete("/menu-items/{item_id}")
-async def delete_menu_item(item_id: int, db: Session = Depends(get_db)):
-    db_item = db.query(MenuItem).filter(MenuItem.id == item_id).first()
+async def delete_menu_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_item = await db.get(MenuItem, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Menu item not found")
     
-    db.delete(db_item)
-    db.commit()
+    await db.delete(db_item)
+    await db.run_sync(bump_menu_version, db_item.restaurant_id)
+    await db.commit()
     return {"message": "Menu item deleted successfully"}
 
+# Platform syncs make blocking HTTP calls to the delivery platforms, so these
+# run in the threadpool with a sync session
 @app.post("/sync/manual")
-async def manual_sync(sync_request: SyncRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def manual_sync(sync_request: SyncRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Trigger manual synchronization"""
     sync_service = SyncService(db)
     
@@ -200,14 +389,21 @@ async def manual_sync(sync_request: SyncRequest, background_tasks: BackgroundTas
     return {"message": "Sync initiated", "results": results}
 
 @app.get("/sync/status/{restaurant_id}")
-async def get_sync_status(restaurant_id: int, db: Session = Depends(get_db)):
+def get_sync_status(restaurant_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get synchronization status for a restaurant"""
+    versions = get_versions(db, restaurant_id)
+    etag = make_etag("sync", restaurant_id, versions.sync_version) if versions else None
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    
     sync_service = SyncService(db)
     status = sync_service.get_sync_status(restaurant_id)
+    if etag:
+        set_etag(response, etag)
     return {"restaurant_id": restaurant_id, "sync_status": status}
 
 @app.post("/sync/restaurant-info")
-async def sync_restaurant_info(sync_request: SyncRequest, db: Session = Depends(get_db)):
+def sync_restaurant_info(sync_request: SyncRequest, db: Session = Depends(get_db)):
     """Sync restaurant information to platforms"""
     sync_service = SyncService(db)
     results = sync_service.update_restaurant_info(sync_request.restaurant_id, sync_request.platforms)
@@ -218,6 +414,12 @@ async def health_check():
     from datetime import datetime
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat() + "Z"}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint"""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
 @app.post("/scheduler/start")
 async def start_scheduler(background_tasks: BackgroundTasks):
     """Start the sync scheduler"""
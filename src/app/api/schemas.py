@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+
+# Response models: FastAPI validates and serializes these straight to JSON bytes,
+# instead of running its generic encoder over ORM objects
+class RestaurantOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    location: str
+    cuisine_type: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    address: Optional[str] = None
+    opening_hours: Optional[dict] = None
+    menu_version: int = 0
+    sync_version: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class MenuItemOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    restaurant_id: int
+    name: str
+    description: Optional[str] = None
+    price: float
+    category: Optional[str] = None
+    is_available: Optional[bool] = None
+    image_url: Optional[str] = None
+    allergens: Optional[list] = None
+    nutritional_info: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class RestaurantPage(BaseModel):
+    items: List[RestaurantOut]
+    next_cursor: Optional[str] = None
+    limit: int
+
+class MenuItemPage(BaseModel):
+    items: List[MenuItemOut]
+    next_cursor: Optional[str] = None
+    limit: int
@@ -1,4 +1,5 @@
 from fastapi import WebSocket, WebSocketDisconnect, Depends
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.services.ai_bot import RestaurantAIBot
@@ -38,7 +39,7 @@ async def websocket_endpoint(websocket: WebSocket, restaurant_id: int):
     
     # Get database session
     db = next(get_db())
-    bot = RestaurantAIBot(db)
+    bot = await run_in_threadpool(RestaurantAIBot, db)
     
     try:
         # Send welcome message
@@ -61,7 +62,7 @@ async def websocket_endpoint(websocket: WebSocket, restaurant_id: int):
             user_message = message_data.get("message", "")
             
             # Process with AI bot
-            bot_response = bot.process_message(user_message, restaurant_id)
+            bot_response = await bot.aprocess_message(user_message, restaurant_id)
             
             # Send response back to client
             response_msg = {
@@ -0,0 +1,123 @@
+import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_redis_checked = False
+_background: Optional[ThreadPoolExecutor] = None
+_background_lock = threading.Lock()
+
+def get_redis_client():
+    """Return a shared Redis client, or None when Redis is not configured or unreachable"""
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+    _redis_checked = True
+
+    redis_url: Optional[str] = os.getenv("REDIS_URL")
+    if not redis_url:
+        return None
+
+    try:
+        import redis
+        client = redis.Redis.from_url(redis_url, socket_timeout=1, socket_connect_timeout=1)
+        client.ping()
+        _redis_client = client
+    except Exception as e:
+        logger.warning("Redis unavailable at %s, using local cache only: %s", redis_url, e)
+        _redis_client = None
+    return _redis_client
+
+def publish(channel: str, message: str) -> bool:
+    """Publish a message to other processes; False when Redis is not available"""
+    redis_client = get_redis_client()
+    if redis_client is None:
+        return False
+    try:
+        redis_client.publish(channel, message)
+        return True
+    except Exception as e:
+        logger.warning("Redis publish to %s failed: %s", channel, e)
+        return False
+
+def run_in_background(fn: Callable, *args):
+    """Run fn(*args) on a single background thread, in submission order
+
+    For Redis writes that follow a database commit (invalidations), so the
+    committing caller, possibly the event loop, doesn't wait on the network.
+    Pending calls still run when the process exits.
+    """
+    global _background
+    with _background_lock:
+        if _background is None:
+            _background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="redis-background")
+    _background.submit(fn, *args)
+
+class Subscription:
+    """Call callback(message) for each message on a channel, from a daemon thread
+
+    Messages published while the connection is down are lost, so a local
+    cache kept coherent by them must not be trusted then. active is False
+    while the subscription is down, and on_reset is called when it drops and
+    again once it is back. It is also called when redis-py reconnects on its
+    own. A dropped subscription is re-established in the background.
+    """
+
+    def __init__(self, channel: str, callback: Callable[[str], None], on_reset: Callable[[], None]):
+        self.channel = channel
+        self.callback = callback
+        self.on_reset = on_reset
+        self.active = False
+        self._pubsub = None
+
+    def start(self) -> bool:
+        """Subscribe (blocking network I/O; call it at startup); False when Redis is not available"""
+        if not self.active and self._connect():
+            self.active = True
+        return self.active
+
+    def _connect(self) -> bool:
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return False
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.channel: self._handle})
+            pubsub.connection.register_connect_callback(self._on_reconnect)
+            pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._on_error)
+            self._pubsub = pubsub
+            return True
+        except Exception as e:
+            logger.warning("Redis subscribe to %s failed: %s", self.channel, e)
+            return False
+
+    def _handle(self, message):
+        try:
+            self.callback(message["data"].decode("utf-8"))
+        except Exception as e:
+            logger.warning("Handling message on %s failed: %s", self.channel, e)
+
+    def _on_reconnect(self, connection):
+        logger.warning("Redis subscription to %s reconnected; messages may have been missed", self.channel)
+        self.on_reset()
+
+    def _on_error(self, error, pubsub, thread):
+        thread.stop()
+        self.active = False
+        logger.warning("Redis subscription to %s dropped, resubscribing: %s", self.channel, error)
+        self.on_reset()
+        threading.Thread(target=self._resubscribe, daemon=True).start()
+
+    def _resubscribe(self):
+        delay = 1.0
+        while not self._connect():
+            time.sleep(delay)
+            delay = min(delay * 2, 30.0)
+        # Anything cached while the subscription was down may have missed an invalidation
+        self.on_reset()
+        self.active = True
@@ -1,14 +1,23 @@
-import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+import ast
+import time
 from urllib.parse import urlparse
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+# pg_advisory_lock key shared by every FoodFlow process that runs migrations
+MIGRATION_LOCK_ID = 4_617_726_001
+
 def create_database_if_not_exists():
     """Create PostgreSQL database if it doesn't exist"""
+    # Imported here: only needed when the app creates its own database
+    import psycopg2
+    from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+    
     database_url = os.getenv("DATABASE_URL")
     if not database_url:
         print("❌ DATABASE_URL not found in environment")
@@ -43,4 +52,87 @@ def create_database_if_not_exists():
         
     except Exception as e:
         print(f"❌ Database creation failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def migration_heads(migrations_dir: str) -> set:
+    """Head revisions of the migration scripts, read from their revision/down_revision assignments
+    
+    Parsed rather than loaded through alembic, whose import alone costs more
+    than the startup work fast start skips.
+    """
+    revisions, parents = set(), set()
+    versions_dir = os.path.join(migrations_dir, "versions")
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name)) as source:
+            tree = ast.parse(source.read())
+        for node in tree.body:
+            if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+                target, value = node.target.id, node.value
+            elif isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                target, value = node.targets[0].id, node.value
+            else:
+                continue
+            if target == "revision":
+                revisions.add(ast.literal_eval(value))
+            elif target == "down_revision":
+                down = ast.literal_eval(value)
+                parents.update(down if isinstance(down, (tuple, list)) else [down])
+    return revisions - parents
+
+def schema_is_current(engine) -> bool:
+    """True when the database's alembic_version is the migrations head
+    
+    Lets startup skip database creation and create_all once migrations have
+    run; any doubt (no alembic_version table, migrations not shipped) is False.
+    """
+    try:
+        heads = migration_heads(os.path.join(PROJECT_ROOT, "migrations"))
+        with engine.connect() as conn:
+            current = {row[0] for row in conn.execute(text("SELECT version_num FROM alembic_version"))}
+    except Exception:
+        return False
+    return bool(heads) and current == heads
+
+def alembic_config(database_url: str = None, configure_logging: bool = True):
+    from alembic.config import Config
+    config = Config(os.path.join(PROJECT_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(PROJECT_ROOT, "migrations"))
+    if database_url:
+        config.set_main_option("sqlalchemy.url", database_url)
+    # The app has already configured logging; alembic.ini's setup would replace it
+    config.attributes["configure_logger"] = configure_logging
+    return config
+
+def run_migrations(database_url: str, revision: str = "head", configure_logging: bool = False):
+    """alembic upgrade to revision (default head) on database_url
+    
+    Migrations check what exists before creating it, so this also converges a
+    database built by the old create_all startup. On PostgreSQL an advisory
+    lock makes processes that start together (API, scheduler, MCP server)
+    take turns; the later ones find the schema already at head. Runs on its
+    own connection, outside the pool's statement timeout.
+    """
+    from alembic import command
+    migration_engine = create_engine(database_url, poolclass=NullPool)
+    try:
+        with migration_engine.connect() as conn:
+            postgres = conn.dialect.name == "postgresql"
+            # Poll rather than block: a waiter blocked in pg_advisory_lock holds a
+            # snapshot, which CREATE INDEX CONCURRENTLY in the holder waits for
+            while postgres and not conn.execute(text("SELECT pg_try_advisory_lock(:id)"),
+                                                {"id": MIGRATION_LOCK_ID}).scalar():
+                conn.commit()
+                time.sleep(0.5)
+            conn.commit()
+            try:
+                config = alembic_config(database_url, configure_logging)
+                config.attributes["connection"] = conn
+                command.upgrade(config, revision)
+            finally:
+                if postgres:
+                    conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                    conn.commit()
+    finally:
+        migration_engine.dispose()
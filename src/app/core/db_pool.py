@@ -0,0 +1,101 @@
+import os
+import time
+from typing import Any, Dict
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.metrics import (
+    DB_POOL_CHECKOUT_WAIT, DB_POOL_CHECKED_OUT, DB_POOL_CAPACITY, DB_POOL_SATURATION, DB_POOL_TIMEOUTS
+)
+
+def _flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() == "true"
+
+def pool_settings() -> Dict[str, Any]:
+    """Pool settings for this process, from DB_* environment variables
+
+    Each process (API worker, scheduler, MCP server) opens its own pool, so
+    the sum of pool_size + max_overflow over all processes must stay below
+    Postgres max_connections.
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _flag("DB_POOL_PRE_PING", "true"),
+        "statement_timeout_ms": int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000")),
+        "application_name": os.getenv("DB_APPLICATION_NAME", "foodflow"),
+    }
+
+class _PoolInstrumentation:
+    """Time how long checkouts wait for a usable connection and count pool timeouts
+
+    The wait includes opening a new connection and the pre-ping, not just
+    queueing for a free slot.
+    """
+
+    metrics_name = "sync"
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.metrics_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.metrics_name).observe(time.perf_counter() - start)
+
+class InstrumentedQueuePool(_PoolInstrumentation, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_PoolInstrumentation, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(database_url: str, pool_class=InstrumentedQueuePool) -> Dict[str, Any]:
+    """create_engine keyword arguments for the configured pool and session settings"""
+    settings = pool_settings()
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings["pool_pre_ping"],
+        "pool_recycle": settings["pool_recycle"],
+    }
+
+    if database_url.startswith("postgresql"):
+        options.update(
+            poolclass=pool_class,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+        )
+        if "+asyncpg" in database_url:
+            options["connect_args"] = {"server_settings": {
+                "application_name": settings["application_name"],
+                "statement_timeout": str(settings["statement_timeout_ms"]),
+            }}
+        else:
+            options["connect_args"] = {
+                "application_name": settings["application_name"],
+                "options": f"-c statement_timeout={settings['statement_timeout_ms']}",
+            }
+    # SQLite (local runs and scripts) keeps SQLAlchemy's default pool for its URL type
+    return options
+
+def instrument_pool(engine: Engine, name: str):
+    """Export checked-out connections, capacity and saturation for an engine's pool
+
+    For an AsyncEngine, pass its sync_engine.
+    """
+    pool = engine.pool
+    if isinstance(pool, _PoolInstrumentation):
+        pool.metrics_name = name
+    if not isinstance(pool, QueuePool):
+        return
+
+    # The pool was built from pool_settings() by engine_options; -1 means unlimited overflow
+    capacity = pool.size() + max(pool_settings()["max_overflow"], 0)
+    DB_POOL_CAPACITY.labels(name).set(capacity)
+
+    # Read at scrape time: pool events fire before the pool's own count changes
+    DB_POOL_CHECKED_OUT.labels(name).set_function(pool.checkedout)
+    DB_POOL_SATURATION.labels(name).set_function(lambda: pool.checkedout() / capacity if capacity else 0)
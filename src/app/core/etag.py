@@ -0,0 +1,34 @@
+import hashlib
+from fastapi import Request, Response
+
+# Clients may keep responses but must revalidate them; with an ETag that is a
+# cheap If-None-Match round trip answered with 304
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(*parts) -> str:
+    """Weak ETag from version parts, e.g. W/"menu-1-42" """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+def query_fingerprint(request: Request) -> str:
+    """Short hash of the query string, so each filter, sort and page gets its own ETag"""
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    return hashlib.sha1(query.encode("utf-8")).hexdigest()[:12]
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match already names this ETag (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,32 @@
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+
+class _LazyModule(ModuleType):
+    """Stands in for a module until an attribute is read, then imports and delegates to it"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+        self.__dict__["_lock"] = threading.Lock()
+
+    def __getattr__(self, attribute: str):
+        module = self.__dict__["_module"]
+        if module is None:
+            # The regular import machinery, so concurrent first uses wait for one complete import
+            with self.__dict__["_lock"]:
+                module = self.__dict__["_module"] or importlib.import_module(self.__name__)
+                self.__dict__["_module"] = module
+        return getattr(module, attribute)
+
+def lazy_import(name: str) -> ModuleType:
+    """Return a module that is only imported on first attribute access
+
+    For heavy optional stacks (OpenAI SDK, Pillow, OpenCV, Tesseract) that most
+    processes and requests never touch, so importing the app stays fast. A
+    missing package still fails here, at import time, as a plain import would.
+    """
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
@@ -1,39 +1,175 @@
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
-from datetime import datetime
-
-def setup_logging():
-    """Configure logging with datetime stamps for all outputs"""
-    
-    # Create custom formatter with datetime
-    class DateTimeFormatter(logging.Formatter):
-        def format(self, record):
-            # Add timestamp to the record
-            record.timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            return super().format(record)
-    
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+_configured = False
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Request-scoped context stamped on every record logged while it is set
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+restaurant_id_var: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("restaurant_id", default=None)
+platform_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("platform", default=None)
+
+CONTEXT_VARS = {"request_id": request_id_var, "restaurant_id": restaurant_id_var, "platform": platform_var}
+
+@contextmanager
+def log_context(**values):
+    """Set request_id, restaurant_id and/or platform for records logged inside the block"""
+    tokens = [(CONTEXT_VARS[name], CONTEXT_VARS[name].set(value)) for name, value in values.items()]
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+class ContextFilter(logging.Filter):
+    """Copy the context variables onto the record while still in the logging thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, var in CONTEXT_VARS.items():
+            setattr(record, name, var.get())
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING from chosen loggers and their children
+
+    Rates come from LOG_SAMPLING, e.g. "app.services.menu_cache=0.1,uvicorn.access=0.01".
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix first, so a child logger's own rate wins over its parent's
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for name, rate in self.rates:
+            if record.name == name or record.name.startswith(name + "."):
+                return random.random() < rate
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the request context fields that are set"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_VARS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hand records to the listener thread; when the queue is full, drop instead of waiting"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here (the arguments may change once
+        # this thread moves on) but leave formatting to the listener thread
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            from app.core.metrics import LOG_RECORDS_DROPPED
+            LOG_RECORDS_DROPPED.inc()
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: the handler may have filled the queue, and stopping must still flush
+        self.queue.put(self._sentinel)
+
+def _parse_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+def stop_logging():
+    """Write out queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+def setup_logging(force: bool = False):
+    """Configure logging with datetime stamps for all outputs
+
+    Modules call this at import; only the first call (or force=True) configures.
+    Records are queued by the logging thread and formatted and written to
+    stdout by a background listener (LOG_ASYNC=false writes inline), as text
+    or, with LOG_FORMAT=json, one JSON object per line.
+    """
+    global _configured, _listener
+    if _configured and not force:
+        return
+    _configured = True
+    stop_logging()
+
+    level = getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO)
+
     # Define log format with timestamp
-    log_format = '[%(timestamp)s] %(levelname)s - %(name)s - %(message)s'
-    
-    # Create formatter
-    formatter = DateTimeFormatter(log_format)
-    
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('[%(asctime)s] %(levelname)s - %(name)s - %(message)s',
+                                      datefmt='%Y-%m-%d %H:%M:%S')
+
     # Configure root logger
     root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    
+    root_logger.setLevel(level)
+
     # Remove existing handlers to avoid duplicates
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-    
+
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
+    console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
-    
+
+    if os.getenv("LOG_ASYNC", "true").lower() == "true":
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+        _listener = _Listener(handler.queue, console_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = console_handler
+
+    # Both run in the logging thread: sampled-out records are never queued
+    sampling = _parse_rates(os.getenv("LOG_SAMPLING", ""))
+    if sampling:
+        handler.addFilter(SamplingFilter(sampling))
+    handler.addFilter(ContextFilter())
+
     # Add handler to root logger
-    root_logger.addHandler(console_handler)
-    
+    root_logger.addHandler(handler)
+
     # Configure specific loggers
     loggers = [
         'app.services.sync_service',
@@ -45,9 +181,9 @@ def setup_logging():
         'uvicorn',
         'fastapi'
     ]
-    
+
     for logger_name in loggers:
         logger = logging.getLogger(logger_name)
-        logger.setLevel(logging.INFO)
+        logger.setLevel(level)
         # Propagate to root logger which has our formatter
-        logger.propagate = True
\ No newline at end of file
+        logger.propagate = True
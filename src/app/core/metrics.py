@@ -0,0 +1,129 @@
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+LLM_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+# LLM response cache
+LLM_CACHE_REQUESTS = Counter(
+    "foodflow_llm_cache_requests_total",
+    "LLM response cache lookups",
+    ["operation", "result"]  # result: hit, miss, store, invalid
+)
+
+# LLM gateway admission control
+LLM_QUEUE_WAIT = Histogram(
+    "foodflow_llm_queue_wait_seconds",
+    "Time spent waiting for an LLM slot",
+    ["model", "priority"],
+    buckets=LLM_LATENCY_BUCKETS
+)
+LLM_QUEUE_DEPTH = Gauge("foodflow_llm_queue_depth", "LLM calls waiting for a slot")
+LLM_IN_FLIGHT = Gauge("foodflow_llm_in_flight", "LLM calls in flight", ["model"])
+LLM_REJECTED = Counter(
+    "foodflow_llm_rejected_total",
+    "LLM calls rejected by the gateway",
+    ["model", "priority", "reason"]  # reason: queue_full, deadline, cancelled
+)
+
+# LLM usage
+LLM_CALLS = Counter(
+    "foodflow_llm_calls_total",
+    "LLM calls by outcome",
+    ["model", "operation", "outcome"]  # outcome: success, error, timeout, rate_limited, rejected, cancelled
+)
+LLM_REQUEST_LATENCY = Histogram(
+    "foodflow_llm_request_latency_seconds",
+    "LLM request latency once admitted, including retries",
+    ["model", "operation", "outcome"],
+    buckets=LLM_LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "foodflow_llm_tokens_total",
+    "LLM tokens consumed",
+    ["model", "operation", "kind"]  # kind: prompt, completion
+)
+LLM_TOKENS_PER_CALL = Histogram(
+    "foodflow_llm_tokens_per_call",
+    "LLM tokens per call",
+    ["model", "kind"],
+    buckets=(50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+)
+LLM_RETRIES = Counter("foodflow_llm_retries_total", "LLM call retries", ["model", "operation"])
+
+# LLM model routing
+LLM_ROUTE_DECISIONS = Counter(
+    "foodflow_llm_route_decisions_total",
+    "Model routing decisions",
+    ["task", "model", "reason"]  # reason: primary, large_input, primary_slow, primary_failing
+)
+LLM_FAILOVERS = Counter(
+    "foodflow_llm_failovers_total",
+    "Calls served by a model other than the routed one",
+    ["task", "from_model", "to_model"]
+)
+LLM_HEDGES = Counter(
+    "foodflow_llm_hedges_total",
+    "Hedged LLM calls",
+    ["task", "result"]  # result: launched, primary_won, hedge_won
+)
+
+# Database connection pools (pool: sync, async)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "foodflow_db_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_POOL_CHECKED_OUT = Gauge("foodflow_db_pool_checked_out", "Connections checked out of the pool", ["pool"])
+DB_POOL_CAPACITY = Gauge("foodflow_db_pool_capacity", "Pool size plus max overflow", ["pool"])
+DB_POOL_SATURATION = Gauge("foodflow_db_pool_saturation", "Checked-out connections as a fraction of capacity", ["pool"])
+DB_POOL_TIMEOUTS = Counter("foodflow_db_pool_timeouts_total", "Checkouts that timed out waiting for a connection", ["pool"])
+
+# Menu read-through cache; hit rate = hit / (hit + miss) per tier
+MENU_CACHE_REQUESTS = Counter(
+    "foodflow_menu_cache_requests_total",
+    "Menu cache lookups",
+    ["tier", "result"]  # tier: local, redis; result: hit, miss, stale
+)
+MENU_CACHE_INVALIDATIONS = Counter(
+    "foodflow_menu_cache_invalidations_total",
+    "Menu cache invalidations",
+    ["source"]  # source: local (this process wrote), remote (pub/sub from another process)
+)
+MENU_CACHE_ENTRIES = Gauge("foodflow_menu_cache_entries", "Restaurant menus held in the local cache")
+
+# Config parameter cache
+CONFIG_CACHE_REQUESTS = Counter(
+    "foodflow_config_cache_requests_total",
+    "Config cache lookups",
+    ["result"]  # result: hit, miss (all keys reloaded in one query)
+)
+CONFIG_CACHE_INVALIDATIONS = Counter(
+    "foodflow_config_cache_invalidations_total",
+    "Config cache invalidations",
+    ["source"]  # source: local (this process wrote), remote (pub/sub from another process)
+)
+
+# Buffered audit writer
+AUDIT_EVENTS = Counter(
+    "foodflow_audit_events_total",
+    "Audit events by how they were handled",
+    # outcome: queued, written, durable (written inline by request), backpressure (caller waited
+    # for queue space), inline (queue stayed full, caller wrote it), dropped
+    ["outcome"]
+)
+AUDIT_QUEUE_DEPTH = Gauge("foodflow_audit_queue_depth", "Audit events waiting to be written")
+AUDIT_WRITE_DELAY = Histogram(
+    "foodflow_audit_write_delay_seconds",
+    "Time from logging an audit event to its batch being committed",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+)
+
+# Logging
+LOG_RECORDS_DROPPED = Counter(
+    "foodflow_log_records_dropped_total",
+    "Log records dropped because the logging queue was full"
+)
+
+def render_metrics():
+    """Render all registered metrics in Prometheus text format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
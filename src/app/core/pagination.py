@@ -0,0 +1,90 @@
+import base64
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursorError(ValueError):
+    """The cursor is malformed or was issued for a different sort"""
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = json.dumps({"s": sort, "k": list(values)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["k"]
+        if payload["s"] != sort or not isinstance(values, list):
+            raise InvalidCursorError("Cursor does not match the requested sort")
+        return values
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+
+def keyset_page(query: Query, sort: str, keys: Sequence[Any], key_values: Callable[[Any], List[Any]],
+                cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                descending: bool = False) -> Dict[str, Any]:
+    """Fetch one page of a query ordered by keys, resuming after the cursor
+
+    keys must end with a unique column (the primary key) so the order is stable
+    and each row has a distinct position; key_values returns a row's values for
+    those keys. Returns the page's items and the cursor for the next page
+    (None on the last page).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sort_key = tuple_(*keys)
+
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        if len(values) != len(keys):
+            raise InvalidCursorError("Cursor does not match the requested sort")
+        after = tuple_(*values)
+        query = query.filter(sort_key < after if descending else sort_key > after)
+
+    query = query.order_by(*(key.desc() if descending else key.asc() for key in keys))
+    # One extra row tells us whether there is a next page without a COUNT
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, key_values(rows[-1]))
+    return {"items": rows, "next_cursor": next_cursor, "limit": limit}
+
+def sequence_page(rows: Sequence[Any], positions: Dict[Any, int], sort: str,
+                  key_values: Callable[[Any], List[Any]], cursor: Optional[str] = None,
+                  limit: int = DEFAULT_PAGE_SIZE, descending: bool = False) -> Optional[Dict[str, Any]]:
+    """keyset_page over rows already held in memory in ascending sort order
+
+    positions maps each row's primary key (the last sort key) to its index in
+    rows, so resuming from a cursor is a lookup and a page costs O(limit)
+    however many rows there are. Pages and cursors are interchangeable with
+    keyset_page. Returns None when the cursor's row is not in rows (it changed
+    or was deleted since the cursor was issued); the caller should then page
+    in the database.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    count = len(rows)
+
+    start = 0
+    if cursor:
+        values = decode_cursor(cursor, sort)
+        index = positions.get(values[-1]) if values and isinstance(values[-1], int) else None
+        if index is None or key_values(rows[index]) != values:
+            return None
+        start = (count - 1 - index if descending else index) + 1
+
+    end = min(start + limit + 1, count)
+    if descending:
+        page = [rows[count - 1 - i] for i in range(start, end)]
+    else:
+        page = list(rows[start:end])
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(sort, key_values(page[-1]))
+    return {"items": page, "next_cursor": next_cursor, "limit": limit}
@@ -0,0 +1,44 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional: only speeds up sparse responses
+    orjson = None
+
+class InvalidFieldsError(ValueError):
+    """?fields= names a field the resource doesn't have"""
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ?fields= value; None means every field"""
+    requested = [name.strip() for name in (fields or "").split(",") if name.strip()]
+    # "?fields=" and "?fields=," name nothing, so they mean every field too
+    if not requested:
+        return None
+    allowed = list(allowed)
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}; available: {', '.join(allowed)}")
+    # Keep the resource's field order and drop duplicates
+    return [name for name in allowed if name in requested]
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(jsonable_encoder(content), separators=(",", ":")).encode("utf-8")
+
+def sparse_page(page: Dict[str, Any], fields: List[str]) -> Response:
+    """Render a keyset page keeping only the requested fields of each item
+
+    Bypasses response model validation: the items are already typed database
+    rows, so this is a plain attribute copy and one JSON dump.
+    """
+    content = {
+        "items": [{name: getattr(item, name) for name in fields} for item in page["items"]],
+        "next_cursor": page["next_cursor"],
+        "limit": page["limit"],
+    }
+    return Response(content=dumps(content), media_type="application/json")
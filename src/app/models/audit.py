@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, BigInteger
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
@@ -6,7 +6,13 @@ Base = declarative_base()
 
 class ActionHistory(Base):
     __tablename__ = "action_history"
+    __table_args__ = (
+        # /audit/history filters; timestamp last so the newest-first scan reads the index in order
+        Index("ix_action_history_action_entity", "action_type", "entity_type", "entity_id", "timestamp"),
+        Index("ix_action_history_entity", "entity_type", "entity_id", "timestamp"),
+    )
     
+    # On PostgreSQL the table is partitioned by month and its key is (id, timestamp), see migration 0005
     id = Column(Integer, primary_key=True, index=True)
     action_type = Column(String(100), nullable=False)  # sync, menu_update, config_change, etc.
     entity_type = Column(String(50))  # restaurant, menu_item, config, etc.
@@ -15,4 +21,14 @@ class ActionHistory(Base):
     action_details = Column(JSON)  # detailed action data
     result = Column(String(20))  # success, failed, partial
     error_message = Column(Text)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
\ No newline at end of file
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+class ActionRollup(Base):
+    """Hourly action counts, kept up to date as actions are logged (see audit_stats)"""
+    __tablename__ = "action_rollups"
+    
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # start of the hour, UTC
+    action_type = Column(String(100), primary_key=True)
+    result = Column(String(20), primary_key=True, default="")
+    platform = Column(String(50), primary_key=True, default="")  # "" when the action has no platform
+    count = Column(BigInteger, nullable=False, default=0)
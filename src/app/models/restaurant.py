@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, JSON, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
@@ -15,6 +15,9 @@ class Restaurant(Base):
     email = Column(String(255))
     address = Column(Text)
     opening_hours = Column(JSON)
+    # Bumped on every menu / sync status write; the API derives ETags from them
+    menu_version = Column(Integer, nullable=False, default=0, server_default="0")
+    sync_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -22,7 +25,7 @@ class MenuItem(Base):
     __tablename__ = "menu_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE", name="fk_menu_items_restaurant_id"), nullable=False)
     name = Column(String(255), nullable=False)
     description = Column(Text)
     price = Column(Float, nullable=False)
@@ -34,11 +37,24 @@ class MenuItem(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+# Per-restaurant reads, one index per menu list sort (see CatalogService); the
+# category sort orders on coalesce(category, '') so the index uses the same expression
+Index("ix_menu_items_restaurant_id", MenuItem.restaurant_id, MenuItem.id)
+Index(
+    "ix_menu_items_restaurant_category",
+    MenuItem.restaurant_id, func.coalesce(MenuItem.category, ""), MenuItem.name, MenuItem.id
+)
+Index("ix_menu_items_restaurant_price", MenuItem.restaurant_id, MenuItem.price, MenuItem.id)
+
 class PlatformSync(Base):
     __tablename__ = "platform_syncs"
+    __table_args__ = (
+        # One status row per restaurant and platform; also serves restaurant lookups
+        UniqueConstraint("restaurant_id", "platform", name="uq_platform_syncs_restaurant_platform"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    restaurant_id = Column(Integer, nullable=False)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id", ondelete="CASCADE", name="fk_platform_syncs_restaurant_id"), nullable=False)
     platform = Column(String(50), nullable=False)  # uber_eats, deliveroo, just_eat
     platform_restaurant_id = Column(String(255))
     last_sync = Column(DateTime(timezone=True))
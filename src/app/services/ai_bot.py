@@ -1,28 +1,49 @@
-import openai
+import asyncio
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from functools import partial, lru_cache
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable, Tuple
 from sqlalchemy.orm import Session
-from app.models.restaurant import Restaurant, MenuItem
+from app.models.restaurant import Restaurant
 from app.services.sync_service import SyncService
 from app.services.config_service import ConfigService
 from app.services.audit_service import AuditService
+from app.services.menu_import import MenuImportService, MenuImportRow
+from app.services.menu_cache import menu_cache
+from app.services.intent_router import (
+    classify_intent, extract_platforms,
+    INTENT_SHOW_MENU, INTENT_SYNC, INTENT_STATUS, INTENT_MENU_ANALYSIS
+)
+from app.services.llm_gateway import llm_gateway
+from app.services.model_router import model_router
+from app.utils.image_processor import ImageProcessor
 from app.core.logging_config import setup_logging
+from app.core.lazy import lazy_import
 import os
-import base64
-from PIL import Image
-import io
+
+# The SDK takes longer to import than the rest of the app; load it on first use
+openai = lazy_import("openai")
 
 # Ensure logging is configured
 setup_logging()
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4)
+def _get_openai_clients(api_key: Optional[str]) -> Tuple["openai.OpenAI", "openai.AsyncOpenAI"]:
+    """Share HTTP clients (and their connection pools) across bot instances
+    
+    Retries are disabled here because the LLM gateway retries and counts them.
+    """
+    return openai.OpenAI(api_key=api_key, max_retries=0), openai.AsyncOpenAI(api_key=api_key, max_retries=0)
+
 class RestaurantAIBot:
     def __init__(self, db: Session):
         self.db = db
         self.config_service = ConfigService(db)
         self.audit_service = AuditService(db)
-        self.openai_client = openai.OpenAI(api_key=self.config_service.get_config("OPENAI_API_KEY"))
+        self.openai_client, self.async_openai_client = _get_openai_clients(
+            self.config_service.get_config("OPENAI_API_KEY")
+        )
         self.sync_service = SyncService(db)
         
         self.system_prompt = """
@@ -36,62 +57,170 @@ class RestaurantAIBot:
         """
     
     def process_message(self, message: str, restaurant_id: int, image_data: Optional[bytes] = None) -> Dict[str, Any]:
-        """Process user message with optional image attachment"""
+        """Process user message with optional image attachment (blocking; for sync callers)"""
+        
+        logger.info("Processing message for restaurant %s: %s...", restaurant_id, message[:50])
+        
+        # Deterministic commands are answered locally, without a model round-trip
+        intent = classify_intent(message, has_image=bool(image_data))["intent"]
+        logger.info("Classified message intent: %s", intent)
+        
+        try:
+            local_handler = self._local_handler(intent, message, restaurant_id)
+            if local_handler:
+                return local_handler()
+            
+            task, messages = self._build_llm_request(message, image_data)
+            routing = model_router.route(task, len(message))
+            logger.info("Sending request to OpenAI API with model: %s (%s)", routing['model'], routing['reason'])
+            response = model_router.complete(
+                self.openai_client,
+                routing,
+                operation=task,
+                priority="interactive",
+                restaurant_id=restaurant_id,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1000
+            )
+            logger.info("Successfully received response from OpenAI API (%s)", routing['served_by'])
+            
+            result = self._handle_llm_response(intent, response.choices[0].message.content, restaurant_id, image_data)
+            return {**result, "routing": routing}
+        except Exception as e:
+            return self._error_response(e)
+    
+    async def aprocess_message(self, message: str, restaurant_id: int, image_data: Optional[bytes] = None) -> Dict[str, Any]:
+        """Non-blocking process_message for async handlers
+        
+        The model call uses the async client and waits for an LLM gateway slot;
+        database and platform work runs in a worker thread.
+        """
         
-        logger.info(f"Processing message for restaurant {restaurant_id}: {message[:50]}...")
+        logger.info("Processing message for restaurant %s: %s...", restaurant_id, message[:50])
         
+        intent = classify_intent(message, has_image=bool(image_data))["intent"]
+        logger.info("Classified message intent: %s", intent)
+        
+        try:
+            local_handler = self._local_handler(intent, message, restaurant_id)
+            if local_handler:
+                return await asyncio.to_thread(local_handler)
+            
+            if image_data:
+                # Image decoding and resizing is CPU-bound; keep it off the event loop
+                task, messages = await asyncio.to_thread(self._build_llm_request, message, image_data)
+            else:
+                task, messages = self._build_llm_request(message, image_data)
+            routing = model_router.route(task, len(message))
+            logger.info("Sending request to OpenAI API with model: %s (%s)", routing['model'], routing['reason'])
+            response = await model_router.acomplete(
+                self.async_openai_client,
+                routing,
+                operation=task,
+                priority="interactive",
+                restaurant_id=restaurant_id,
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1000
+            )
+            logger.info("Successfully received response from OpenAI API (%s)", routing['served_by'])
+            
+            result = self._handle_llm_response(intent, response.choices[0].message.content, restaurant_id, image_data)
+            return {**result, "routing": routing}
+        except Exception as e:
+            return self._error_response(e)
+    
+    def _local_handler(self, intent: str, message: str, restaurant_id: int) -> Optional[Callable[[], Dict[str, Any]]]:
+        """Return the handler for intents that need no model call, if any"""
+        if intent == INTENT_SYNC:
+            return partial(self._handle_sync_request, message, restaurant_id)
+        if intent == INTENT_SHOW_MENU:
+            return partial(self._handle_show_menu, restaurant_id)
+        if intent == INTENT_STATUS:
+            return partial(self._handle_status, restaurant_id)
+        return None
+    
+    def _build_llm_request(self, message: str, image_data: Optional[bytes]) -> Tuple[str, List[Dict[str, Any]]]:
+        """Return the routing task and chat messages for a message with optional image"""
         messages = [{"role": "system", "content": self.system_prompt}]
         
         # Add image if provided
         if image_data:
-            base64_image = base64.b64encode(image_data).decode('utf-8')
+            # Downscaled to what the vision model actually uses, with the real MIME type
+            image_url = ImageProcessor.prepare_for_vision(image_data)
+            logger.info("Prepared image for vision model: %s bytes -> %s chars", len(image_data), len(image_url))
             messages.append({
                 "role": "user",
                 "content": [
                     {"type": "text", "text": message},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}}
+                    {"type": "image_url", "image_url": {"url": image_url}}
                 ]
             })
-        else:
-            messages.append({"role": "user", "content": message})
+            return "image_analysis", messages
         
-        try:
-            logger.info(f"Sending request to OpenAI API with model: {'gpt-4-vision-preview' if image_data else 'gpt-3.5-turbo'}")
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4-vision-preview" if image_data else "gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            ai_response = response.choices[0].message.content
-            logger.info("Successfully received response from OpenAI API")
-            
-            # Determine action based on message content
-            if image_data and ("menu" in message.lower() or "scan" in message.lower()):
-                return self._handle_menu_analysis(ai_response, restaurant_id, image_data)
-            elif "sync" in message.lower() or "dispatch" in message.lower():
-                return self._handle_sync_request(message, restaurant_id)
-            elif "show" in message.lower() and "menu" in message.lower():
-                return self._handle_show_menu(restaurant_id)
-            else:
-                return {
-                    "type": "chat",
-                    "response": ai_response,
-                    "suggestions": [
-                        "Show me my current menu",
-                        "Sync to Uber Eats and Deliveroo",
-                        "Upload a menu image to analyze"
-                    ]
-                }
-                
-        except Exception as e:
-            logger.error(f"Error processing message: {str(e)}")
-            return {
-                "type": "error",
-                "response": "Sorry, I encountered an error processing your request. Please try again.",
-                "error": str(e)
-            }
+        messages.append({"role": "user", "content": message})
+        return "chat", messages
+    
+    def _handle_llm_response(self, intent: str, ai_response: str, restaurant_id: int, image_data: Optional[bytes]) -> Dict[str, Any]:
+        if intent == INTENT_MENU_ANALYSIS:
+            return self._handle_menu_analysis(ai_response, restaurant_id, image_data)
+        return self.chat_response(ai_response)
+    
+    def _error_response(self, error: Exception) -> Dict[str, Any]:
+        logger.error("Error processing message: %s", str(error))
+        return {
+            "type": "error",
+            "response": "Sorry, I encountered an error processing your request. Please try again.",
+            "error": str(error)
+        }
+    
+    def route_chat(self, message: str) -> Dict[str, Any]:
+        """Routing decision for an open-ended chat message"""
+        return model_router.route("chat", len(message))
+    
+    async def stream_chat(self, message: str, restaurant_id: int, routing: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Stream model tokens for an open-ended chat message
+        
+        Closing the generator (e.g. when the consumer task is cancelled) closes the
+        HTTP stream, so the provider stops generating. Streams use the routed model
+        but are not hedged.
+        """
+        routing = routing or self.route_chat(message)
+        logger.info("Streaming chat response for restaurant %s with %s: %s...", restaurant_id, routing['model'], message[:50])
+        
+        async for chunk in llm_gateway.astream(
+            self.async_openai_client,
+            operation="chat",
+            priority="interactive",
+            restaurant_id=restaurant_id,
+            model=routing["model"],
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": message}
+            ],
+            temperature=0.3,
+            max_tokens=1000
+        ):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def chat_response(self, ai_response: str) -> Dict[str, Any]:
+        """Wrap a free-form model answer with follow-up suggestions and actions"""
+        actions = []
+        if "sync" in ai_response.lower():
+            actions.append({"text": "Sync to delivery platforms", "action": "sync_platforms"})
+        
+        return {
+            "type": "chat",
+            "response": ai_response,
+            "actions": actions,
+            "suggestions": [
+                "Show me my current menu",
+                "Sync to Uber Eats and Deliveroo",
+                "Upload a menu image to analyze"
+            ]
+        }
     
     def _handle_menu_analysis(self, ai_response: str, restaurant_id: int, image_data: bytes) -> Dict[str, Any]:
         """Handle menu image analysis"""
@@ -151,14 +280,7 @@ class RestaurantAIBot:
     
     def _handle_sync_request(self, message: str, restaurant_id: int) -> Dict[str, Any]:
         """Handle platform sync request"""
-        platforms = []
-        
-        if "uber" in message.lower():
-            platforms.append("uber_eats")
-        if "deliveroo" in message.lower():
-            platforms.append("deliveroo")
-        if "just eat" in message.lower():
-            platforms.append("just_eat")
+        platforms = extract_platforms(message)
         
         if not platforms:
             platforms = ["uber_eats", "deliveroo"]  # Default
@@ -176,9 +298,35 @@ class RestaurantAIBot:
             "platforms": platforms
         }
     
+    def _handle_status(self, restaurant_id: int) -> Dict[str, Any]:
+        """Show platform sync status"""
+        status = [
+            {**record, "last_sync": record["last_sync"].isoformat() if record["last_sync"] else None}
+            for record in self.sync_service.get_sync_status(restaurant_id)
+        ]
+        
+        if not status:
+            response = "No sync history found yet. Ask me to sync your menu to get started."
+        else:
+            response = "Platform sync status:\n\n"
+            for record in status:
+                icon = "✅" if record["status"] == "success" else "❌"
+                response += f"{icon} {record['platform']}: {record['status']}"
+                if record["last_sync"]:
+                    response += f" (last sync: {record['last_sync']})"
+                response += "\n"
+                if record["error_message"]:
+                    response += f"   Error: {record['error_message']}\n"
+        
+        return {
+            "type": "sync_status",
+            "response": response,
+            "sync_status": status
+        }
+    
     def _handle_show_menu(self, restaurant_id: int) -> Dict[str, Any]:
         """Show current menu"""
-        items = self.db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
+        items = menu_cache.get_menu(self.db, restaurant_id).items
         
         menu_data = []
         for item in items:
@@ -215,39 +363,44 @@ class RestaurantAIBot:
     
     def add_menu_items(self, restaurant_id: int, menu_items: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Add menu items to database"""
-        added_items = []
-        
         try:
+            rows = []
+            skipped_count = 0
             for item_data in menu_items:
                 if not item_data.get("name"):
                     continue
-                    
-                menu_item = MenuItem(
-                    restaurant_id=restaurant_id,
-                    name=item_data.get("name"),
-                    description=item_data.get("description", ""),
-                    price=float(item_data.get("price", 0)),
-                    category=item_data.get("category", "Other"),
-                    is_available=True
-                )
-                
-                self.db.add(menu_item)
-                added_items.append(menu_item)
+                # One bad extraction (blank name, negative or unreadable price) skips that item, not the batch
+                try:
+                    rows.append(MenuImportRow(
+                        name=item_data.get("name"),
+                        description=item_data.get("description", ""),
+                        price=float(item_data.get("price", 0)),
+                        category=item_data.get("category") or "Other",
+                        is_available=True
+                    ))
+                except (TypeError, ValueError):
+                    skipped_count += 1
             
+            # One set-based INSERT (COPY on PostgreSQL) instead of an ORM object per item
+            added_count, _ = MenuImportService(self.db).write_rows(restaurant_id, rows)
             self.db.commit()
             
             # Log menu addition
             self.audit_service.log_menu_action(
                 "add_items", 
                 restaurant_id, 
-                {"items_count": len(added_items), "items": [item.name for item in added_items]}
+                {"items_count": added_count, "items": [row.name for row in rows]}
             )
             
+            response = f"Successfully added {added_count} menu items to your database!"
+            if skipped_count:
+                response += f" Skipped {skipped_count} items with a blank name or invalid price."
             return {
                 "type": "items_added",
                 "success": True,
-                "count": len(added_items),
-                "response": f"Successfully added {len(added_items)} menu items to your database!"
+                "count": added_count,
+                "skipped_count": skipped_count,
+                "response": response
             }
             
         except Exception as e:
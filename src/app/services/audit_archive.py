@@ -0,0 +1,170 @@
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from app.models.audit import ActionHistory
+from app.services.audit_export import ndjson_line
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^action_history_(\d{4})_(\d{2})$")
+EXPORT_BATCH_SIZE = 5000
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(month: datetime) -> str:
+    return f"action_history_{month:%Y_%m}"
+
+class AuditArchiveService:
+    """Monthly action_history partitions, retention and archival
+
+    On PostgreSQL (after migration 0005) action_history is range-partitioned
+    by month: ensure_partitions creates the months ahead, and archive_expired
+    exports each month older than AUDIT_RETENTION_DAYS to gzipped NDJSON in
+    AUDIT_ARCHIVE_DIR, then detaches and drops its partition. On other
+    databases expired months are exported the same way, then deleted.
+    Hourly rollups are kept, so stats over archived months still work.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.retention_days = int(os.getenv("AUDIT_RETENTION_DAYS", "365"))
+        self.archive_dir = os.getenv("AUDIT_ARCHIVE_DIR", "archive/audit")
+        self.months_ahead = int(os.getenv("AUDIT_PARTITIONS_AHEAD", "3"))
+
+    def is_partitioned(self) -> bool:
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        return bool(self.db.execute(text(
+            "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('action_history')"
+        )).scalar())
+
+    def partitions(self) -> List[Tuple[str, datetime]]:
+        """Monthly partitions as (name, month start), oldest first; the default partition is left out"""
+        if not self.is_partitioned():
+            return []
+        names = self.db.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass('action_history')"
+        )).scalars()
+        months = []
+        for name in names:
+            match = PARTITION_NAME.match(name)
+            if match:
+                months.append((name, datetime(int(match.group(1)), int(match.group(2)), 1)))
+        return sorted(months, key=lambda partition: partition[1])
+
+    def ensure_partitions(self, months_ahead: Optional[int] = None) -> List[str]:
+        """Create the partitions for this month and the next months_ahead months"""
+        if not self.is_partitioned():
+            return []
+        existing = {name for name, _ in self.partitions()}
+        month = month_start(datetime.utcnow())
+        created = []
+        for _ in range((self.months_ahead if months_ahead is None else months_ahead) + 1):
+            name = partition_name(month)
+            following = add_months(month, 1)
+            if name not in existing:
+                try:
+                    self.db.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF action_history "
+                        f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00+00') TO ('{following:%Y-%m-%d} 00:00+00')"
+                    ))
+                    self.db.commit()
+                    created.append(name)
+                except Exception as e:
+                    # Fails when rows for the month already landed in the default partition
+                    self.db.rollback()
+                    logger.error("Could not create audit partition %s: %s", name, e)
+            month = following
+        if created:
+            logger.info("Created audit partitions: %s", ', '.join(created))
+        return created
+
+    def expired_months(self, retention_days: Optional[int] = None) -> List[datetime]:
+        """Months whose every row is older than the retention period, oldest first"""
+        retention_days = self.retention_days if retention_days is None else retention_days
+        if retention_days <= 0:
+            return []
+        # Only whole months are archived, once their last day is past the retention period
+        cutoff = month_start(datetime.utcnow() - timedelta(days=retention_days))
+
+        if self.is_partitioned():
+            return [month for _, month in self.partitions() if add_months(month, 1) <= cutoff]
+
+        oldest = self.db.execute(select(func.min(ActionHistory.timestamp))).scalar()
+        months = []
+        month = month_start(oldest) if oldest else cutoff
+        while month < cutoff:
+            months.append(month)
+            month = add_months(month, 1)
+        return months
+
+    def archive_expired(self, retention_days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Export every expired month to the archive directory, then drop it from action_history"""
+        partitioned = self.is_partitioned()
+        archived = []
+        for month in self.expired_months(retention_days):
+            path, exported = self.export_month(month)
+            if partitioned:
+                name = partition_name(month)
+                self.db.execute(text(f"ALTER TABLE action_history DETACH PARTITION {name}"))
+                self.db.execute(text(f"DROP TABLE {name}"))
+            else:
+                self.db.execute(ActionHistory.__table__.delete().where(*self._month_range(month)))
+            self.db.commit()
+            logger.info("Archived %s audit rows for %04d-%02d to %s", exported, month.year, month.month, path)
+            archived.append({"month": f"{month:%Y-%m}", "rows": exported, "path": path})
+        return archived
+
+    def export_month(self, month: datetime) -> Tuple[Optional[str], int]:
+        """Write one month of action_history to <archive dir>/action_history_YYYY_MM.ndjson.gz
+
+        Rows are streamed in batches, written to a temporary file and renamed
+        into place once complete, so a crash never leaves a truncated archive
+        that looks finished. Empty months produce no file.
+        """
+        table = ActionHistory.__table__
+        result = self.db.execute(
+            select(table).where(*self._month_range(month)).order_by(table.c.timestamp, table.c.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"{partition_name(month)}.ndjson.gz")
+        partial = f"{path}.partial"
+        exported = 0
+        try:
+            with gzip.open(partial, "wt", encoding="utf-8") as archive:
+                for rows in result.mappings().partitions():
+                    for row in rows:
+                        archive.write(ndjson_line(row))
+                    exported += len(rows)
+        except Exception:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        finally:
+            result.close()
+
+        if not exported:
+            os.remove(partial)
+            return None, 0
+        os.replace(partial, path)
+        return path, exported
+
+    def _month_range(self, month: datetime):
+        return (ActionHistory.timestamp >= month, ActionHistory.timestamp < add_months(month, 1))
+
+    def run_maintenance(self) -> Dict[str, Any]:
+        """Create upcoming partitions and archive expired months (the scheduler's daily job)"""
+        return {"created_partitions": self.ensure_partitions(), "archived": self.archive_expired()}
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Iterable, Mapping, Optional
+from sqlalchemy import select
+from app.models.audit import ActionHistory
+
+EXPORT_COLUMNS = [column.name for column in ActionHistory.__table__.columns]
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def _json_default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def ndjson_line(row: Mapping[str, Any]) -> str:
+    return json.dumps(dict(row), default=_json_default) + "\n"
+
+def history_query(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                  action_type: Optional[str] = None, entity_type: Optional[str] = None,
+                  entity_id: Optional[int] = None, columns: Optional[Iterable] = None):
+    """action_history filtered like /audit/history; the timestamp range is what prunes partitions"""
+    query = select(*(columns or [ActionHistory]))
+    if since:
+        query = query.where(ActionHistory.timestamp >= since)
+    if until:
+        query = query.where(ActionHistory.timestamp < until)
+    if action_type:
+        query = query.where(ActionHistory.action_type == action_type)
+    if entity_type:
+        query = query.where(ActionHistory.entity_type == entity_type)
+    if entity_id:
+        query = query.where(ActionHistory.entity_id == entity_id)
+    return query
+
+class _CsvEncoder:
+    """Format CSV rows into a reusable buffer, one chunk per batch"""
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def header(self) -> str:
+        self.writer.writerow(EXPORT_COLUMNS)
+        return self._take()
+
+    def rows(self, rows: Iterable[Mapping[str, Any]]) -> str:
+        for row in rows:
+            self.writer.writerow([
+                json.dumps(value, default=_json_default) if isinstance(value, (dict, list))
+                else _json_default(value) if isinstance(value, (datetime, date))
+                else value
+                for value in (row[column] for column in EXPORT_COLUMNS)
+            ])
+        return self._take()
+
+    def _take(self) -> str:
+        chunk = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return chunk
+
+async def export_chunks(result, format: str = "ndjson", compress: bool = False) -> AsyncIterator[bytes]:
+    """Encode a streamed action_history result batch by batch
+
+    result is an AsyncResult from AsyncSession.stream with yield_per set, so
+    only one batch of rows (and its encoded chunk) is held at a time. With
+    compress, the chunks form a single gzip stream.
+    """
+    gzip = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(chunk: str) -> bytes:
+        data = chunk.encode("utf-8")
+        return gzip.compress(data) if gzip else data
+
+    csv_encoder = _CsvEncoder() if format == "csv" else None
+    if csv_encoder:
+        yield encode(csv_encoder.header())
+    async for rows in result.mappings().partitions():
+        chunk = csv_encoder.rows(rows) if csv_encoder else "".join(ndjson_line(row) for row in rows)
+        data = encode(chunk)
+        # The compressor buffers small batches until it has a block to emit
+        if data:
+            yield data
+    if gzip:
+        yield gzip.flush()
+
+def export_filename(format: str, compress: bool, since: datetime, until: Optional[datetime] = None) -> str:
+    name = f"action_history_{since:%Y%m%d}-{(until or datetime.utcnow()):%Y%m%d}"
+    return f"{name}.{format}{'.gz' if compress else ''}"
@@ -1,5 +1,9 @@
 from sqlalchemy.orm import Session
+from app.core.metrics import AUDIT_EVENTS
 from app.models.audit import ActionHistory
+from app.services.audit_stats import increment_rollups, rollup_key
+from app.services.audit_writer import audit_writer
+from app.services.sync_payloads import summarize_sync_result, sync_payload_store
 from typing import Dict, Any, Optional
 from datetime import datetime
 
@@ -9,30 +13,47 @@ class AuditService:
     
     def log_action(self, action_type: str, entity_type: str = None, entity_id: int = None, 
                    user_id: str = "system", action_details: Dict[str, Any] = None, 
-                   result: str = "success", error_message: str = None):
-        """Log platform action to history"""
+                   result: str = "success", error_message: str = None, durable: bool = False):
+        """Log platform action to history
         
-        audit_record = ActionHistory(
-            action_type=action_type,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            user_id=user_id,
-            action_details=action_details or {},
-            result=result,
-            error_message=error_message
-        )
+        Events are buffered and written in batches by the audit writer; pass
+        durable=True to write and commit before returning.
+        """
+        row = {
+            "action_type": action_type,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "user_id": user_id,
+            "action_details": action_details or {},
+            "result": result,
+            "error_message": error_message
+        }
+        if not durable and audit_writer.submit(row):
+            return
+        if durable:
+            AUDIT_EVENTS.labels("durable").inc()
         
-        self.db.add(audit_record)
+        self.db.add(ActionHistory(**row))
+        # Keep the hourly rollup in step, in the same transaction
+        increment_rollups(self.db, {rollup_key(action_type, result, row["action_details"]): 1})
         self.db.commit()
     
     def log_sync_action(self, restaurant_id: int, platform: str, result: Dict[str, Any], user_id: str = "system"):
-        """Log sync action"""
+        """Log sync action
+        
+        Only a summary of the platform response is kept inline (status, counts,
+        latency, payload hash, error code); the full response goes to the sync
+        payload store when it is enabled.
+        """
+        summary = summarize_sync_result(result)
+        if "payload_hash" in summary and sync_payload_store.put(summary["payload_hash"], result["response"]):
+            summary["payload_stored"] = True
         self.log_action(
             action_type="platform_sync",
             entity_type="restaurant",
             entity_id=restaurant_id,
             user_id=user_id,
-            action_details={"platform": platform, "sync_data": result},
+            action_details={"platform": platform, "sync": summary},
             result="success" if result.get("success") else "failed",
             error_message=result.get("error")
         )
@@ -53,5 +74,6 @@ class AuditService:
             action_type="config_update",
             entity_type="config",
             user_id=user_id,
-            action_details={"config_key": key}
+            action_details={"config_key": key},
+            durable=True
         )
\ No newline at end of file
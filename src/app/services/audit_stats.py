@@ -0,0 +1,153 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from app.models.audit import ActionHistory, ActionRollup
+
+# (bucket, action_type, result, platform)
+RollupKey = Tuple[datetime, str, str, str]
+
+SERIES_GROUPS = ("result", "action_type", "platform")
+
+def hour_bucket(moment: datetime) -> datetime:
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def rollup_key(action_type: str, result: Optional[str], action_details: Optional[Dict[str, Any]],
+               timestamp: Optional[datetime] = None) -> RollupKey:
+    platform = (action_details or {}).get("platform") if isinstance(action_details, dict) else None
+    return (hour_bucket(timestamp or datetime.utcnow()), action_type, result or "", platform or "")
+
+def increment_rollups(db: Session, counts: Dict[RollupKey, int]):
+    """Add counts to the hourly rollups in the caller's transaction
+
+    One upsert per key; on databases without ON CONFLICT it falls back to
+    UPDATE, then INSERT when the row doesn't exist yet.
+    """
+    if not counts:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        insert = None
+
+    # Sorted so concurrent writers lock rollup rows in the same order
+    for (bucket, action_type, result, platform), count in sorted(counts.items()):
+        values = {"bucket": bucket, "action_type": action_type, "result": result, "platform": platform}
+        if insert is not None:
+            statement = insert(ActionRollup).values(**values, count=count)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=list(values),
+                set_={"count": ActionRollup.count + statement.excluded["count"]}
+            ))
+            continue
+        updated = db.execute(
+            update(ActionRollup)
+            .where(*(getattr(ActionRollup, column) == value for column, value in values.items()))
+            .values(count=ActionRollup.count + count)
+        ).rowcount
+        if not updated:
+            db.add(ActionRollup(**values, count=count))
+            db.flush()
+
+class AuditStatsService:
+    """Audit statistics: whole hours come from action_rollups, partial hours from action_history"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _raw_counts(self, since: datetime, until: datetime) -> Counter:
+        if since >= until:
+            return Counter()
+        platform = ActionHistory.action_details["platform"].as_string()
+        rows = self.db.execute(
+            select(ActionHistory.action_type, ActionHistory.result, platform, func.count())
+            .where(ActionHistory.timestamp >= since, ActionHistory.timestamp < until)
+            .group_by(ActionHistory.action_type, ActionHistory.result, platform)
+        )
+        return Counter({(action_type, result or "", platform or ""): count for action_type, result, platform, count in rows})
+
+    def _rollup_counts(self, since: datetime, until: datetime) -> Counter:
+        rows = self.db.execute(
+            select(ActionRollup.action_type, ActionRollup.result, ActionRollup.platform, func.sum(ActionRollup.count))
+            .where(ActionRollup.bucket >= since, ActionRollup.bucket < until)
+            .group_by(ActionRollup.action_type, ActionRollup.result, ActionRollup.platform)
+        )
+        return Counter({(action_type, result, platform): int(count) for action_type, result, platform, count in rows})
+
+    def stats(self, since: datetime, until: Optional[datetime] = None) -> Dict[str, Any]:
+        """Totals, success rate and breakdowns by action type, result and platform"""
+        until = until or datetime.utcnow()
+        first_hour = hour_bucket(since)
+        if first_hour < since:
+            first_hour += timedelta(hours=1)
+        last_hour = max(hour_bucket(until), first_hour)
+
+        # The rollup holds every whole hour in the window; the two partial hours
+        # at its edges are counted from action_history, each an index range scan
+        counts = self._rollup_counts(first_hour, last_hour)
+        counts.update(self._raw_counts(since, min(first_hour, until)))
+        if last_hour < until:
+            counts.update(self._raw_counts(last_hour, until))
+
+        total = sum(counts.values())
+        successful = sum(count for (_, result, _), count in counts.items() if result == "success")
+        breakdowns = {group: Counter() for group in SERIES_GROUPS}
+        for (action_type, result, platform), count in counts.items():
+            breakdowns["action_type"][action_type] += count
+            breakdowns["result"][result or "unknown"] += count
+            if platform:
+                breakdowns["platform"][platform] += count
+
+        return {
+            "total_actions": total,
+            "successful_actions": successful,
+            "success_rate": round(successful / total * 100, 2) if total else 0,
+            "by_action_type": dict(breakdowns["action_type"]),
+            "by_result": dict(breakdowns["result"]),
+            "by_platform": dict(breakdowns["platform"]),
+        }
+
+    def series(self, since: datetime, until: Optional[datetime] = None, interval: str = "hour",
+               group_by: str = "result", action_type: Optional[str] = None,
+               result: Optional[str] = None, platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Counts per hour or day bucket from the rollup, split by one dimension
+
+        Buckets are whole UTC hours (or days), so the first bucket starts at
+        the hour containing since. Empty buckets are omitted.
+        """
+        until = until or datetime.utcnow()
+        group_column = getattr(ActionRollup, group_by)
+        query = (
+            select(ActionRollup.bucket, group_column, func.sum(ActionRollup.count))
+            .where(ActionRollup.bucket >= hour_bucket(since), ActionRollup.bucket < until)
+            .group_by(ActionRollup.bucket, group_column)
+        )
+        if action_type:
+            query = query.where(ActionRollup.action_type == action_type)
+        if result:
+            query = query.where(ActionRollup.result == result)
+        if platform:
+            query = query.where(ActionRollup.platform == platform)
+
+        # Day buckets are folded here rather than truncated in SQL, which differs per database
+        points: Dict[datetime, Counter] = {}
+        for bucket, key, count in self.db.execute(query):
+            if interval == "day":
+                bucket = bucket.replace(hour=0)
+            points.setdefault(bucket, Counter())[key or "none"] += int(count)
+
+        return [
+            {"bucket": bucket, "total": sum(counts.values()), "counts": dict(counts)}
+            for bucket, counts in sorted(points.items())
+        ]
+
+def count_rows(rows: Iterable[Dict[str, Any]]) -> Dict[RollupKey, int]:
+    """Rollup increments for a batch of action_history rows given as column dicts"""
+    return Counter(
+        rollup_key(row["action_type"], row.get("result"), row.get("action_details"), row.get("timestamp"))
+        for row in rows
+    )
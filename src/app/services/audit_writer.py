@@ -0,0 +1,156 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from app.core.database import SessionLocal
+from app.core.metrics import AUDIT_EVENTS, AUDIT_QUEUE_DEPTH, AUDIT_WRITE_DELAY
+from app.models.audit import ActionHistory
+from app.services.audit_stats import count_rows, increment_rollups
+
+logger = logging.getLogger(__name__)
+
+MAX_WRITE_ATTEMPTS = 3
+
+class AuditWriter:
+    """Queue audit rows in memory and write them in batches from a background thread
+
+    A batch is written when it reaches AUDIT_BATCH_SIZE rows or its oldest row
+    has waited AUDIT_FLUSH_INTERVAL seconds, with one INSERT, one rollup
+    update and one commit. When the queue is full, callers wait up to
+    AUDIT_ENQUEUE_TIMEOUT for space; after that the event is written inline
+    by the caller (AUDIT_OVERFLOW_POLICY=inline) or dropped (drop).
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("AUDIT_BUFFER_ENABLED", "true").lower() == "true"
+        self.batch_size = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+        self.flush_interval = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+        self.enqueue_timeout = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.05"))
+        self.overflow_policy = os.getenv("AUDIT_OVERFLOW_POLICY", "inline")
+        self._queue: "queue.Queue[Tuple[float, Dict[str, Any]]]" = queue.Queue(
+            maxsize=int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue an action_history row; False means the caller should write it itself"""
+        if not self.enabled or self._stopping.is_set():
+            return False
+        self._start()
+
+        # Stamp the event now, not when its batch is written
+        row.setdefault("timestamp", datetime.utcnow())
+        item = (time.monotonic(), row)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            AUDIT_EVENTS.labels("backpressure").inc()
+            try:
+                self._queue.put(item, timeout=self.enqueue_timeout)
+            except queue.Full:
+                if self.overflow_policy == "drop":
+                    AUDIT_EVENTS.labels("dropped").inc()
+                    logger.warning("Audit queue full, dropped %s event", row['action_type'])
+                    return True
+                AUDIT_EVENTS.labels("inline").inc()
+                return False
+
+        AUDIT_EVENTS.labels("queued").inc()
+        AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued event is written; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline or not (self._thread and self._thread.is_alive()):
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        """Write out everything queued and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._stopping.is_set():
+                return
+            self._stopping.set()
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.error("Audit writer did not finish within %ss; %s events not written", timeout, self._queue.qsize())
+        else:
+            logger.info("Audit writer flushed and stopped")
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+                # Processes without a shutdown hook (scheduler, MCP server) still flush on exit
+                atexit.register(self.stop)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _next_batch(self) -> List[Tuple[float, Dict[str, Any]]]:
+        try:
+            first = self._queue.get(timeout=0.1 if self._stopping.is_set() else self.flush_interval)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first[0] + self.flush_interval
+        while len(batch) < self.batch_size:
+            # While stopping, take what is queued without waiting for more
+            remaining = 0 if self._stopping.is_set() else deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Tuple[float, Dict[str, Any]]]):
+        rows = [row for _, row in batch]
+        try:
+            for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+                db = SessionLocal()
+                try:
+                    db.execute(insert(ActionHistory), rows)
+                    increment_rollups(db, count_rows(rows))
+                    db.commit()
+                    break
+                except Exception as e:
+                    db.rollback()
+                    if attempt == MAX_WRITE_ATTEMPTS:
+                        AUDIT_EVENTS.labels("dropped").inc(len(rows))
+                        logger.error("Dropped %s audit events after %s failed writes: %s", len(rows), attempt, e)
+                        return
+                    logger.warning("Audit batch write failed (attempt %s), retrying: %s", attempt, e)
+                    time.sleep(0.5 * attempt)
+                finally:
+                    db.close()
+
+            now = time.monotonic()
+            for queued_at, _ in batch:
+                AUDIT_WRITE_DELAY.observe(now - queued_at)
+            AUDIT_EVENTS.labels("written").inc(len(rows))
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+            AUDIT_QUEUE_DEPTH.set(self._queue.qsize())
+
+audit_writer = AuditWriter()
@@ -0,0 +1,152 @@
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+from app.core.pagination import DEFAULT_PAGE_SIZE, keyset_page, sequence_page
+from app.models.restaurant import Restaurant, MenuItem
+from app.services.audit_service import AuditService
+from app.services.menu_cache import CachedMenu, menu_cache
+from app.services.menu_versions import bump_menu_version
+
+# Sort name -> (ordering keys ending in the primary key, key values of a row)
+MENU_ITEM_SORTS = {
+    "category": (
+        (func.coalesce(MenuItem.category, ""), MenuItem.name, MenuItem.id),
+        lambda item: [item.category or "", item.name, item.id]
+    ),
+    "name": ((MenuItem.name, MenuItem.id), lambda item: [item.name, item.id]),
+    "price": ((MenuItem.price, MenuItem.id), lambda item: [item.price, item.id]),
+    "id": ((MenuItem.id,), lambda item: [item.id]),
+}
+
+RESTAURANT_SORTS = {
+    "name": ((Restaurant.name, Restaurant.id), lambda restaurant: [restaurant.name, restaurant.id]),
+    "id": ((Restaurant.id,), lambda restaurant: [restaurant.id]),
+}
+
+# Columns the sort keys read, loaded even when the caller asks for fewer
+MENU_ITEM_KEY_COLUMNS = ("id", "name", "category", "price")
+RESTAURANT_KEY_COLUMNS = ("id", "name")
+
+def _projection(model, columns: Optional[Sequence[str]], key_columns: Sequence[str]) -> List[Any]:
+    """Table columns to SELECT: the requested ones plus the sort keys, or all of them"""
+    table_columns = model.__table__.columns
+    if columns is None:
+        return list(table_columns)
+    wanted = set(columns) | set(key_columns)
+    return [column for column in table_columns if column.name in wanted]
+
+def _contains(column, text: str):
+    """Case-insensitive substring match with LIKE wildcards in the text escaped"""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+def menu_item_filters(restaurant_id: int, category: Optional[str] = None, available: Optional[bool] = None,
+                      min_price: Optional[float] = None, max_price: Optional[float] = None,
+                      search: Optional[str] = None) -> List[Any]:
+    """WHERE conditions shared by menu item listing and bulk updates"""
+    conditions = [MenuItem.restaurant_id == restaurant_id]
+    if category:
+        conditions.append(MenuItem.category == category)
+    if available is not None:
+        conditions.append(MenuItem.is_available == available)
+    if min_price is not None:
+        conditions.append(MenuItem.price >= min_price)
+    if max_price is not None:
+        conditions.append(MenuItem.price <= max_price)
+    if search:
+        conditions.append(_contains(MenuItem.name, search))
+    return conditions
+
+class CatalogService:
+    """Paginated, filtered reads of restaurants and menu items
+
+    Lists load column tuples rather than ORM objects; pass columns to load
+    only some of them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list_restaurants(self, cuisine_type: Optional[str] = None, search: Optional[str] = None,
+                         sort: str = "name", cursor: Optional[str] = None,
+                         limit: int = DEFAULT_PAGE_SIZE, columns: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        query = self.db.query(*_projection(Restaurant, columns, RESTAURANT_KEY_COLUMNS))
+        if cuisine_type:
+            query = query.filter(Restaurant.cuisine_type == cuisine_type)
+        if search:
+            query = query.filter(_contains(Restaurant.name, search))
+
+        keys, key_values = RESTAURANT_SORTS[sort]
+        return keyset_page(query, sort, keys, key_values, cursor, limit)
+
+    @staticmethod
+    def menu_page_cacheable(category: Optional[str] = None, available: Optional[bool] = None,
+                            min_price: Optional[float] = None, max_price: Optional[float] = None,
+                            search: Optional[str] = None) -> bool:
+        """Whether list_menu_items serves this listing from the menu cache
+
+        Only unfiltered listings: their pages are slices of the cached order.
+        Filtered ones use the database's indexes rather than scanning the menu.
+        """
+        return menu_cache.enabled and not (
+            category or available is not None or min_price is not None or max_price is not None or search
+        )
+
+    def list_menu_items(self, restaurant_id: int, category: Optional[str] = None,
+                        available: Optional[bool] = None, min_price: Optional[float] = None,
+                        max_price: Optional[float] = None, search: Optional[str] = None,
+                        sort: str = "category", descending: bool = False,
+                        cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                        columns: Optional[Sequence[str]] = None,
+                        menu: Optional[CachedMenu] = None) -> Dict[str, Any]:
+        """One page of menu items
+
+        Async callers pass the menu from menu_cache.aget_menu when
+        menu_page_cacheable, so the cache's Redis reads stay off the event loop.
+        Cached pages hold whole items; columns then only narrows the response
+        (see sparse_page), as there is no query to project.
+        """
+        keys, key_values = MENU_ITEM_SORTS[sort]
+        # The direction is part of the cursor's sort so a cursor can't be replayed the other way
+        sort_name = f"-{sort}" if descending else sort
+
+        if self.menu_page_cacheable(category, available, min_price, max_price, search):
+            menu = menu or menu_cache.get_menu(self.db, restaurant_id)
+            page = sequence_page(menu.ordered(sort), menu.positions[sort], sort_name, key_values,
+                                 cursor, limit, descending)
+            if page is not None:
+                return page
+
+        query = self.db.query(*_projection(MenuItem, columns, MENU_ITEM_KEY_COLUMNS)).filter(
+            *menu_item_filters(restaurant_id, category, available, min_price, max_price, search)
+        )
+        return keyset_page(query, sort_name, keys, key_values, cursor, limit, descending)
+
+    def bulk_update_menu_items(self, restaurant_id: int, values: Dict[str, Any],
+                               item_ids: Optional[List[int]] = None, **filters) -> List[int]:
+        """Apply values to the given items, or to all items matching the filters, in one UPDATE
+
+        Returns the ids of the updated items.
+        """
+        conditions = menu_item_filters(restaurant_id, **filters)
+        if item_ids is not None:
+            conditions.append(MenuItem.id.in_(item_ids))
+
+        statement = (
+            update(MenuItem)
+            .where(*conditions)
+            .values(**values)
+            .returning(MenuItem.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated_ids = sorted(self.db.scalars(statement).all())
+        if updated_ids:
+            bump_menu_version(self.db, restaurant_id)
+        self.db.commit()
+
+        AuditService(self.db).log_menu_action("bulk_update", restaurant_id, {
+            "changes": values,
+            "items_count": len(updated_ids),
+            "item_ids": updated_ids
+        })
+        return updated_ids
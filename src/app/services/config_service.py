@@ -1,8 +1,70 @@
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.core.cache import Subscription, publish, run_in_background
+from app.core.metrics import CONFIG_CACHE_REQUESTS, CONFIG_CACHE_INVALIDATIONS
 from app.models.config import ConfigParameter
 import os
+import threading
+import time
 from typing import Optional, Dict
 
+INVALIDATION_CHANNEL = "foodflow:config:invalidate"
+
+class ConfigCache:
+    """Every config_parameters value, loaded in one query and kept for CONFIG_CACHE_TTL seconds
+
+    set_config invalidates it here and, through Redis pub/sub, in every other
+    process that called start(); without Redis, other processes see a change
+    within the TTL. No Redis I/O happens in the caller: values() and
+    invalidate() run inside async endpoints (through run_sync).
+    """
+
+    def __init__(self):
+        self.ttl = float(os.getenv("CONFIG_CACHE_TTL", "60"))
+        self._values: Optional[Dict[str, str]] = None
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+        # A dropped subscription may have missed invalidations, so it evicts too
+        self._subscription = Subscription(INVALIDATION_CHANNEL, self._on_invalidation, self._evict)
+
+    def start(self) -> bool:
+        """Subscribe to invalidations from other processes (blocking; call at startup)"""
+        return self._subscription.start()
+
+    def values(self, db: Session) -> Dict[str, str]:
+        with self._lock:
+            if self._values is not None and self._expires > time.monotonic():
+                CONFIG_CACHE_REQUESTS.labels("hit").inc()
+                return self._values
+            generation = self._generation
+
+        CONFIG_CACHE_REQUESTS.labels("miss").inc()
+        values = dict(db.execute(select(ConfigParameter.key, ConfigParameter.value)).all())
+        with self._lock:
+            # An invalidation during the load means these values may predate the change
+            if generation == self._generation:
+                self._values = values
+                self._expires = time.monotonic() + self.ttl
+        return values
+
+    def invalidate(self):
+        """Drop cached values here and in every subscribed process"""
+        self._evict()
+        CONFIG_CACHE_INVALIDATIONS.labels("local").inc()
+        run_in_background(publish, INVALIDATION_CHANNEL, "*")
+
+    def _evict(self):
+        with self._lock:
+            self._values = None
+            self._generation += 1
+
+    def _on_invalidation(self, message: str):
+        self._evict()
+        CONFIG_CACHE_INVALIDATIONS.labels("remote").inc()
+
+config_cache = ConfigCache()
+
 class ConfigService:
     def __init__(self, db: Session):
         self.db = db
@@ -19,21 +81,22 @@ class ConfigService:
     
     def sync_env_to_db(self):
         """Save environment variables to database if they exist"""
+        stored = config_cache.values(self.db)
         for key in self.api_keys:
             env_value = os.getenv(key)
-            if env_value:
+            # Only write what changed, so restarts don't rewrite every credential
+            if env_value and stored.get(key) != env_value:
                 self.set_config(key, env_value)
     
     def get_config(self, key: str) -> Optional[str]:
-        """Get config value from database or environment"""
+        """Get config value from environment, then the database (through the config cache)"""
         # First try environment
         env_value = os.getenv(key)
         if env_value:
             return env_value
         
         # Then try database
-        config = self.db.query(ConfigParameter).filter(ConfigParameter.key == key).first()
-        return config.value if config else None
+        return config_cache.values(self.db).get(key)
     
     def set_config(self, key: str, value: str, description: str = None):
         """Set config value in database"""
@@ -52,12 +115,14 @@ class ConfigService:
             self.db.add(config)
         
         self.db.commit()
+        config_cache.invalidate()
     
     def get_all_api_credentials(self) -> Dict[str, str]:
         """Get all API credentials from database or environment"""
+        stored = config_cache.values(self.db)
         credentials = {}
         for key in self.api_keys:
-            value = self.get_config(key)
+            value = os.getenv(key) or stored.get(key)
             if value:
                 credentials[key] = value
         return credentials
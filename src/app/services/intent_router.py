@@ -0,0 +1,54 @@
+import re
+from typing import Dict, Any, List
+
+# Intents handled locally, without a model round-trip
+INTENT_SHOW_MENU = "show_menu"
+INTENT_SYNC = "sync"
+INTENT_STATUS = "status"
+# Intents that need the model
+INTENT_MENU_ANALYSIS = "menu_analysis"
+INTENT_CHAT = "chat"
+
+LOCAL_INTENTS = {INTENT_SHOW_MENU, INTENT_SYNC, INTENT_STATUS}
+
+PLATFORM_PATTERNS = {
+    "uber_eats": re.compile(r"\buber\b"),
+    "deliveroo": re.compile(r"\bdeliveroo\b"),
+    "just_eat": re.compile(r"\bjust[\s-]?eat\b"),
+}
+
+_QUESTION = re.compile(r"^\s*(how|why|when|what is|what does)\b")
+_STATUS = re.compile(r"\b(status|last sync|sync history)\b")
+# Only an imperative at the start of the message is a sync command
+_SYNC = re.compile(r"^\s*(please\s+)?(sync|synchroni[sz]e)\b")
+_NEGATION = re.compile(r"\b(don'?t|do not|never|not|no|stop|cancel|without)\b")
+_SHOW = re.compile(r"\b(show|display|list|see|view|what'?s on)\b")
+_MENU = re.compile(r"\bmenu\b")
+_SCAN = re.compile(r"\b(menu|scan|analy[sz]e|extract)\b")
+
+def extract_platforms(message: str) -> List[str]:
+    """Return the delivery platforms named in a message, in canonical order"""
+    text = message.lower()
+    return [platform for platform, pattern in PLATFORM_PATTERNS.items() if pattern.search(text)]
+
+def classify_intent(message: str, has_image: bool = False) -> Dict[str, Any]:
+    """Classify a chat message locally so deterministic commands skip the LLM"""
+    text = (message or "").lower()
+
+    if has_image:
+        intent = INTENT_MENU_ANALYSIS if _SCAN.search(text) else INTENT_CHAT
+        return {"intent": intent, "platforms": []}
+
+    # Open questions ("how do I sync?") are for the model, not commands
+    if _QUESTION.search(text):
+        return {"intent": INTENT_CHAT, "platforms": []}
+
+    if _STATUS.search(text):
+        return {"intent": INTENT_STATUS, "platforms": extract_platforms(text)}
+    # Anything ambiguous ("don't sync yet", "sync now?") falls through to the model
+    if _SYNC.search(text) and not _NEGATION.search(text) and not text.rstrip().endswith("?"):
+        return {"intent": INTENT_SYNC, "platforms": extract_platforms(text)}
+    if _SHOW.search(text) and _MENU.search(text):
+        return {"intent": INTENT_SHOW_MENU, "platforms": []}
+
+    return {"intent": INTENT_CHAT, "platforms": []}
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Optional
+from app.core.cache import get_redis_client
+from app.core.metrics import LLM_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+def normalize_text(text: str) -> str:
+    """Normalize OCR text so trivially different scans share a cache key"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip()
+
+class LLMResponseCache:
+    """Cache parsed LLM results in Redis, or on local disk when Redis is unavailable"""
+
+    def __init__(self, namespace: str, ttl: int = None, max_entries: int = None, cache_dir: str = None):
+        self.namespace = namespace
+        self.ttl = ttl or int(os.getenv("LLM_CACHE_TTL", "604800"))  # 7 days
+        self.max_entries = max_entries or int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+        self.cache_dir = os.path.join(
+            cache_dir or os.getenv("LLM_CACHE_DIR", "/tmp/foodflow_llm_cache"), namespace
+        )
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+
+    def make_key(self, text: str, prompt_version: str, model: str) -> str:
+        digest = hashlib.sha256(
+            f"{prompt_version}\0{model}\0{normalize_text(text)}".encode("utf-8")
+        ).hexdigest()
+        return f"foodflow:llm:{self.namespace}:{digest}"
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        value = None
+        try:
+            redis_client = get_redis_client()
+            if redis_client is not None:
+                raw = redis_client.get(key)
+                value = json.loads(raw) if raw else None
+            else:
+                value = self._disk_get(key)
+        except Exception as e:
+            logger.warning("LLM cache read failed: %s", e)
+
+        LLM_CACHE_REQUESTS.labels(self.namespace, "hit" if value is not None else "miss").inc()
+        return value
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+
+        try:
+            payload = json.dumps(value)
+            redis_client = get_redis_client()
+            if redis_client is not None:
+                redis_client.setex(key, self.ttl, payload)
+            else:
+                self._disk_set(key, payload)
+            LLM_CACHE_REQUESTS.labels(self.namespace, "store").inc()
+        except Exception as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key.rsplit(":", 1)[-1] + ".json")
+
+    def _disk_get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _disk_set(self, key: str, payload: str):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        entries = []
+        now = time.time()
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                mtime = entry.stat().st_mtime
+                if now - mtime > self.ttl:
+                    self._remove(entry.path)
+                else:
+                    entries.append((mtime, entry.path))
+
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_entries]:
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
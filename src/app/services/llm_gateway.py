@@ -0,0 +1,325 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from app.core.lazy import lazy_import
+from app.core.metrics import LLM_QUEUE_WAIT, LLM_QUEUE_DEPTH, LLM_IN_FLIGHT, LLM_REJECTED
+from app.services.llm_usage import usage_tracker
+
+logger = logging.getLogger(__name__)
+
+openai = lazy_import("openai")
+
+# Lower value is admitted first: interactive chat goes ahead of bulk scans
+PRIORITIES = {"interactive": 0, "bulk": 10}
+
+DEFAULT_TIMEOUTS = {
+    "interactive": float(os.getenv("LLM_INTERACTIVE_TIMEOUT", "30")),
+    "bulk": float(os.getenv("LLM_BULK_TIMEOUT", "120")),
+}
+
+def _is_retryable(error: Exception) -> bool:
+    """Transient failures retried by the gateway; clients are built with max_retries=0
+    so every attempt is counted here"""
+    return isinstance(error, (
+        openai.APIConnectionError,  # includes APITimeoutError
+        openai.RateLimitError,
+        openai.InternalServerError,
+    ))
+
+class LLMQueueFullError(Exception):
+    """The gateway queue is at capacity; the caller should back off"""
+
+class LLMDeadlineExceeded(TimeoutError):
+    """The call's deadline passed while waiting for a slot"""
+
+def _outcome_for(error: Exception) -> str:
+    if isinstance(error, openai.APITimeoutError):
+        return "timeout"
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    return "error"
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """Parse 'gpt-4o=4,gpt-3.5-turbo=16' into a per-model limit map"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        model, _, value = part.partition("=")
+        limits[model.strip()] = int(value)
+    return limits
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "wake", "granted", "abandoned")
+
+    def __init__(self, priority: int, seq: int, wake: Callable[[], None]):
+        self.priority = priority
+        self.seq = seq
+        self.wake = wake
+        self.granted = False
+        self.abandoned = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class LLMGateway:
+    """Admission control shared by every OpenAI call site
+
+    Each model has a max-in-flight limit. Callers beyond it wait in a bounded
+    priority queue; a full queue rejects immediately and a caller whose deadline
+    passes while queued gives up. The remaining deadline is passed on to the
+    OpenAI request as its timeout, and transient errors are retried within it.
+    Every call is recorded by the usage tracker. Works for both threads and
+    asyncio callers.
+    """
+
+    def __init__(self, max_in_flight: Dict[str, int] = None, default_max_in_flight: int = None,
+                 max_queue: int = None):
+        self.max_in_flight = max_in_flight if max_in_flight is not None else _parse_limits(
+            os.getenv("LLM_MAX_IN_FLIGHT_PER_MODEL", "")
+        )
+        self.default_max_in_flight = default_max_in_flight or int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+        self.max_queue = max_queue or int(os.getenv("LLM_MAX_QUEUE", "100"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._waiting: Dict[str, list] = defaultdict(list)
+        self._queued = 0
+        self._seq = itertools.count()
+
+    def _limit(self, model: str) -> int:
+        return self.max_in_flight.get(model, self.default_max_in_flight)
+
+    def _enqueue(self, model: str, priority: str, wake: Callable[[], None]) -> Optional[_Waiter]:
+        """Take a slot if one is free (returns None), otherwise queue a waiter
+
+        wake is set before the waiter is visible to _release, which may call it
+        as soon as the lock is dropped.
+        """
+        with self._lock:
+            if self._in_flight[model] < self._limit(model) and not self._waiting[model]:
+                self._in_flight[model] += 1
+                LLM_IN_FLIGHT.labels(model).inc()
+                return None
+
+            if self._queued >= self.max_queue:
+                LLM_REJECTED.labels(model, priority, "queue_full").inc()
+                raise LLMQueueFullError(f"LLM queue full ({self.max_queue} waiting)")
+
+            waiter = _Waiter(PRIORITIES[priority], next(self._seq), wake)
+            heapq.heappush(self._waiting[model], waiter)
+            self._queued += 1
+            LLM_QUEUE_DEPTH.inc()
+            return waiter
+
+    def _release(self, model: str):
+        """Free a slot and hand it to the best waiter, if any"""
+        with self._lock:
+            waiting = self._waiting[model]
+            while waiting:
+                waiter = heapq.heappop(waiting)
+                if waiter.abandoned:
+                    continue
+                # Slot passes straight to the waiter; in-flight count is unchanged
+                waiter.granted = True
+                self._queued -= 1
+                LLM_QUEUE_DEPTH.dec()
+                waiter.wake()
+                return
+            self._in_flight[model] -= 1
+            LLM_IN_FLIGHT.labels(model).dec()
+
+    def _abandon(self, model: str, waiter: _Waiter, priority: str, reason: str = "deadline"):
+        """Withdraw a waiter that gave up; give back the slot if it raced in"""
+        with self._lock:
+            granted = waiter.granted
+            if not granted:
+                waiter.abandoned = True
+                self._queued -= 1
+                LLM_QUEUE_DEPTH.dec()
+        if granted:
+            self._release(model)
+        LLM_REJECTED.labels(model, priority, reason).inc()
+
+    def _acquire(self, model: str, priority: str, deadline: float):
+        start = time.monotonic()
+        event = threading.Event()
+        waiter = self._enqueue(model, priority, event.set)
+        if waiter is not None:
+            if not event.wait(max(0.0, deadline - time.monotonic())):
+                self._abandon(model, waiter, priority)
+                raise LLMDeadlineExceeded(f"Timed out waiting for an LLM slot for {model}")
+        LLM_QUEUE_WAIT.labels(model, priority).observe(time.monotonic() - start)
+
+    async def _aacquire(self, model: str, priority: str, deadline: float):
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve():
+            if not future.done():
+                future.set_result(None)
+
+        waiter = self._enqueue(model, priority, lambda: loop.call_soon_threadsafe(resolve))
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(future, max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                self._abandon(model, waiter, priority)
+                raise LLMDeadlineExceeded(f"Timed out waiting for an LLM slot for {model}")
+            except asyncio.CancelledError:
+                self._abandon(model, waiter, priority, "cancelled")
+                raise
+        LLM_QUEUE_WAIT.labels(model, priority).observe(time.monotonic() - start)
+
+    @staticmethod
+    def _deadline(priority: str, timeout: Optional[float]) -> float:
+        return time.monotonic() + (timeout if timeout is not None else DEFAULT_TIMEOUTS[priority])
+
+    def _retry_delay(self, error: Exception, retries: int, deadline: float) -> Optional[float]:
+        """Backoff before the next attempt, or None if the call should not be retried"""
+        if retries >= self.max_retries or not _is_retryable(error):
+            return None
+        delay = min(8.0, 0.5 * 2 ** retries)
+        # Only retry if the backoff still leaves time for a meaningful attempt
+        return delay if time.monotonic() + delay + 1.0 < deadline else None
+
+    def _admit(self, model: str, operation: str, priority: str, restaurant_id: Optional[int], deadline: float):
+        start = time.monotonic()
+        try:
+            self._acquire(model, priority, deadline)
+        except (LLMQueueFullError, LLMDeadlineExceeded):
+            usage_tracker.record(model, operation, restaurant_id, time.monotonic() - start, "rejected")
+            raise
+
+    async def _aadmit(self, model: str, operation: str, priority: str, restaurant_id: Optional[int], deadline: float):
+        start = time.monotonic()
+        try:
+            await self._aacquire(model, priority, deadline)
+        except (LLMQueueFullError, LLMDeadlineExceeded):
+            usage_tracker.record(model, operation, restaurant_id, time.monotonic() - start, "rejected")
+            raise
+
+    def complete(self, client, *, operation: str, priority: str = "bulk", timeout: Optional[float] = None,
+                 restaurant_id: Optional[int] = None, **request) -> Any:
+        """Run a chat completion with a sync OpenAI client"""
+        model = request["model"]
+        deadline = self._deadline(priority, timeout)
+        self._admit(model, operation, priority, restaurant_id, deadline)
+        start = time.monotonic()
+        retries, outcome, response = 0, "error", None
+        try:
+            while True:
+                try:
+                    response = client.chat.completions.create(
+                        timeout=max(0.1, deadline - time.monotonic()), **request
+                    )
+                    outcome = "success"
+                    return response
+                except Exception as e:
+                    delay = self._retry_delay(e, retries, deadline)
+                    if delay is None:
+                        outcome = _outcome_for(e)
+                        raise
+                    retries += 1
+                    logger.warning("Retrying %s %s call in %.1fs (%s/%s): %s", model, operation, delay, retries, self.max_retries, e)
+                    time.sleep(delay)
+        finally:
+            usage_tracker.record(model, operation, restaurant_id, time.monotonic() - start,
+                                 outcome, retries, getattr(response, "usage", None))
+            self._release(model)
+
+    async def acomplete(self, client, *, operation: str, priority: str = "interactive", timeout: Optional[float] = None,
+                        restaurant_id: Optional[int] = None, **request) -> Any:
+        """Run a chat completion with an AsyncOpenAI client"""
+        model = request["model"]
+        deadline = self._deadline(priority, timeout)
+        await self._aadmit(model, operation, priority, restaurant_id, deadline)
+        start = time.monotonic()
+        retries, outcome, response = 0, "error", None
+        try:
+            while True:
+                try:
+                    response = await client.chat.completions.create(
+                        timeout=max(0.1, deadline - time.monotonic()), **request
+                    )
+                    outcome = "success"
+                    return response
+                except asyncio.CancelledError:
+                    outcome = "cancelled"
+                    raise
+                except Exception as e:
+                    delay = self._retry_delay(e, retries, deadline)
+                    if delay is None:
+                        outcome = _outcome_for(e)
+                        raise
+                    retries += 1
+                    logger.warning("Retrying %s %s call in %.1fs (%s/%s): %s", model, operation, delay, retries, self.max_retries, e)
+                    await asyncio.sleep(delay)
+        finally:
+            usage_tracker.record(model, operation, restaurant_id, time.monotonic() - start,
+                                 outcome, retries, getattr(response, "usage", None))
+            self._release(model)
+
+    async def astream(self, client, *, operation: str, priority: str = "interactive", timeout: Optional[float] = None,
+                      restaurant_id: Optional[int] = None, **request) -> AsyncIterator[Any]:
+        """Stream chat completion chunks, holding the slot until the stream is closed"""
+        model = request["model"]
+        deadline = self._deadline(priority, timeout)
+        await self._aadmit(model, operation, priority, restaurant_id, deadline)
+        start = time.monotonic()
+        retries, outcome, usage = 0, "error", None
+        try:
+            while True:
+                try:
+                    stream = await client.chat.completions.create(
+                        timeout=max(0.1, deadline - time.monotonic()),
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **request
+                    )
+                    break
+                except Exception as e:
+                    delay = self._retry_delay(e, retries, deadline)
+                    if delay is None:
+                        outcome = _outcome_for(e)
+                        raise
+                    retries += 1
+                    await asyncio.sleep(delay)
+
+            try:
+                async for chunk in stream:
+                    # With include_usage the final chunk carries token counts and no choices
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = chunk.usage
+                    yield chunk
+                outcome = "success"
+            except (asyncio.CancelledError, GeneratorExit):
+                outcome = "cancelled"
+                raise
+            except Exception as e:
+                outcome = _outcome_for(e)
+                raise
+            finally:
+                await stream.close()
+        finally:
+            usage_tracker.record(model, operation, restaurant_id, time.monotonic() - start,
+                                 outcome, retries, usage)
+            self._release(model)
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "max_queue": self.max_queue,
+                "in_flight": {model: count for model, count in self._in_flight.items() if count},
+                "limits": {"default": self.default_max_in_flight, **self.max_in_flight},
+            }
+
+# Global gateway instance (one per worker process)
+llm_gateway = LLMGateway()
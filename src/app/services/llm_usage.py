@@ -0,0 +1,119 @@
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.core.metrics import (
+    LLM_CALLS, LLM_REQUEST_LATENCY, LLM_TOKENS, LLM_TOKENS_PER_CALL, LLM_RETRIES
+)
+
+class LLMUsageTracker:
+    """Record every model call as Prometheus metrics plus per-restaurant aggregates
+
+    Aggregates are kept in memory per worker process, since process start. A
+    rolling window of recent calls per model feeds the model router.
+    """
+
+    # Outcomes that say something about the model; rejections are local
+    HEALTH_OUTCOMES = {"success", "error", "timeout", "rate_limited", "cancelled"}
+    ERROR_OUTCOMES = {"error", "timeout", "rate_limited"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple, Dict[str, Any]] = {}
+        self._recent: Dict[str, deque] = defaultdict(lambda: deque(maxlen=200))
+        self.window_seconds = int(os.getenv("LLM_ROUTER_WINDOW_SECONDS", "600"))
+        self.since = datetime.utcnow()
+
+    def record(self, model: str, operation: str, restaurant_id: Optional[int], latency: float,
+               outcome: str, retries: int = 0, usage: Any = None):
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+
+        LLM_CALLS.labels(model, operation, outcome).inc()
+        LLM_REQUEST_LATENCY.labels(model, operation, outcome).observe(latency)
+        if retries:
+            LLM_RETRIES.labels(model, operation).inc(retries)
+        if usage is not None:
+            LLM_TOKENS.labels(model, operation, "prompt").inc(prompt_tokens)
+            LLM_TOKENS.labels(model, operation, "completion").inc(completion_tokens)
+            LLM_TOKENS_PER_CALL.labels(model, "prompt").observe(prompt_tokens)
+            LLM_TOKENS_PER_CALL.labels(model, "completion").observe(completion_tokens)
+
+        key = (restaurant_id, model, operation)
+        with self._lock:
+            if outcome in self.HEALTH_OUTCOMES:
+                # Cancelled calls (e.g. hedge losers) still show how slow the model was
+                self._recent[model].append((time.monotonic(), latency, outcome in self.ERROR_OUTCOMES))
+
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    "calls": 0, "errors": 0, "retries": 0,
+                    "prompt_tokens": 0, "completion_tokens": 0,
+                    "latency_total": 0.0, "latency_max": 0.0,
+                    "outcomes": {}
+                }
+            stats["calls"] += 1
+            stats["errors"] += outcome not in ("success", "cancelled")
+            stats["retries"] += retries
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+            stats["outcomes"][outcome] = stats["outcomes"].get(outcome, 0) + 1
+
+    def get_model_health(self, model: str) -> Dict[str, Any]:
+        """Rolling p95 latency and error rate for a model over the recent window"""
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = [(latency, failed) for ts, latency, failed in self._recent[model] if ts >= cutoff]
+
+        if not samples:
+            return {"model": model, "samples": 0, "p95_latency": None, "error_rate": None}
+
+        latencies = sorted(latency for latency, _ in samples)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return {
+            "model": model,
+            "samples": len(samples),
+            "p95_latency": round(p95, 3),
+            "error_rate": round(sum(failed for _, failed in samples) / len(samples), 3)
+        }
+
+    def get_usage(self, restaurant_id: Optional[int] = None) -> Dict[str, Any]:
+        """Aggregate usage per restaurant, broken down by model and operation"""
+        restaurants: Dict[Any, Dict[str, Any]] = {}
+        with self._lock:
+            for (rid, model, operation), stats in self._stats.items():
+                if restaurant_id is not None and rid != restaurant_id:
+                    continue
+                entry = restaurants.setdefault(rid, {
+                    "restaurant_id": rid, "calls": 0, "errors": 0,
+                    "prompt_tokens": 0, "completion_tokens": 0, "breakdown": []
+                })
+                entry["calls"] += stats["calls"]
+                entry["errors"] += stats["errors"]
+                entry["prompt_tokens"] += stats["prompt_tokens"]
+                entry["completion_tokens"] += stats["completion_tokens"]
+                entry["breakdown"].append({
+                    "model": model,
+                    "operation": operation,
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "prompt_tokens": stats["prompt_tokens"],
+                    "completion_tokens": stats["completion_tokens"],
+                    "avg_latency_ms": round(stats["latency_total"] / stats["calls"] * 1000, 1),
+                    "max_latency_ms": round(stats["latency_max"] * 1000, 1),
+                    "outcomes": dict(stats["outcomes"])
+                })
+
+        return {
+            "since": self.since.isoformat() + "Z",
+            "restaurants": list(restaurants.values())
+        }
+
+# Global usage tracker (one per worker process)
+usage_tracker = LLMUsageTracker()
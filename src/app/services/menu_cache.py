@@ -0,0 +1,272 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, ConfigDict
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.cache import Subscription, get_redis_client, publish, run_in_background
+from app.core.metrics import MENU_CACHE_REQUESTS, MENU_CACHE_INVALIDATIONS, MENU_CACHE_ENTRIES
+from app.models.restaurant import Restaurant, MenuItem
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "foodflow:menu:invalidate"
+
+class CachedMenuItem(BaseModel):
+    """Read-only copy of a menu_items row"""
+    model_config = ConfigDict(frozen=True)
+
+    id: int
+    restaurant_id: int
+    name: str
+    description: Optional[str] = None
+    price: float
+    category: Optional[str] = None
+    is_available: Optional[bool] = None
+    image_url: Optional[str] = None
+    allergens: Optional[List[Any]] = None
+    nutritional_info: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+class CachedMenu:
+    """A restaurant's whole menu, with each list sort's order as computed by the database
+
+    Text sorts follow the database collation, which Python's string ordering
+    doesn't reproduce, so the orders are loaded rather than sorted here. Each
+    sort's item list and id -> index positions are built once, so a page
+    costs O(limit) rather than O(menu size).
+    """
+
+    def __init__(self, menu_version: int, items: List[CachedMenuItem], orders: Dict[str, List[int]]):
+        self.menu_version = menu_version
+        self.items = items
+        self.orders = orders
+        by_id = {item.id: item for item in items}
+        self._ordered = {sort: [by_id[item_id] for item_id in ids] for sort, ids in orders.items()}
+        self.positions = {sort: {item_id: index for index, item_id in enumerate(ids)} for sort, ids in orders.items()}
+
+    def ordered(self, sort: str) -> List[CachedMenuItem]:
+        """Items in the sort's ascending order; shared, so don't modify it"""
+        return self._ordered[sort]
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "menu_version": self.menu_version,
+            "items": [item.model_dump(mode="json") for item in self.items],
+            "orders": self.orders,
+        })
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> "CachedMenu":
+        data = json.loads(raw)
+        items = [CachedMenuItem.model_validate(item) for item in data["items"]]
+        return cls(data["menu_version"], items, data["orders"])
+
+def load_menu(db: Session, restaurant_id: int) -> CachedMenu:
+    """Read a restaurant's menu and the order of every list sort in one query"""
+    # Imported here: the catalog service reads through this cache
+    from app.services.catalog_service import MENU_ITEM_SORTS
+
+    # Read the version first: a write landing before the items query can only
+    # make the cached version older than the data, which costs a reload, never staleness
+    menu_version = db.scalar(select(Restaurant.menu_version).where(Restaurant.id == restaurant_id)) or 0
+
+    ranks = {
+        sort: func.row_number().over(order_by=keys).label(f"rank_{sort}")
+        for sort, (keys, _) in MENU_ITEM_SORTS.items()
+    }
+    rows = db.execute(
+        select(*MenuItem.__table__.columns, *ranks.values())
+        .where(MenuItem.restaurant_id == restaurant_id)
+        .order_by(MenuItem.id)
+    ).mappings().all()
+
+    columns = CachedMenuItem.model_fields.keys()
+    items = [CachedMenuItem.model_construct(**{column: row[column] for column in columns}) for row in rows]
+    orders = {
+        sort: [row["id"] for row in sorted(rows, key=lambda row: row[f"rank_{sort}"])]
+        for sort in ranks
+    }
+    return CachedMenu(menu_version, items, orders)
+
+class MenuCache:
+    """Read-through cache of whole restaurant menus: in-process LRU, then Redis, then the database
+
+    Writers call invalidate() after commit (see menu_versions). With Redis,
+    the invalidation is published to every process; without it, or until
+    start() has subscribed, local entries are checked against the
+    restaurant's menu_version, which is a one-row read instead of the whole
+    menu. Async callers use aget_menu, which keeps Redis I/O off the event loop.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("MENU_CACHE_ENABLED", "true").lower() == "true"
+        self.max_entries = int(os.getenv("MENU_CACHE_MAX_RESTAURANTS", "256"))
+        self.ttl = int(os.getenv("MENU_CACHE_TTL", "300"))
+        self._entries: "OrderedDict[int, Tuple[float, CachedMenu]]" = OrderedDict()
+        # Bumped on every invalidation, so a load that raced with a write is not stored;
+        # the epoch is bumped by clear(), which also stands for invalidations that were missed
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._subscription = Subscription(INVALIDATION_CHANNEL, self._on_invalidation, self.clear)
+
+    def start(self) -> bool:
+        """Subscribe to invalidations from other processes (blocking; call at startup)"""
+        return self.enabled and self._subscription.start()
+
+    def get_menu(self, db: Session, restaurant_id: int) -> CachedMenu:
+        if not self.enabled:
+            return load_menu(db, restaurant_id)
+        redis_client = self._redis()
+
+        menu, generation = self._local(restaurant_id)
+        if menu is not None:
+            if redis_client is not None or self._is_current(db, restaurant_id, menu):
+                MENU_CACHE_REQUESTS.labels("local", "hit").inc()
+                return menu
+            MENU_CACHE_REQUESTS.labels("local", "stale").inc()
+
+        menu = None
+        if redis_client is not None:
+            redis_generation, menu = self._redis_get(redis_client, restaurant_id)
+            MENU_CACHE_REQUESTS.labels("redis", "hit" if menu else "miss").inc()
+        if menu is None:
+            menu = load_menu(db, restaurant_id)
+            if redis_client is not None:
+                self._redis_set(redis_client, restaurant_id, redis_generation, menu)
+
+        self._store(restaurant_id, generation, menu)
+        return menu
+
+    async def aget_menu(self, db: AsyncSession, restaurant_id: int) -> CachedMenu:
+        """get_menu for async callers: Redis calls run in a worker thread, queries through run_sync"""
+        if not self.enabled:
+            return await db.run_sync(load_menu, restaurant_id)
+        redis_client = self._redis()
+
+        menu, generation = self._local(restaurant_id)
+        if menu is not None:
+            if redis_client is not None or await db.run_sync(self._is_current, restaurant_id, menu):
+                MENU_CACHE_REQUESTS.labels("local", "hit").inc()
+                return menu
+            MENU_CACHE_REQUESTS.labels("local", "stale").inc()
+
+        menu = None
+        if redis_client is not None:
+            redis_generation, menu = await asyncio.to_thread(self._redis_get, redis_client, restaurant_id)
+            MENU_CACHE_REQUESTS.labels("redis", "hit" if menu else "miss").inc()
+        if menu is None:
+            menu = await db.run_sync(load_menu, restaurant_id)
+            if redis_client is not None:
+                await asyncio.to_thread(self._redis_set, redis_client, restaurant_id, redis_generation, menu)
+
+        self._store(restaurant_id, generation, menu)
+        return menu
+
+    def invalidate(self, *restaurant_ids: int):
+        """Drop the restaurants' menus here, in Redis, and in every subscribed process
+
+        Only the local eviction happens in the caller, which may be an
+        after_commit hook on the event loop; Redis is updated in the background.
+        """
+        if not self.enabled or not restaurant_ids:
+            return
+        self._evict(restaurant_ids)
+        MENU_CACHE_INVALIDATIONS.labels("local").inc(len(restaurant_ids))
+
+        # Published even when this process isn't subscribed, so others still hear of the write
+        run_in_background(self._invalidate_redis, restaurant_ids)
+
+    def _invalidate_redis(self, restaurant_ids):
+        redis_client = get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            # A new generation orphans the stored menu, including one a racing load is about to write
+            pipeline = redis_client.pipeline()
+            for restaurant_id in restaurant_ids:
+                pipeline.incr(self._generation_key(restaurant_id))
+            pipeline.execute()
+        except Exception as e:
+            logger.warning("Menu cache invalidation in Redis failed: %s", e)
+        publish(INVALIDATION_CHANNEL, ",".join(str(restaurant_id) for restaurant_id in restaurant_ids))
+
+    def _local(self, restaurant_id: int) -> Tuple[Optional[CachedMenu], Tuple[int, int]]:
+        """The unexpired local menu (or None) and the restaurant's current generation"""
+        with self._lock:
+            entry = self._entries.get(restaurant_id)
+            generation = (self._epoch, self._generations.get(restaurant_id, 0))
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(restaurant_id)
+                return entry[1], generation
+        MENU_CACHE_REQUESTS.labels("local", "miss").inc()
+        return None, generation
+
+    def _store(self, restaurant_id: int, generation: Tuple[int, int], menu: CachedMenu):
+        with self._lock:
+            # An invalidation during the load means this menu may predate the write
+            if (self._epoch, self._generations.get(restaurant_id, 0)) == generation:
+                self._entries[restaurant_id] = (time.monotonic() + self.ttl, menu)
+                self._entries.move_to_end(restaurant_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            MENU_CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._epoch += 1
+            MENU_CACHE_ENTRIES.set(0)
+
+    def _evict(self, restaurant_ids):
+        with self._lock:
+            for restaurant_id in restaurant_ids:
+                self._entries.pop(restaurant_id, None)
+                self._generations[restaurant_id] = self._generations.get(restaurant_id, 0) + 1
+            MENU_CACHE_ENTRIES.set(len(self._entries))
+
+    def _on_invalidation(self, message: str):
+        restaurant_ids = [int(part) for part in message.split(",") if part]
+        self._evict(restaurant_ids)
+        MENU_CACHE_INVALIDATIONS.labels("remote").inc(len(restaurant_ids))
+
+    def _redis(self):
+        # Without a live subscription, local entries can't be trusted across processes.
+        # Never connects: get_redis_client() already ran in start()
+        return get_redis_client() if self._subscription.active else None
+
+    def _is_current(self, db: Session, restaurant_id: int, menu: CachedMenu) -> bool:
+        version = db.scalar(select(Restaurant.menu_version).where(Restaurant.id == restaurant_id))
+        return version == menu.menu_version
+
+    @staticmethod
+    def _generation_key(restaurant_id: int) -> str:
+        return f"foodflow:menu:{restaurant_id}:generation"
+
+    def _redis_get(self, redis_client, restaurant_id: int) -> Tuple[int, Optional[CachedMenu]]:
+        try:
+            generation = int(redis_client.get(self._generation_key(restaurant_id)) or 0)
+            raw = redis_client.get(f"foodflow:menu:{restaurant_id}:{generation}")
+            return generation, CachedMenu.from_json(raw) if raw else None
+        except Exception as e:
+            logger.warning("Menu cache read from Redis failed: %s", e)
+            return -1, None
+
+    def _redis_set(self, redis_client, restaurant_id: int, generation: int, menu: CachedMenu):
+        if generation < 0:
+            return
+        try:
+            redis_client.setex(f"foodflow:menu:{restaurant_id}:{generation}", self.ttl, menu.to_json())
+        except Exception as e:
+            logger.warning("Menu cache write to Redis failed: %s", e)
+
+menu_cache = MenuCache()
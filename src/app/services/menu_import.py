@@ -0,0 +1,313 @@
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app.models.restaurant import Restaurant, MenuItem
+from app.services.audit_service import AuditService
+from app.services.menu_versions import bump_menu_version
+
+logger = logging.getLogger(__name__)
+
+IMPORT_MODES = ("insert", "upsert")
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+# Largest single element a JSON array upload may buffer before it is rejected as malformed
+MAX_JSON_ITEM_CHARS = 1_000_000
+
+COPY_COLUMNS = [
+    "restaurant_id", "name", "description", "price", "category",
+    "is_available", "image_url", "allergens", "nutritional_info",
+]
+
+class MenuImportError(ValueError):
+    """The upload can't be imported at all (unknown format, unreadable file)"""
+
+class MenuImportRow(BaseModel):
+    name: str
+    price: float
+    description: Optional[str] = None
+    category: str = "Other"
+    is_available: bool = True
+    image_url: Optional[str] = None
+    allergens: Optional[List[str]] = None
+    nutritional_info: Optional[Dict[str, Any]] = None
+
+    @field_validator("name")
+    @classmethod
+    def name_not_blank(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("name must not be blank")
+        return value
+
+    @field_validator("price")
+    @classmethod
+    def price_not_negative(cls, value: float) -> float:
+        if value < 0:
+            raise ValueError("price must not be negative")
+        return value
+
+    @field_validator("allergens", mode="before")
+    @classmethod
+    def split_allergens(cls, value):
+        # CSV cells hold a JSON list or a ;-separated list
+        if isinstance(value, str):
+            if value.lstrip().startswith("["):
+                return json.loads(value)
+            return [part.strip() for part in value.split(";") if part.strip()]
+        return value
+
+    @field_validator("nutritional_info", mode="before")
+    @classmethod
+    def parse_nutritional_info(cls, value):
+        return json.loads(value) if isinstance(value, str) else value
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Guess the upload format from its file extension or content type"""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type or "jsonlines" in content_type:
+        return "ndjson"
+    if name.endswith(".json") or content_type == "application/json":
+        return "json"
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    raise MenuImportError("Unknown upload format; pass format=csv, json or ndjson")
+
+def _text(stream: BinaryIO) -> io.TextIOWrapper:
+    # utf-8-sig drops the BOM spreadsheet exports put at the start of CSV files
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+def _iter_csv(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    reader = csv.DictReader(_text(stream))
+    for row_number, row in enumerate(reader, start=1):
+        # Empty cells mean "not set" so the row model's defaults apply
+        yield row_number, {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+
+def _iter_ndjson(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    for row_number, line in enumerate(_text(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, e
+
+def _iter_json_array(stream: BinaryIO, chunk_size: int = 65536) -> Iterator[Tuple[int, Any]]:
+    """Yield the elements of a top-level JSON array without loading the whole document"""
+    decoder = json.JSONDecoder()
+    reader = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer, pos, eof = "", 0, False
+    started = False
+    # What the grammar allows next: a value (or "]" right after "["), or a separator
+    expect_value, allow_close = True, True
+    row_number = 0
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + reader.decode(chunk, final=eof)
+        pos = 0
+        return True
+
+    def truncated(error: json.JSONDecodeError) -> bool:
+        # Input cut off mid-element fails at (or just before) the end of the buffer, except for
+        # an unterminated string, which reports where the string began; anything else is malformed
+        if len(buffer) - pos > MAX_JSON_ITEM_CHARS:
+            return False
+        return error.msg.startswith("Unterminated string") or error.pos >= len(buffer) - 16
+
+    while True:
+        # Skip whitespace, reading more input as needed
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                raise MenuImportError("Unexpected end of JSON upload")
+            continue
+
+        if not started:
+            if buffer[pos] != "[":
+                raise MenuImportError("JSON upload must be an array of menu items")
+            started = True
+            pos += 1
+            continue
+        if buffer[pos] == "]":
+            if not allow_close:
+                raise MenuImportError(f"Invalid JSON after item {row_number}: trailing comma")
+            return
+        if not expect_value:
+            if buffer[pos] != ",":
+                raise MenuImportError(f"Invalid JSON after item {row_number}: expected ',' or ']'")
+            expect_value, allow_close = True, False
+            pos += 1
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            # The element may just be cut off at the end of the buffer
+            if truncated(e) and fill():
+                continue
+            raise MenuImportError(f"Invalid JSON after item {row_number}: {e.msg}")
+        if end == len(buffer) and not eof:
+            # A number at the end of the buffer may continue in the next chunk
+            if fill():
+                continue
+        row_number += 1
+        pos = end
+        expect_value, allow_close = False, True
+        yield row_number, value
+
+ROW_READERS = {"csv": _iter_csv, "ndjson": _iter_ndjson, "json": _iter_json_array}
+
+def _format_errors(error: Exception) -> List[str]:
+    if isinstance(error, ValidationError):
+        return [f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()]
+    return [str(error)]
+
+class MenuImportService:
+    """Bulk-load menu items: streamed parsing, batched validation, set-based writes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.audit_service = AuditService(db)
+
+    def import_menu(self, restaurant_id: int, stream: BinaryIO, fmt: str, mode: str = "insert") -> Dict[str, Any]:
+        """Import an upload in one transaction; invalid rows are reported, not written
+
+        In upsert mode, rows update the restaurant's existing items with the
+        same name and insert the rest.
+        """
+        if fmt not in ROW_READERS:
+            raise MenuImportError(f"Unsupported format '{fmt}'")
+        if mode not in IMPORT_MODES:
+            raise MenuImportError(f"Unsupported mode '{mode}'")
+        if self.db.get(Restaurant, restaurant_id) is None:
+            raise LookupError(f"Restaurant {restaurant_id} not found")
+
+        start = time.monotonic()
+        result = {"received": 0, "inserted": 0, "updated": 0, "failed": 0, "errors": []}
+        batch: List[Tuple[int, Any]] = []
+
+        try:
+            for row_number, raw in ROW_READERS[fmt](stream):
+                batch.append((row_number, raw))
+                if len(batch) >= BATCH_SIZE:
+                    self._import_batch(restaurant_id, batch, mode, result)
+                    batch = []
+            if batch:
+                self._import_batch(restaurant_id, batch, mode, result)
+            self.db.commit()
+        except UnicodeDecodeError as e:
+            self.db.rollback()
+            raise MenuImportError(f"Upload is not valid UTF-8: {e}")
+        except Exception:
+            self.db.rollback()
+            raise
+
+        result["duration_ms"] = round((time.monotonic() - start) * 1000, 1)
+        logger.info(
+            "Imported menu for restaurant %s (%s, %s): %s inserted, %s updated, %s failed in %sms",
+            restaurant_id, fmt, mode, result["inserted"], result["updated"], result["failed"], result["duration_ms"]
+        )
+        self.audit_service.log_menu_action("bulk_import", restaurant_id, {
+            "format": fmt, "mode": mode,
+            **{key: result[key] for key in ("received", "inserted", "updated", "failed")}
+        })
+        return {"restaurant_id": restaurant_id, "format": fmt, "mode": mode, **result}
+
+    def _import_batch(self, restaurant_id: int, batch: List[Tuple[int, Any]], mode: str, result: Dict[str, Any]):
+        rows = []
+        for row_number, raw in batch:
+            try:
+                if isinstance(raw, Exception):
+                    raise raw
+                if not isinstance(raw, dict):
+                    raise ValueError("row must be an object")
+                rows.append(MenuImportRow.model_validate(raw))
+            except (ValidationError, ValueError) as e:
+                result["failed"] += 1
+                if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                    result["errors"].append({"row": row_number, "errors": _format_errors(e)})
+
+        result["received"] += len(batch)
+        inserted, updated = self.write_rows(restaurant_id, rows, mode)
+        result["inserted"] += inserted
+        result["updated"] += updated
+
+    def write_rows(self, restaurant_id: int, items: List[MenuImportRow], mode: str = "insert") -> Tuple[int, int]:
+        """Write validated rows with set-based statements; returns (inserted, updated)
+
+        Upserts only overwrite the fields each row actually sets. The caller commits.
+        """
+        if not items:
+            return 0, 0
+
+        updates: Dict[frozenset, List[Dict[str, Any]]] = {}
+        if mode == "upsert":
+            existing: Dict[str, List[int]] = {}
+            for item_id, name in self.db.execute(
+                select(MenuItem.id, MenuItem.name).where(
+                    MenuItem.restaurant_id == restaurant_id,
+                    MenuItem.name.in_({item.name for item in items})
+                )
+            ):
+                existing.setdefault(name, []).append(item_id)
+
+            for item in items:
+                fields = frozenset(item.model_fields_set)
+                for item_id in existing.get(item.name, []):
+                    updates.setdefault(fields, []).append({**item.model_dump(include=fields), "id": item_id})
+            items = [item for item in items if item.name not in existing]
+
+        # ORM bulk UPDATE by primary key: one executemany per set of updated fields
+        for params in updates.values():
+            self.db.execute(update(MenuItem), params)
+
+        rows = [{**item.model_dump(), "restaurant_id": restaurant_id} for item in items]
+        if rows and not self._copy_rows(rows):
+            self.db.execute(insert(MenuItem), rows)
+        bump_menu_version(self.db, restaurant_id)
+        return len(rows), sum(len(params) for params in updates.values())
+
+    def _copy_rows(self, rows: List[Dict[str, Any]]) -> bool:
+        """COPY rows into menu_items on PostgreSQL (psycopg2); False when unavailable"""
+        connection = self.db.connection()
+        if connection.dialect.name != "postgresql" or connection.dialect.driver != "psycopg2":
+            return False
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row.get(column)) for column in COPY_COLUMNS])
+        buffer.seek(0)
+
+        # Same DBAPI connection, so the COPY is part of the session's transaction
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY menu_items ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+        finally:
+            cursor.close()
+        return True
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
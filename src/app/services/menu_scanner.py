@@ -1,15 +1,28 @@
-import cv2
-import pytesseract
-from PIL import Image
 import re
-from typing import List, Dict, Any
-import openai
+from typing import List, Dict, Any, Optional
 import os
 import json
+import logging
+from app.services.llm_cache import LLMResponseCache
+from app.services.model_router import model_router
+from app.core.metrics import LLM_CACHE_REQUESTS
+from app.core.lazy import lazy_import
+
+logger = logging.getLogger(__name__)
+
+# OCR and the OpenAI SDK load on first scan rather than at import
+cv2 = lazy_import("cv2")
+pytesseract = lazy_import("pytesseract")
+openai = lazy_import("openai")
+
+# Bump whenever the parsing prompt changes so stale cache entries are ignored
+PARSE_PROMPT_VERSION = "v1"
 
 class MenuScanner:
     def __init__(self):
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Retries are handled (and counted) by the LLM gateway
+        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        self.parse_cache = LLMResponseCache("menu_parse")
     
     def scan_menu_image(self, image_path: str) -> Dict[str, Any]:
         """Extract text from menu image using OCR"""
@@ -27,8 +40,14 @@ class MenuScanner:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
-    def parse_menu_with_ai(self, menu_text: str) -> List[Dict[str, Any]]:
+    def parse_menu_with_ai(self, menu_text: str, restaurant_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Parse menu text into structured data using OpenAI"""
+        # Keyed on the route's configured model, so failovers still share cache entries
+        cache_key = self.parse_cache.make_key(menu_text, PARSE_PROMPT_VERSION, model_router.primary_model("menu_parse"))
+        cached_items = self.parse_cache.get(cache_key)
+        if cached_items is not None:
+            return cached_items
+        
         prompt = f"""
         Parse this menu text into JSON format with the following structure:
         [
@@ -48,18 +67,58 @@ class MenuScanner:
         """
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
+            routing = model_router.route("menu_parse", len(menu_text))
+            response = model_router.complete(
+                self.openai_client,
+                routing,
+                operation="menu_parse",
+                priority="bulk",
+                restaurant_id=restaurant_id,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1
             )
-            
-            menu_items = json.loads(response.choices[0].message.content)
-            return menu_items
         except Exception as e:
+            logger.error("Menu parsing request failed: %s", e)
+            return []
+        
+        menu_items = self._validate_menu_items(response.choices[0].message.content)
+        if menu_items is None:
+            LLM_CACHE_REQUESTS.labels("menu_parse", "invalid").inc()
             return []
+        
+        self.parse_cache.set(cache_key, menu_items)
+        return menu_items
+    
+    @staticmethod
+    def _validate_menu_items(content: str):
+        """Parse the model output once; return the item list, or None if it is not a valid menu"""
+        content = (content or "").strip()
+        # Models sometimes wrap JSON in a markdown code fence
+        if content.startswith("```"):
+            content = content.strip("`")
+            if content.lower().startswith("json"):
+                content = content[4:]
+        
+        try:
+            items = json.loads(content)
+        except ValueError:
+            return None
+        
+        if not isinstance(items, list):
+            return None
+        
+        valid_items = []
+        for item in items:
+            if not isinstance(item, dict) or not item.get("name"):
+                return None
+            try:
+                item["price"] = float(item.get("price") or 0)
+            except (TypeError, ValueError):
+                return None
+            valid_items.append(item)
+        return valid_items
     
-    def scan_and_parse_menu(self, image_path: str) -> Dict[str, Any]:
+    def scan_and_parse_menu(self, image_path: str, restaurant_id: Optional[int] = None) -> Dict[str, Any]:
         """Complete menu scanning and parsing pipeline"""
         # Extract text from image
         ocr_result = self.scan_menu_image(image_path)
@@ -67,7 +126,7 @@ class MenuScanner:
             return ocr_result
         
         # Parse with AI
-        menu_items = self.parse_menu_with_ai(ocr_result["text"])
+        menu_items = self.parse_menu_with_ai(ocr_result["text"], restaurant_id)
         
         return {
             "success": True,
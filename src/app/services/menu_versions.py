@@ -0,0 +1,64 @@
+from typing import Optional
+from sqlalchemy import event, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.restaurant import Restaurant
+from app.services.menu_cache import menu_cache
+
+# Version bumps run inside the write's own transaction, so a reader never sees
+# new rows under an old version. They leave updated_at alone: that tracks edits
+# to the restaurant itself.
+
+# Session.info key for the restaurants whose menus this transaction changed
+CHANGED_MENUS = "changed_menus"
+
+def menu_version_bump(*restaurant_ids: int):
+    """UPDATE statement that bumps the menu version of the given restaurants"""
+    return (
+        update(Restaurant)
+        .where(Restaurant.id.in_(restaurant_ids))
+        .values(menu_version=Restaurant.menu_version + 1, updated_at=Restaurant.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+def sync_version_bump(*restaurant_ids: int):
+    """UPDATE statement that bumps the sync status version of the given restaurants"""
+    return (
+        update(Restaurant)
+        .where(Restaurant.id.in_(restaurant_ids))
+        .values(sync_version=Restaurant.sync_version + 1, updated_at=Restaurant.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+def versions_query(restaurant_id: int):
+    """SELECT for a restaurant's versions; reads one narrow row, no menu or sync rows"""
+    return select(
+        Restaurant.menu_version, Restaurant.sync_version, Restaurant.updated_at
+    ).where(Restaurant.id == restaurant_id)
+
+def bump_menu_version(db: Session, *restaurant_ids: int):
+    """Mark the restaurants' menus as changed; the caller commits
+
+    Their cached menus are invalidated once the transaction commits. With an
+    AsyncSession, call it through run_sync.
+    """
+    db.execute(menu_version_bump(*restaurant_ids))
+    db.info.setdefault(CHANGED_MENUS, set()).update(restaurant_ids)
+
+def bump_sync_version(db: Session, *restaurant_ids: int):
+    """Mark the restaurants' sync status as changed; the caller commits"""
+    db.execute(sync_version_bump(*restaurant_ids))
+
+def get_versions(db: Session, restaurant_id: int) -> Optional[Row]:
+    """(menu_version, sync_version, updated_at) for a restaurant, or None if it doesn't exist"""
+    return db.execute(versions_query(restaurant_id)).first()
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_menus(session: Session):
+    restaurant_ids = session.info.pop(CHANGED_MENUS, None)
+    if restaurant_ids:
+        menu_cache.invalidate(*restaurant_ids)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_menus(session: Session):
+    session.info.pop(CHANGED_MENUS, None)
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.metrics import LLM_ROUTE_DECISIONS, LLM_FAILOVERS, LLM_HEDGES
+from app.services.llm_gateway import llm_gateway, DEFAULT_TIMEOUTS, LLMQueueFullError, LLMDeadlineExceeded
+from app.services.llm_usage import usage_tracker
+
+logger = logging.getLogger(__name__)
+
+# Per task: candidate models in preference order, models for large inputs,
+# the latency budget (seconds) and whether a slow primary may be hedged
+DEFAULT_ROUTES = {
+    "chat": {
+        "models": ["gpt-3.5-turbo", "gpt-4o-mini"],
+        "large_input_models": ["gpt-4o-mini"],
+        "large_input_chars": 12000,
+        "latency_budget": 8.0,
+        "hedge": True
+    },
+    "image_analysis": {
+        "models": ["gpt-4-vision-preview", "gpt-4o-mini"],
+        "latency_budget": 25.0,
+        "hedge": False  # image requests are large; hedging would double their cost
+    },
+    "menu_parse": {
+        "models": ["gpt-3.5-turbo", "gpt-4o-mini"],
+        "large_input_models": ["gpt-4o-mini"],
+        "large_input_chars": 12000,
+        "latency_budget": 30.0,
+        "hedge": False
+    }
+}
+
+def _load_routes() -> Dict[str, Dict[str, Any]]:
+    """Default routes, with per-task overrides from the LLM_MODEL_ROUTES JSON env var"""
+    routes = {task: dict(config) for task, config in DEFAULT_ROUTES.items()}
+    overrides = os.getenv("LLM_MODEL_ROUTES")
+    if overrides:
+        try:
+            for task, config in json.loads(overrides).items():
+                routes.setdefault(task, {}).update(config)
+        except (ValueError, AttributeError) as e:
+            logger.error("Ignoring invalid LLM_MODEL_ROUTES: %s", e)
+    return routes
+
+class ModelRouter:
+    """Pick a model per task and input size, steering away from slow or failing models
+
+    Model health (rolling p95 latency and error rate) comes from the usage
+    tracker. Calls fail over to the next candidate on error; async calls can
+    also hedge, starting the next candidate when the primary exceeds its
+    latency budget and keeping whichever answers first.
+    """
+
+    def __init__(self, routes: Dict[str, Dict[str, Any]] = None):
+        self.routes = routes or _load_routes()
+        self.max_error_rate = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.25"))
+        self.min_samples = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "5"))
+        self.hedging_enabled = os.getenv("LLM_HEDGING_ENABLED", "true").lower() == "true"
+
+    def primary_model(self, task: str) -> str:
+        return self.routes[task]["models"][0]
+
+    def _health_issue(self, model: str, budget: float) -> Optional[str]:
+        health = usage_tracker.get_model_health(model)
+        if health["samples"] < self.min_samples:
+            return None
+        if health["error_rate"] > self.max_error_rate:
+            return "failing"
+        if health["p95_latency"] > budget:
+            return "slow"
+        return None
+
+    def route(self, task: str, input_chars: int = 0) -> Dict[str, Any]:
+        """Return the routing decision for a task: model, ordered fallbacks and reason"""
+        config = self.routes[task]
+        budget = config["latency_budget"]
+        candidates = list(config["models"])
+        reason = "primary"
+
+        large_models = config.get("large_input_models")
+        if large_models and input_chars > config.get("large_input_chars", float("inf")):
+            candidates = large_models + [m for m in candidates if m not in large_models]
+            reason = "large_input"
+
+        healthy, unhealthy = [], []
+        for model in candidates:
+            issue = self._health_issue(model, budget)
+            if issue:
+                unhealthy.append(model)
+                if model == candidates[0]:
+                    reason = f"primary_{issue}"
+            else:
+                healthy.append(model)
+
+        # Unhealthy models stay at the end as a last resort
+        ordered = healthy + unhealthy
+        decision = {
+            "task": task,
+            "model": ordered[0],
+            "fallbacks": ordered[1:],
+            "reason": reason,
+            "latency_budget": budget,
+            "hedge": bool(config.get("hedge") and self.hedging_enabled and len(ordered) > 1)
+        }
+        LLM_ROUTE_DECISIONS.labels(task, decision["model"], reason).inc()
+        return decision
+
+    @staticmethod
+    def _can_fail_over(error: Exception, deadline: float) -> bool:
+        # Local admission failures would hit the next model just the same
+        if isinstance(error, (LLMQueueFullError, LLMDeadlineExceeded)):
+            return False
+        return deadline - time.monotonic() > 1.0
+
+    def _served(self, decision: Dict[str, Any], model: str):
+        decision["served_by"] = model
+        if model != decision["model"]:
+            LLM_FAILOVERS.labels(decision["task"], decision["model"], model).inc()
+
+    def complete(self, client, decision: Dict[str, Any], *, priority: str = "bulk",
+                 timeout: Optional[float] = None, **request) -> Any:
+        """Sync completion with failover down the decision's candidate list"""
+        deadline = time.monotonic() + (timeout if timeout is not None else DEFAULT_TIMEOUTS[priority])
+        models = [decision["model"], *decision["fallbacks"]]
+        for index, model in enumerate(models):
+            try:
+                response = llm_gateway.complete(
+                    client, model=model, priority=priority,
+                    timeout=deadline - time.monotonic(), **request
+                )
+                self._served(decision, model)
+                return response
+            except Exception as e:
+                if index == len(models) - 1 or not self._can_fail_over(e, deadline):
+                    raise
+                logger.warning("Model %s failed for %s, failing over to %s: %s", model, decision['task'], models[index + 1], e)
+
+    async def acomplete(self, client, decision: Dict[str, Any], *, priority: str = "interactive",
+                        timeout: Optional[float] = None, **request) -> Any:
+        """Async completion with hedging (when enabled for the task) and failover"""
+        deadline = time.monotonic() + (timeout if timeout is not None else DEFAULT_TIMEOUTS[priority])
+        models = [decision["model"], *decision["fallbacks"]]
+
+        def start(model: str) -> asyncio.Task:
+            return asyncio.create_task(llm_gateway.acomplete(
+                client, model=model, priority=priority,
+                timeout=deadline - time.monotonic(), **request
+            ))
+
+        index = 0
+        while True:
+            model = models[index]
+            if decision["hedge"] and index + 1 < len(models):
+                try:
+                    response, model = await self._hedged(start, model, models[index + 1], decision, deadline)
+                    self._served(decision, model)
+                    return response
+                except Exception as e:
+                    # Both the primary and its hedge failed
+                    index += 2
+                    if index >= len(models) or not self._can_fail_over(e, deadline):
+                        raise
+                    continue
+
+            try:
+                response = await start(model)
+                self._served(decision, model)
+                return response
+            except Exception as e:
+                index += 1
+                if index >= len(models) or not self._can_fail_over(e, deadline):
+                    raise
+                logger.warning("Model %s failed for %s, failing over to %s: %s", model, decision['task'], models[index], e)
+
+    async def _hedged(self, start, primary: str, backup: str, decision: Dict[str, Any],
+                      deadline: float) -> Tuple[Any, str]:
+        """Run the primary; if it exceeds the latency budget, race it against the backup"""
+        tasks = {start(primary): primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=decision["latency_budget"])
+            if not done:
+                logger.info("Hedging %s: %s over %ss budget, starting %s", decision['task'], primary, decision['latency_budget'], backup)
+                LLM_HEDGES.labels(decision["task"], "launched").inc()
+                decision["hedged"] = True
+                tasks[start(backup)] = backup
+            elif next(iter(done)).exception() is not None:
+                error = next(iter(done)).exception()
+                # Primary failed fast: fail over to the backup without waiting,
+                # unless it was a local admission rejection
+                if not self._can_fail_over(error, deadline):
+                    raise error
+                logger.warning("Model %s failed for %s, failing over to %s: %s", primary, decision['task'], backup, error)
+                tasks[start(backup)] = backup
+
+            pending = set(tasks)
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if decision.get("hedged"):
+                            LLM_HEDGES.labels(decision["task"], "primary_won" if tasks[task] == primary else "hedge_won").inc()
+                        return task.result(), tasks[task]
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_status(self) -> Dict[str, Any]:
+        models = sorted({model for config in self.routes.values()
+                         for model in config["models"] + config.get("large_input_models", [])})
+        return {
+            "routes": self.routes,
+            "hedging_enabled": self.hedging_enabled,
+            "max_error_rate": self.max_error_rate,
+            "models": [usage_tracker.get_model_health(model) for model in models]
+        }
+
+# Global model router instance
+model_router = ModelRouter()
@@ -4,6 +4,19 @@ import requests
 import json
 from app.models.restaurant import MenuItem
 
+def response_result(response: requests.Response, **extra) -> Dict[str, Any]:
+    """Adapter result for a platform response, with the status and latency the sync audit keeps"""
+    return {
+        "success": response.status_code == 200,
+        "response": response.json(),
+        "status_code": response.status_code,
+        "latency_ms": round(response.elapsed.total_seconds() * 1000, 1),
+        **extra
+    }
+
+def error_result(error: Exception) -> Dict[str, Any]:
+    return {"success": False, "error": str(error), "error_code": type(error).__name__}
+
 class PlatformAdapter(ABC):
     @abstractmethod
     def authenticate(self) -> bool:
@@ -45,7 +58,7 @@ class UberEatsAdapter(PlatformAdapter):
     
     def sync_menu_items(self, items: List[MenuItem]) -> Dict[str, Any]:
         if not self.access_token:
-            return {"success": False, "error": "Not authenticated"}
+            return {"success": False, "error": "Not authenticated", "error_code": "not_authenticated"}
         
         headers = {"Authorization": f"Bearer {self.access_token}"}
         menu_data = {
@@ -61,9 +74,9 @@ class UberEatsAdapter(PlatformAdapter):
                 headers=headers,
                 json=menu_data
             )
-            return {"success": response.status_code == 200, "response": response.json()}
+            return response_result(response, items_sent=len(items))
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return error_result(e)
     
     def _format_menu_items(self, items: List[MenuItem]) -> List[Dict]:
         categories = {}
@@ -84,7 +97,7 @@ class UberEatsAdapter(PlatformAdapter):
     
     def update_restaurant_info(self, restaurant_data: Dict) -> Dict[str, Any]:
         if not self.access_token:
-            return {"success": False, "error": "Not authenticated"}
+            return {"success": False, "error": "Not authenticated", "error_code": "not_authenticated"}
         
         headers = {"Authorization": f"Bearer {self.access_token}"}
         try:
@@ -93,9 +106,9 @@ class UberEatsAdapter(PlatformAdapter):
                 headers=headers,
                 json=restaurant_data
             )
-            return {"success": response.status_code == 200, "response": response.json()}
+            return response_result(response)
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return error_result(e)
 
 class DeliverooAdapter(PlatformAdapter):
     def __init__(self, api_key: str, restaurant_id: str):
@@ -116,9 +129,9 @@ class DeliverooAdapter(PlatformAdapter):
                 headers=headers,
                 json=menu_data
             )
-            return {"success": response.status_code == 200, "response": response.json()}
+            return response_result(response, items_sent=len(items))
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return error_result(e)
     
     def _format_menu_items(self, items: List[MenuItem]) -> Dict:
         categories = {}
@@ -145,9 +158,9 @@ class DeliverooAdapter(PlatformAdapter):
                 headers=headers,
                 json=restaurant_data
             )
-            return {"success": response.status_code == 200, "response": response.json()}
+            return response_result(response)
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return error_result(e)
 
 class JustEatAdapter(PlatformAdapter):
     def __init__(self, api_key: str, tenant_id: str):
@@ -168,9 +181,9 @@ class JustEatAdapter(PlatformAdapter):
                 headers=headers,
                 json=menu_data
             )
-            return {"success": response.status_code == 200, "response": response.json()}
+            return response_result(response, items_sent=len(items))
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return error_result(e)
     
     def _format_menu_items(self, items: List[MenuItem]) -> Dict:
         categories = {}
@@ -197,6 +210,6 @@ class JustEatAdapter(PlatformAdapter):
                 headers=headers,
                 json=restaurant_data
             )
-            return {"success": response.status_code == 200, "response": response.json()}
+            return response_result(response)
         except Exception as e:
-            return {"success": False, "error": str(e)}
\ No newline at end of file
+            return error_result(e)
\ No newline at end of file
@@ -4,6 +4,8 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.services.sync_service import SyncService
+from app.services.audit_archive import AuditArchiveService
+from app.services.sync_payloads import sync_payload_store
 from app.models.restaurant import Restaurant
 import logging
 from app.core.logging_config import setup_logging
@@ -29,6 +31,9 @@ class SyncScheduler:
         # Hourly availability check
         schedule.every().hour.do(self.availability_sync)
         
+        # Daily audit maintenance: upcoming partitions and archival of expired months
+        schedule.every().day.at("03:00").do(self.audit_maintenance)
+        
         logger.info("Sync schedules configured")
     
     def daily_sync(self):
@@ -40,7 +45,7 @@ class SyncScheduler:
             restaurants = db.query(Restaurant).all()
             
             for restaurant in restaurants:
-                logger.info(f"Syncing restaurant: {restaurant.name}")
+                logger.info("Syncing restaurant: %s", restaurant.name)
                 results = sync_service.sync_all_platforms(restaurant.id)
                 
                 for platform, result in results.items():
@@ -52,13 +57,13 @@ class SyncScheduler:
                             del self.failure_counts[sync_key]
                         if sync_key in self.disabled_syncs:
                             self.disabled_syncs.remove(sync_key)
-                            logger.info(f"Re-enabled sync for {restaurant.name} on {platform} after successful daily sync")
-                        logger.info(f"Successfully synced {restaurant.name} to {platform}")
+                            logger.info("Re-enabled sync for %s on %s after successful daily sync", restaurant.name, platform)
+                        logger.info("Successfully synced %s to %s", restaurant.name, platform)
                     else:
-                        logger.error(f"Failed to sync {restaurant.name} to {platform}: {result.get('error')}")
+                        logger.error("Failed to sync %s to %s: %s", restaurant.name, platform, result.get('error'))
         
         except Exception as e:
-            logger.error(f"Daily sync failed: {e}")
+            logger.error("Daily sync failed: %s", e)
         finally:
             db.close()
     
@@ -71,7 +76,7 @@ class SyncScheduler:
             restaurants = db.query(Restaurant).all()
             
             for restaurant in restaurants:
-                logger.info(f"Full sync for restaurant: {restaurant.name}")
+                logger.info("Full sync for restaurant: %s", restaurant.name)
                 
                 # Sync restaurant information
                 info_results = sync_service.update_restaurant_info(restaurant.id)
@@ -87,12 +92,27 @@ class SyncScheduler:
                             del self.failure_counts[sync_key]
                         if sync_key in self.disabled_syncs:
                             self.disabled_syncs.remove(sync_key)
-                            logger.info(f"Re-enabled sync for {restaurant.name} on {platform} after successful weekly sync")
+                            logger.info("Re-enabled sync for %s on %s after successful weekly sync", restaurant.name, platform)
                 
-                logger.info(f"Full sync completed for {restaurant.name}")
+                logger.info("Full sync completed for %s", restaurant.name)
         
         except Exception as e:
-            logger.error(f"Weekly full sync failed: {e}")
+            logger.error("Weekly full sync failed: %s", e)
+        finally:
+            db.close()
+    
+    def audit_maintenance(self):
+        """Create upcoming action_history partitions, archive months past retention and prune sync payloads"""
+        logger.info("Starting audit maintenance")
+        db = SessionLocal()
+        try:
+            result = AuditArchiveService(db).run_maintenance()
+            pruned = sync_payload_store.prune()
+            logger.info("Audit maintenance completed: %s partitions created, %s months archived, %s sync payloads pruned",
+                        len(result['created_partitions']), len(result['archived']), pruned)
+        except Exception as e:
+            db.rollback()
+            logger.error("Audit maintenance failed: %s", e)
         finally:
             db.close()
     
@@ -110,7 +130,7 @@ class SyncScheduler:
                                     if f"{restaurant.id}_{platform}" in self.disabled_syncs]
                 
                 if disabled_platforms:
-                    logger.warning(f"Skipping disabled platforms for {restaurant.name}: {disabled_platforms}")
+                    logger.warning("Skipping disabled platforms for %s: %s", restaurant.name, disabled_platforms)
                 
                 # Only sync menu items (includes availability)
                 results = sync_service.sync_all_platforms(restaurant.id)
@@ -125,21 +145,21 @@ class SyncScheduler:
                         # Reset failure count on success
                         if sync_key in self.failure_counts:
                             del self.failure_counts[sync_key]
-                            logger.info(f"Availability sync recovered for {restaurant.name} on {platform}")
+                            logger.info("Availability sync recovered for %s on %s", restaurant.name, platform)
                     else:
                         # Track failure
                         self.failure_counts[sync_key] = self.failure_counts.get(sync_key, 0) + 1
                         failure_count = self.failure_counts[sync_key]
                         
-                        logger.warning(f"Availability sync failed for {restaurant.name} on {platform} (attempt {failure_count}/{self.max_retries}): {result.get('error')}")
+                        logger.warning("Availability sync failed for %s on %s (attempt %s/%s): %s", restaurant.name, platform, failure_count, self.max_retries, result.get('error'))
                         
                         # Disable sync if max retries exceeded
                         if failure_count >= self.max_retries:
                             self.disabled_syncs.add(sync_key)
-                            logger.error(f"Disabling automatic sync for {restaurant.name} on {platform} after {self.max_retries} failures. Manual intervention required.")
+                            logger.error("Disabling automatic sync for %s on %s after %s failures. Manual intervention required.", restaurant.name, platform, self.max_retries)
         
         except Exception as e:
-            logger.error(f"Availability sync failed: {e}")
+            logger.error("Availability sync failed: %s", e)
         finally:
             db.close()
     
@@ -171,10 +191,10 @@ class SyncScheduler:
                 if sync_key in self.disabled_syncs:
                     self.disabled_syncs.remove(sync_key)
                     self.failure_counts.pop(sync_key, None)
-                    logger.info(f"Re-enabled automatic sync for restaurant {restaurant_id} on {platform}")
+                    logger.info("Re-enabled automatic sync for restaurant %s on %s", restaurant_id, platform)
                 
                 result = sync_service.sync_single_platform(restaurant_id, platform)
-                logger.info(f"Manual sync result: {result}")
+                logger.info("Manual sync result: %s", result)
                 return result
             elif restaurant_id:
                 # Re-enable all platforms for this restaurant
@@ -184,10 +204,10 @@ class SyncScheduler:
                     if sync_key in self.disabled_syncs:
                         self.disabled_syncs.remove(sync_key)
                         self.failure_counts.pop(sync_key, None)
-                        logger.info(f"Re-enabled automatic sync for restaurant {restaurant_id} on {platform}")
+                        logger.info("Re-enabled automatic sync for restaurant %s on %s", restaurant_id, platform)
                 
                 result = sync_service.sync_all_platforms(restaurant_id)
-                logger.info(f"Manual sync result: {result}")
+                logger.info("Manual sync result: %s", result)
                 return result
             else:
                 # Sync all restaurants
@@ -198,7 +218,7 @@ class SyncScheduler:
                 return results
         
         except Exception as e:
-            logger.error(f"Manual sync failed: {e}")
+            logger.error("Manual sync failed: %s", e)
             return {"success": False, "error": str(e)}
         finally:
             db.close()
@@ -221,7 +241,7 @@ class SyncScheduler:
             sync_key = f"{restaurant_id}_{platform}"
             self.disabled_syncs.discard(sync_key)
             self.failure_counts.pop(sync_key, None)
-            logger.info(f"Reset sync failures for restaurant {restaurant_id} on {platform}")
+            logger.info("Reset sync failures for restaurant %s on %s", restaurant_id, platform)
         elif restaurant_id:
             # Reset all platforms for restaurant
             platforms = ['uber_eats', 'deliveroo', 'just_eat']
@@ -229,7 +249,7 @@ class SyncScheduler:
                 sync_key = f"{restaurant_id}_{platform}"
                 self.disabled_syncs.discard(sync_key)
                 self.failure_counts.pop(sync_key, None)
-            logger.info(f"Reset all sync failures for restaurant {restaurant_id}")
+            logger.info("Reset all sync failures for restaurant %s", restaurant_id)
         else:
             # Reset all failures
             self.disabled_syncs.clear()
@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+def payload_bytes(payload: Any) -> bytes:
+    """Canonical JSON, so identical responses hash the same whatever their key order"""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+
+def _item_count(payload: Any) -> Optional[int]:
+    """Item count reported in a platform response, when it has an obvious one"""
+    if isinstance(payload, list):
+        return len(payload)
+    if isinstance(payload, dict):
+        for key in ("items", "products", "updated", "results"):
+            value = payload.get(key)
+            if isinstance(value, list):
+                return len(value)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+def _error_code(result: Dict[str, Any]) -> Optional[str]:
+    if result.get("success"):
+        return None
+    if result.get("error_code"):
+        return str(result["error_code"])
+    response = result.get("response")
+    if isinstance(response, dict):
+        for key in ("error_code", "code", "error"):
+            value = response.get(key)
+            if isinstance(value, (str, int)) and not isinstance(value, bool) and len(str(value)) <= 64:
+                return str(value)
+    if result.get("status_code"):
+        return f"http_{result['status_code']}"
+    return "error"
+
+def summarize_sync_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The compact record a sync audit row keeps instead of the platform's full response"""
+    summary = {
+        "success": bool(result.get("success")),
+        "status_code": result.get("status_code"),
+        "latency_ms": result.get("latency_ms"),
+        "items_sent": result.get("items_sent"),
+        "error_code": _error_code(result),
+    }
+    if "response" in result:
+        body = payload_bytes(result["response"])
+        summary.update({
+            "items_returned": _item_count(result["response"]),
+            "payload_hash": hashlib.sha256(body).hexdigest(),
+            "payload_bytes": len(body),
+        })
+    return {key: value for key, value in summary.items() if value is not None}
+
+class SyncPayloadStore:
+    """Full platform responses on disk, gzipped and deduplicated by content hash
+
+    Disabled by default (SYNC_PAYLOAD_STORE_ENABLED). Each distinct response
+    is stored once under SYNC_PAYLOAD_DIR as <hash[:2]>/<hash>.json.gz; storing
+    it again only refreshes the file's mtime, and prune removes payloads not
+    seen for SYNC_PAYLOAD_RETENTION_DAYS. Audit rows refer to payloads by the
+    payload_hash in their summary.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("SYNC_PAYLOAD_STORE_ENABLED", "false").lower() == "true"
+        self.directory = os.getenv("SYNC_PAYLOAD_DIR", "archive/sync_payloads")
+        self.retention_days = int(os.getenv("SYNC_PAYLOAD_RETENTION_DAYS", "30"))
+
+    def _path(self, payload_hash: str) -> str:
+        return os.path.join(self.directory, payload_hash[:2], f"{payload_hash}.json.gz")
+
+    def put(self, payload_hash: str, payload: Any) -> bool:
+        """Store a response under its hash; True when it is (already) stored"""
+        if not self.enabled:
+            return False
+        path = self._path(payload_hash)
+        try:
+            if os.path.exists(path):
+                os.utime(path)
+                return True
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handle, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".partial")
+            try:
+                with os.fdopen(handle, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as archive:
+                    archive.write(payload_bytes(payload))
+                os.replace(partial, path)
+            except Exception:
+                os.remove(partial)
+                raise
+            return True
+        except OSError as e:
+            # The summary is still logged; losing the full payload must not fail the sync
+            logger.warning("Could not store sync payload %s: %s", payload_hash, e)
+            return False
+
+    def get(self, payload_hash: str) -> Optional[Any]:
+        if len(payload_hash) != 64 or not all(c in "0123456789abcdef" for c in payload_hash):
+            return None
+        try:
+            with gzip.open(self._path(payload_hash), "rb") as archive:
+                return json.loads(archive.read())
+        except FileNotFoundError:
+            return None
+
+    def prune(self, retention_days: Optional[int] = None) -> int:
+        """Remove payloads last stored more than retention_days ago; returns how many"""
+        retention_days = self.retention_days if retention_days is None else retention_days
+        if retention_days <= 0 or not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - retention_days * 86400
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        if removed:
+            logger.info("Pruned %s sync payloads older than %s days", removed, retention_days)
+        return removed
+
+sync_payload_store = SyncPayloadStore()
@@ -1,13 +1,15 @@
 from typing import List, Dict, Any
 from sqlalchemy.orm import Session
-from app.models.restaurant import Restaurant, MenuItem, PlatformSync
+from app.models.restaurant import Restaurant, PlatformSync
 from app.services.platform_adapters import UberEatsAdapter, DeliverooAdapter, JustEatAdapter
 from app.services.config_service import ConfigService
 from app.services.audit_service import AuditService
+from app.services.menu_cache import menu_cache
+from app.services.menu_versions import bump_sync_version
 from datetime import datetime
 import os
 import logging
-from app.core.logging_config import setup_logging
+from app.core.logging_config import setup_logging, log_context
 
 # Ensure logging is configured
 setup_logging()
@@ -37,20 +39,21 @@ class SyncService:
     
     def sync_all_platforms(self, restaurant_id: int) -> Dict[str, Any]:
         results = {}
-        menu_items = self.db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
+        menu_items = menu_cache.get_menu(self.db, restaurant_id).items
         
         for platform_name, adapter in self.platforms.items():
-            try:
-                if adapter.authenticate():
-                    result = adapter.sync_menu_items(menu_items)
-                    self._update_sync_status(restaurant_id, platform_name, result)
-                    self.audit_service.log_sync_action(restaurant_id, platform_name, result)
-                    results[platform_name] = result
-                else:
-                    results[platform_name] = {"success": False, "error": "Authentication failed"}
-            except Exception as e:
-                logger.error(f"Sync failed for {platform_name}: {e}")
-                results[platform_name] = {"success": False, "error": str(e)}
+            with log_context(restaurant_id=restaurant_id, platform=platform_name):
+                try:
+                    if adapter.authenticate():
+                        result = adapter.sync_menu_items(menu_items)
+                        self._update_sync_status(restaurant_id, platform_name, result)
+                        self.audit_service.log_sync_action(restaurant_id, platform_name, result)
+                        results[platform_name] = result
+                    else:
+                        results[platform_name] = {"success": False, "error": "Authentication failed"}
+                except Exception as e:
+                    logger.error("Sync failed for %s: %s", platform_name, e)
+                    results[platform_name] = {"success": False, "error": str(e)}
         
         return results
     
@@ -58,9 +61,13 @@ class SyncService:
         if platform not in self.platforms:
             return {"success": False, "error": "Platform not supported"}
         
-        menu_items = self.db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
+        menu_items = menu_cache.get_menu(self.db, restaurant_id).items
         adapter = self.platforms[platform]
         
+        with log_context(restaurant_id=restaurant_id, platform=platform):
+            return self._sync_platform(restaurant_id, platform, adapter, menu_items)
+    
+    def _sync_platform(self, restaurant_id: int, platform: str, adapter, menu_items) -> Dict[str, Any]:
         try:
             if adapter.authenticate():
                 result = adapter.sync_menu_items(menu_items)
@@ -70,7 +77,7 @@ class SyncService:
             else:
                 return {"success": False, "error": "Authentication failed"}
         except Exception as e:
-            logger.error(f"Sync failed for {platform}: {e}")
+            logger.error("Sync failed for %s: %s", platform, e)
             return {"success": False, "error": str(e)}
     
     def update_restaurant_info(self, restaurant_id: int, platforms: List[str] = None) -> Dict[str, Any]:
@@ -121,6 +128,7 @@ class SyncService:
         sync_record.last_sync = datetime.utcnow()
         sync_record.sync_status = "success" if result.get("success") else "failed"
         sync_record.error_message = result.get("error")
+        bump_sync_version(self.db, restaurant_id)
         
         self.db.commit()
     
@@ -1,8 +1,14 @@
-from PIL import Image
 import requests
 from io import BytesIO
+import base64
 import os
 from typing import Dict, Tuple
+from app.core.lazy import lazy_import
+
+# Pillow is only loaded once an image is actually processed
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
+ExifTags = lazy_import("PIL.ExifTags")
 
 class ImageProcessor:
     """Handle image processing for different platform requirements"""
@@ -28,6 +34,64 @@ class ImageProcessor:
         }
     }
     
+    # Vision models tile images after fitting them into 2048x2048 and scaling the
+    # short side down to 768px; anything larger is uploaded and billed for nothing
+    VISION_MAX_LONG_SIDE = 2048
+    VISION_MAX_SHORT_SIDE = 768
+    VISION_JPEG_QUALITY = 85
+    VISION_PASSTHROUGH_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+    VISION_PASSTHROUGH_MAX_BYTES = 512 * 1024
+    
+    @staticmethod
+    def prepare_for_vision(image_data: bytes) -> str:
+        """Downscale and re-encode an uploaded image, returning a data URL for the vision model"""
+        image = Image.open(BytesIO(image_data))
+        source_format = image.format
+        
+        scale = ImageProcessor._vision_scale(image.size)
+        
+        # Small, upright images in a format the model accepts are sent untouched; a rotated
+        # photo still needs exif_transpose below or the model sees it sideways
+        upright = image.getexif().get(ExifTags.Base.Orientation, 1) == 1
+        if (scale == 1.0 and upright and source_format in ImageProcessor.VISION_PASSTHROUGH_FORMATS
+                and len(image_data) <= ImageProcessor.VISION_PASSTHROUGH_MAX_BYTES):
+            return ImageProcessor._data_url(ImageProcessor.VISION_PASSTHROUGH_FORMATS[source_format], image_data)
+        
+        # Let the JPEG decoder downscale while decoding instead of materializing full resolution
+        image.draft("RGB", (round(image.width * scale), round(image.height * scale)))
+        image = ImageOps.exif_transpose(image)
+        
+        scale = ImageProcessor._vision_scale(image.size)
+        target_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        
+        if image.size != target_size:
+            image = image.resize(target_size, Image.Resampling.LANCZOS)
+        
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=ImageProcessor.VISION_JPEG_QUALITY, optimize=True)
+        return ImageProcessor._data_url("image/jpeg", buffer.getbuffer())
+    
+    @staticmethod
+    def _vision_scale(size: Tuple[int, int]) -> float:
+        return min(
+            1.0,
+            ImageProcessor.VISION_MAX_LONG_SIDE / max(size),
+            ImageProcessor.VISION_MAX_SHORT_SIDE / min(size)
+        )
+    
+    @staticmethod
+    def _data_url(mime_type: str, data) -> str:
+        """Build a base64 data URL straight from a bytes-like buffer"""
+        return f"data:{mime_type};base64," + base64.b64encode(data).decode("ascii")
+    
     @staticmethod
     def process_image_for_platform(image_url: str, platform: str, output_dir: str) -> str:
         """Process image according to platform specifications"""
@@ -57,7 +121,7 @@ class ImageProcessor:
         return output_path
     
     @staticmethod
-    def _resize_and_crop(image: Image.Image, max_size: Tuple[int, int], aspect_ratio: Tuple[int, int]) -> Image.Image:
+    def _resize_and_crop(image: "Image.Image", max_size: Tuple[int, int], aspect_ratio: Tuple[int, int]) -> "Image.Image":
         """Resize and crop image to specified dimensions and aspect ratio"""
         target_width, target_height = max_size
         target_ratio = aspect_ratio[0] / aspect_ratio[1]
@@ -2,15 +2,20 @@
 """MCP Server for FoodFlow Restaurant Management"""
 
 import asyncio
+import io
 import json
 import logging
 from typing import Any, Dict, List, Optional
 from mcp.server import Server
 from mcp.types import Tool, TextContent, ImageContent
 from sqlalchemy.orm import Session
-from src.app.core.database import SessionLocal, create_tables
+from src.app.core.database import SessionLocal, init_database
 from src.app.services.sync_service import SyncService
 from src.app.services.ai_bot import RestaurantAIBot
+from src.app.services.catalog_service import CatalogService
+from src.app.services.menu_import import MenuImportService, MenuImportError
+from src.app.services.menu_versions import bump_menu_version
+from src.app.core.pagination import InvalidCursorError
 from src.app.models.restaurant import Restaurant, MenuItem
 from src.app.core.logging_config import setup_logging
 import base64
@@ -62,13 +67,37 @@ async def list_tools() -> List[Tool]:
                 "required": ["restaurant_id", "name", "price", "category"]
             }
         ),
+        Tool(
+            name="import_menu",
+            description="Bulk import menu items from CSV, JSON array or NDJSON text",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "restaurant_id": {"type": "integer", "description": "Restaurant ID"},
+                    "data": {"type": "string", "description": "Menu items as CSV (with a header row), a JSON array or NDJSON"},
+                    "format": {"type": "string", "enum": ["csv", "json", "ndjson"], "description": "Format of data"},
+                    "mode": {
+                        "type": "string", "enum": ["insert", "upsert"], "default": "insert",
+                        "description": "upsert updates existing items with the same name"
+                    }
+                },
+                "required": ["restaurant_id", "data", "format"]
+            }
+        ),
         Tool(
             name="get_menu",
-            description="Get current menu for a restaurant",
+            description="Get current menu for a restaurant, one page at a time",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "restaurant_id": {"type": "integer", "description": "Restaurant ID"}
+                    "restaurant_id": {"type": "integer", "description": "Restaurant ID"},
+                    "category": {"type": "string", "description": "Only items in this category"},
+                    "available": {"type": "boolean", "description": "Only available (true) or unavailable (false) items"},
+                    "min_price": {"type": "number", "description": "Minimum price"},
+                    "max_price": {"type": "number", "description": "Maximum price"},
+                    "search": {"type": "string", "description": "Search item names"},
+                    "cursor": {"type": "string", "description": "Cursor from the previous page"},
+                    "limit": {"type": "integer", "description": "Items per page", "default": 100}
                 },
                 "required": ["restaurant_id"]
             }
@@ -89,6 +118,22 @@ async def list_tools() -> List[Tool]:
                 "required": ["item_id"]
             }
         ),
+        Tool(
+            name="bulk_update_menu_items",
+            description="Set availability and/or price for many menu items at once, by id or by filter",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "restaurant_id": {"type": "integer", "description": "Restaurant ID"},
+                    "item_ids": {"type": "array", "items": {"type": "integer"}, "description": "Menu item IDs to update"},
+                    "category": {"type": "string", "description": "Update all items in this category"},
+                    "search": {"type": "string", "description": "Update all items whose name contains this text"},
+                    "is_available": {"type": "boolean", "description": "New availability"},
+                    "price": {"type": "number", "description": "New price"}
+                },
+                "required": ["restaurant_id"]
+            }
+        ),
         Tool(
             name="analyze_menu_image",
             description="Analyze menu image and extract items using AI",
@@ -125,10 +170,14 @@ async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             return await sync_to_platforms(db, arguments)
         elif name == "add_menu_item":
             return await add_menu_item(db, arguments)
+        elif name == "import_menu":
+            return await import_menu(db, arguments)
         elif name == "get_menu":
             return await get_menu(db, arguments)
         elif name == "update_menu_item":
             return await update_menu_item(db, arguments)
+        elif name == "bulk_update_menu_items":
+            return await bulk_update_menu_items(db, arguments)
         elif name == "analyze_menu_image":
             return await analyze_menu_image(db, arguments)
         elif name == "get_sync_status":
@@ -143,7 +192,7 @@ async def sync_to_platforms(db: Session, args: Dict[str, Any]) -> List[TextConte
     restaurant_id = args["restaurant_id"]
     platforms = args.get("platforms")
     
-    logger.info(f"Starting platform sync for restaurant {restaurant_id} to platforms: {platforms or 'all'}")
+    logger.info("Starting platform sync for restaurant %s to platforms: %s", restaurant_id, platforms or 'all')
     
     sync_service = SyncService(db)
     
@@ -157,7 +206,7 @@ async def sync_to_platforms(db: Session, args: Dict[str, Any]) -> List[TextConte
     success_count = sum(1 for r in results.values() if r.get("success"))
     total_count = len(results)
     
-    logger.info(f"Platform sync completed: {success_count}/{total_count} platforms successful")
+    logger.info("Platform sync completed: %s/%s platforms successful", success_count, total_count)
     response = f"Sync completed: {success_count}/{total_count} platforms updated successfully.\n\n"
     
     for platform, result in results.items():
@@ -178,17 +227,52 @@ async def add_menu_item(db: Session, args: Dict[str, Any]) -> List[TextContent]:
     )
     
     db.add(menu_item)
+    bump_menu_version(db, menu_item.restaurant_id)
     db.commit()
     db.refresh(menu_item)
     
     response = f"✅ Menu item '{menu_item.name}' added successfully (ID: {menu_item.id})"
     return [TextContent(type="text", text=response)]
 
+async def import_menu(db: Session, args: Dict[str, Any]) -> List[TextContent]:
+    """Bulk import menu items"""
+    stream = io.BytesIO(args["data"].encode("utf-8"))
+    try:
+        result = await asyncio.to_thread(
+            MenuImportService(db).import_menu,
+            args["restaurant_id"], stream, args["format"], args.get("mode", "insert")
+        )
+    except (MenuImportError, LookupError) as e:
+        return [TextContent(type="text", text=f"❌ Import failed: {e}")]
+    
+    response = (
+        f"✅ Imported menu for restaurant {result['restaurant_id']}: {result['inserted']} added, "
+        f"{result['updated']} updated, {result['failed']} rejected ({result['duration_ms']}ms)\n"
+    )
+    for error in result["errors"]:
+        response += f"  Row {error['row']}: {'; '.join(error['errors'])}\n"
+    
+    return [TextContent(type="text", text=response)]
+
 async def get_menu(db: Session, args: Dict[str, Any]) -> List[TextContent]:
     """Get restaurant menu"""
     restaurant_id = args["restaurant_id"]
     
-    items = db.query(MenuItem).filter(MenuItem.restaurant_id == restaurant_id).all()
+    try:
+        page = await asyncio.to_thread(
+            CatalogService(db).list_menu_items,
+            restaurant_id,
+            category=args.get("category"),
+            available=args.get("available"),
+            min_price=args.get("min_price"),
+            max_price=args.get("max_price"),
+            search=args.get("search"),
+            cursor=args.get("cursor"),
+            limit=args.get("limit", 100)
+        )
+    except InvalidCursorError as e:
+        return [TextContent(type="text", text=f"❌ {e}")]
+    items = page["items"]
     
     if not items:
         return [TextContent(type="text", text="No menu items found for this restaurant.")]
@@ -212,6 +296,9 @@ async def get_menu(db: Session, args: Dict[str, Any]) -> List[TextContent]:
                 response += f"     {item.description}\n"
         response += "\n"
     
+    if page["next_cursor"]:
+        response += f"More items available; call get_menu again with cursor \"{page['next_cursor']}\"\n"
+    
     return [TextContent(type="text", text=response)]
 
 async def update_menu_item(db: Session, args: Dict[str, Any]) -> List[TextContent]:
@@ -226,20 +313,42 @@ async def update_menu_item(db: Session, args: Dict[str, Any]) -> List[TextConten
     for field in ["name", "description", "price", "category", "is_available"]:
         if field in args:
             setattr(item, field, args[field])
+    bump_menu_version(db, item.restaurant_id)
     
     db.commit()
     
     response = f"✅ Menu item '{item.name}' updated successfully"
     return [TextContent(type="text", text=response)]
 
+async def bulk_update_menu_items(db: Session, args: Dict[str, Any]) -> List[TextContent]:
+    """Set availability and/or price for many menu items"""
+    values = {key: args[key] for key in ("is_available", "price") if args.get(key) is not None}
+    filters = {key: args[key] for key in ("category", "search") if args.get(key)}
+    item_ids = args.get("item_ids")
+    
+    if not values:
+        return [TextContent(type="text", text="❌ Provide is_available and/or price")]
+    if not item_ids and not filters:
+        return [TextContent(type="text", text="❌ Provide item_ids, category or search to select items")]
+    
+    updated_ids = await asyncio.to_thread(
+        CatalogService(db).bulk_update_menu_items, args["restaurant_id"], values, item_ids or None, **filters
+    )
+    
+    changes = ", ".join(f"{key}={value}" for key, value in values.items())
+    response = f"✅ Updated {len(updated_ids)} menu items ({changes})"
+    if updated_ids:
+        response += f"\nItem IDs: {', '.join(str(item_id) for item_id in updated_ids)}"
+    return [TextContent(type="text", text=response)]
+
 async def analyze_menu_image(db: Session, args: Dict[str, Any]) -> List[TextContent]:
     """Analyze menu image using AI"""
     restaurant_id = args["restaurant_id"]
     image_data = base64.b64decode(args["image_data"])
     message = args.get("message", "Analyze this menu")
     
-    bot = RestaurantAIBot(db)
-    result = bot.process_message(message, restaurant_id, image_data)
+    bot = await asyncio.to_thread(RestaurantAIBot, db)
+    result = await bot.aprocess_message(message, restaurant_id, image_data)
     
     if result.get("type") == "menu_analyzed":
         response = f"🤖 Menu Analysis Results:\n\n{result['response']}\n\n"
@@ -283,7 +392,7 @@ async def main():
     logger.info("Starting FoodFlow MCP Server")
     
     # Initialize database
-    create_tables()
+    init_database()
     logger.info("Database tables initialized")
     
     # Start server